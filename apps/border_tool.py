@@ -5,6 +5,7 @@ import sys
 # EN: Import from core / CN: 从 core 导入核心模块
 from core.metadata import MetadataHandler
 from core.renderer import FilmRenderer
+from core.batch_pool import BatchPool
 
 # EN: Get working directory (where photos_in/out should be)
 # CN: 获取工作目录（photos_in/out 应该所在的位置）
@@ -104,18 +105,17 @@ def run_border_tool():
         input("\n按回车键退出 / Press Enter to exit...")
 
 
-def process_border_batch(input_dir, output_dir, is_digital=False, manual_film=None, progress_callback=None, lang="zh", custom_layout=None, manual_exif=None, manual_rotation=0, theme="light"):
+def process_border_batch(input_dir, output_dir, is_digital=False, manual_film=None, progress_callback=None, lang="zh", custom_layout=None, manual_exif=None, manual_rotation=0, theme="light", workers=None, stop_check=None):
     """
     EN: Pure logic function for batch border processing (GUI-friendly).
+        workers: process count (None = config 'batch_workers', 1 = serial). stop_check() cancels.
     CN: 批量边框处理纯逻辑函数（GUI友好）。
+        workers：进程数（None 读取配置 'batch_workers'，1 为串行）。stop_check() 用于取消。
     """
     def _t(zh_text, en_text):
         return zh_text if lang == "zh" else en_text
 
     try:
-        meta = MetadataHandler(layout_config='layouts.json', films_config='films.json')
-        renderer = FilmRenderer()
-        
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
         
@@ -133,49 +133,39 @@ def process_border_batch(input_dir, output_dir, is_digital=False, manual_film=No
             results['message'] = _t("未找到图片", "No images found")
             return results
         
+        # EN: Build ordered jobs (rainbow index follows file order) / CN: 构建有序任务（彩虹序号跟随文件顺序）
+        jobs = []
+        for idx, img_name in enumerate(images):
+            jobs.append({
+                'index': idx,
+                'img_path': os.path.join(input_dir, img_name),
+                'output_dir': output_dir,
+                'is_digital': is_digital,
+                'manual_film': manual_film,
+                'layout': custom_layout,
+                'exif': {k: v for k, v in (manual_exif or {}).items() if v},
+                'render_kwargs': {
+                    'manual_rotation': manual_rotation,
+                    'theme': theme,
+                    'rainbow_index': idx,
+                    'rainbow_total': total
+                }
+            })
+
         # EN: Batch processing / CN: 批量处理
-        for idx, img_name in enumerate(images, 1):
-            img_path = os.path.join(input_dir, img_name)
-            
-            try:
-                # EN: Extract metadata / CN: 提取元数据
-                data = meta.get_data(img_path, is_digital_mode=is_digital, manual_film=manual_film)
-                
-                # EN: Apply custom layout params if provided / CN: 如果提供了自定义布局参数则应用
-                if custom_layout:
-                    if 'layout' not in data: data['layout'] = {}
-                    data['layout'].update(custom_layout)
-                
-                # EN: Apply manual EXIF overrides / CN: 应用手动 EXIF 覆盖
-                if manual_exif:
-                    for k, v in manual_exif.items():
-                        if v:
-                            data[k] = v
-                
-                # EN: Final Rendering / CN: 最终渲染 (PASS manual_rotation and theme)
-                # EN: For rainbow themes, use sequential index and total / CN: 对于彩虹主题，使用序列索引与总量
-                r_index = (idx - 1)
-                r_total = len(img_paths)
-                
-                success = renderer.process_image(img_path, data, output_dir, 
-                                                manual_rotation=manual_rotation, 
-                                                theme=theme,
-                                                rainbow_index=r_index,
-                                                rainbow_total=r_total)
-                
-                if success:
-                    results['success'] += 1
-                else:
-                    results['failed'].append((img_name, _t("渲染程序返回空", "Renderer returned False")))
-                
-                # EN: Report progress / CN: 报告进度
+        def on_result(res):
+            img_name = os.path.basename(res['path'])
+            if res['ok']:
+                results['success'] += 1
                 if progress_callback:
-                    progress_callback(idx, total, img_name)
-                    
-            except Exception as e:
-                results['failed'].append((img_name, str(e)))
+                    progress_callback(res['index'] + 1, total, img_name)
+            else:
+                err = res['error'] or _t("渲染程序返回空", "Renderer returned False")
+                results['failed'].append((img_name, err))
                 if progress_callback:
-                    progress_callback(idx, total, _t(f"{img_name}（失败: {e}）", f"{img_name} (Failed: {e})"))
+                    progress_callback(res['index'] + 1, total, _t(f"{img_name}（失败: {err}）", f"{img_name} (Failed: {err})"))
+
+        BatchPool(workers=workers).run(jobs, on_result=on_result, should_stop=stop_check)
         
         # EN: Return result / CN: 返回结果
         results['processed'] = results['success']
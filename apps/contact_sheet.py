@@ -2,22 +2,14 @@
 import os
 import sys
 from core.metadata import MetadataHandler
-from core.renderers.renderer_66 import Renderer66
-from core.renderers.renderer_645 import Renderer645
-from core.renderers.renderer_67 import Renderer67
-from core.renderers.renderer_135 import Renderer135
-from core.renderers.renderer_135hf import Renderer135HF
+from core.exif_probe import probe_many
+from core.band_canvas import use_bands
+from core.contact_pages import make_renderers, paginate, render_pages
 
 class ContactSheetPro:
     def __init__(self):
         self.meta = MetadataHandler()
-        self.renderers = {
-            "66": Renderer66(), 
-            "645": Renderer645(), 
-            "67": Renderer67(), 
-            "135": Renderer135(),
-            "135HF": Renderer135HF()
-        }
+        self.renderers = make_renderers()
 
     def run(self):
         try:
@@ -49,7 +41,8 @@ class ContactSheetPro:
             cfg = self.meta.get_contact_layout(layout_key)
             renderer = self.renderers.get(layout_key, self.renderers["66"])
             
-            canvas, user_emulsion = renderer.prepare_canvas(cfg.get("canvas_w", 4800), cfg.get("canvas_h", 6000))
+            canvas_w, canvas_h = cfg.get("canvas_w", 4800), cfg.get("canvas_h", 6000)
+            canvas, user_emulsion = renderer.prepare_canvas(canvas_w, canvas_h, banded=use_bands(canvas_w, canvas_h))
             # EN: Inject sample_data directly to the renderer
             # CN: 将已经确定好的 sample_data 直接注入渲染器，实现整卷信息统一
             canvas = renderer.render(canvas, img_paths, cfg, self.meta, user_emulsion, sample_data=sample_data)
@@ -58,6 +51,7 @@ class ContactSheetPro:
             if not os.path.exists(output_dir): os.makedirs(output_dir)
             save_path = os.path.join(output_dir, f"ContactSheet_{layout_key}.jpg")
             canvas.save(save_path, quality=95)
+            canvas.close()
             print(f"EN: [✔] Contact sheet saved to: {save_path} | CN: [✔] 索引页已保存至: {save_path}")
             
         except Exception as e:
@@ -75,7 +69,7 @@ class ContactSheetPro:
             print("-"*60)
             input("\n按回车键退出 / Press Enter to exit...")
     
-    def generate(self, input_dir, output_dir, format=None, manual_film=None, emulsion_number=None, orientation=None, lang="zh", progress_callback=None, show_date=True, show_exif=True, sort_method="name", reverse=False):
+    def generate(self, input_dir, output_dir, format=None, manual_film=None, emulsion_number=None, orientation=None, lang="zh", progress_callback=None, show_date=True, show_exif=True, sort_method="name", reverse=False, output_format="jpg"):
         """
         EN: Pure logic function for contact sheet generation (GUI-friendly).
         CN: 底片索引生成纯逻辑函数（GUI友好）。
@@ -90,11 +84,14 @@ class ContactSheetPro:
             progress_callback: Function(message) for progress updates
             sort_method: "name" (filename) or "date" (EXIF date)
             reverse: Whether to reverse sorting order
+            output_format: "jpg" or "tif"
         
         Returns:
             {
                 'success': bool,
                 'output_path': str,
+                'output_paths': [str],  # one per page
+                'pages': [dict],
                 'layout_detected': str,
                 'frames_count': int,
                 'message': str
@@ -136,14 +133,16 @@ class ContactSheetPro:
             if sort_method == "date":
                 if progress_callback:
                     progress_callback(_t("正在按拍摄时间排序...", "Sorting by date..."))
-                # EN: Sort by EXIF date, fallback to filename if dates are equal or missing
-                # CN: 按拍摄日期排序，如果日期相同或缺失则回序至文件名
+                # EN: Sort by EXIF date, fallback to filename if dates are equal or missing.
+                #     Dates come from a header-only probe run over a thread pool.
+                # CN: 按拍摄日期排序，如果日期相同或缺失则回序至文件名。
+                #     拍摄时间由仅读文件头的探测器在线程池中批量获取。
+                probes = probe_many(raw_imgs)
                 def get_date_key(path):
-                    try:
-                        d = self.meta.get_data(path)
-                        return (d.get("DateTime", "9999:99:99 99:99:99"), path)
-                    except:
+                    info = probes.get(path)
+                    if info is None:
                         return ("9999:99:99 99:99:99", path)
+                    return (info['datetime'], path)
                 img_paths = sorted(raw_imgs, key=get_date_key, reverse=reverse)
             else:
                 # EN: Default sorting by filename / CN: 默认按文件名排序
@@ -201,41 +200,80 @@ class ContactSheetPro:
             if progress_callback:
                 progress_callback(_t("正在渲染索引页...", "Rendering contact sheet..."))
             
-            # EN: Pass emulsion_number to prepare_canvas to avoid input() in GUI mode / CN: 传递乳剂号到prepare_canvas避免GUI模式下的input()
-            canvas, user_emulsion = renderer.prepare_canvas(
-                cfg.get("canvas_w", 4800), 
-                cfg.get("canvas_h", 6000),
-                emulsion_number=emulsion_number
-            )
-            
-            # EN: Pass orientation to render for 645 format to avoid input() in GUI mode / CN: 传递方向参数给645画幅渲染器避免GUI模式下的input()
-            canvas = renderer.render(
-                canvas,
-                img_paths,
-                cfg,
-                self.meta,
-                user_emulsion,
-                sample_data=sample_data,
-                orientation=orientation,
-                show_date=show_date,
-                show_exif=show_exif
-            )
-            
-            # EN: 4. Save output / CN: 4. 保存输出
+            # EN: Large print sheets are composed in horizontal bands and streamed to the encoder
+            # CN: 大尺寸打印索引页按水平条带合成并流式写入编码器
+            canvas_w, canvas_h = cfg.get("canvas_w", 4800), cfg.get("canvas_h", 6000)
+            banded = use_bands(canvas_w, canvas_h)
+            if banded and progress_callback:
+                progress_callback(_t("大尺寸画布：按条带合成", "Large canvas: composing in bands"))
+
+            # EN: Emulsion is resolved once here so page workers never prompt / CN: 乳剂号在此统一解析，分页工作进程不会再询问
+            user_emulsion = renderer.resolve_emulsion(emulsion_number)
+
+            # EN: 4. Paginate: each page holds the renderer's capacity, numbering continues across pages
+            # CN: 4. 分页：每页容纳渲染器的容量，帧号跨页连续
+            pages = paginate(img_paths, renderer.page_capacity(self.meta, orientation))
             if not os.path.exists(output_dir):
                 os.makedirs(output_dir)
-            save_path = os.path.join(output_dir, f"ContactSheet_{layout_key}.jpg")
-            canvas.save(save_path, quality=95)
-            
+            if output_format in ("tif", "tiff"):
+                ext = "tif"
+                dpi = self.meta.get_contact_layout("GLOBAL").get("dpi", 600)
+                save_kwargs = {'compression': "tiff_deflate", 'dpi': (dpi, dpi)}
+            else:
+                ext = "jpg"
+                save_kwargs = {'quality': 95}
+
+            jobs = []
+            for page, (frame_offset, page_paths) in enumerate(pages, start=1):
+                suffix = f"_p{page:02d}" if len(pages) > 1 else ""
+                jobs.append({
+                    'page': page,
+                    'layout_key': layout_key,
+                    'paths': page_paths,
+                    'cfg': cfg,
+                    'user_emulsion': user_emulsion,
+                    'sample_data': sample_data,
+                    'orientation': orientation,
+                    'show_date': show_date,
+                    'show_exif': show_exif,
+                    'frame_offset': frame_offset,
+                    'banded': banded,
+                    'save_path': os.path.join(output_dir, f"ContactSheet_{layout_key}{suffix}.{ext}"),
+                    'save_kwargs': save_kwargs
+                })
+            if len(jobs) > 1 and progress_callback:
+                progress_callback(_t(f"共 {len(img_paths)} 帧，分为 {len(jobs)} 页并行渲染",
+                                     f"{len(img_paths)} frames across {len(jobs)} pages, rendering in parallel"))
+
+            def on_page(res):
+                if not progress_callback:
+                    return
+                if res['ok']:
+                    progress_callback(_t(f"已保存至: {res['path']}", f"Saved to: {res['path']}"))
+                else:
+                    progress_callback(_t(f"第 {res['page']} 页失败: {res['error']}", f"Page {res['page']} failed: {res['error']}"))
+
+            # EN: Pass orientation to render for 645 format to avoid input() in GUI mode / CN: 传递方向参数给645画幅渲染器避免GUI模式下的input()
+            page_results = render_pages(jobs, self.renderers, self.meta, on_result=on_page)
+            failed = [res for res in page_results if not res['ok']]
+            output_paths = [res['path'] for res in page_results if res['ok']]
+
+            # EN: Report metadata cache effectiveness / CN: 报告元数据缓存命中情况
+            cache_stats = self.meta.cache_stats()
             if progress_callback:
-                progress_callback(_t(f"已保存至: {save_path}", f"Saved to: {save_path}"))
+                progress_callback(_t(f"元数据缓存: 命中 {cache_stats['hits']} / 未命中 {cache_stats['misses']}",
+                                     f"Metadata cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses"))
             
             return {
-                'success': True,
-                'output_path': save_path,
+                'success': not failed,
+                'output_path': output_paths[0] if output_paths else '',
+                'output_paths': output_paths,
+                'pages': page_results,
                 'layout_detected': layout_key,
                 'frames_count': len(img_paths),
-                'message': _t("成功", "Success")
+                'metadata_cache': cache_stats,
+                'message': _t("成功", "Success") if not failed else
+                           "\n".join(f"{_t('错误', 'Error')} (p{res['page']:02d}): {res['error']}" for res in failed)
             }
             
         except Exception as e:
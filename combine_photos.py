@@ -1,5 +1,6 @@
 import os
 from PIL import Image, ImageOps
+from core.decode_planner import open_for_size
 
 def create_collage(src_dir, output_path, target_ratio=(3, 4), cols=3, rows=4):
     # 1. EN: List files / CN: 获取文件列表
@@ -41,8 +42,9 @@ def create_collage(src_dir, output_path, target_ratio=(3, 4), cols=3, rows=4):
         r = i // cols
         
         try:
-            img = Image.open(file_path)
-            img = ImageOps.exif_transpose(img)
+            # EN: Decoded at a DCT-reduced size for the cell, then EXIF-transposed
+            # CN: 按单元格尺寸以 DCT 缩小分辨率解码，再按 EXIF 旋正
+            img = open_for_size(file_path, (cell_w, cell_h), fit="contain", transpose=True)
             
             # EN: Preserve aspect ratio and fit in square / CN: 不裁切，保留原图比例并居中
             img.thumbnail((cell_w, cell_h), Image.Resampling.LANCZOS)
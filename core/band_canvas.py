@@ -0,0 +1,276 @@
+# core/band_canvas.py
+"""
+EN: Band-streaming canvas for large contact sheets. A BandCanvas stands in for the full RGB sheet:
+    renderers paste and draw on it as usual, but every operation is recorded in a display list
+    instead of touching pixels (large pasted frames are spooled to a temp file, row-addressable).
+    On save the list is replayed one horizontal band at a time, and each finished band is streamed
+    to the encoder, so peak memory is bounded by the band height rather than the sheet size.
+    Replay is an integer translation of the same Pillow operations, so the pixels match an
+    in-memory render exactly.
+CN: 大尺寸接触印相的分带流式画布。BandCanvas 代替整张 RGB 画布：渲染器照常粘贴和绘制，但所有操作
+    只记录到显示列表而不触碰像素（较大的帧图像写入可按行寻址的临时文件）。保存时按水平条带逐条回放
+    显示列表，每完成一条就送入编码器，峰值内存取决于条带高度而非整张画布尺寸。回放只是对同一组 Pillow
+    操作做整数平移，像素结果与内存内渲染完全一致。
+"""
+
+import io
+import os
+import mmap
+import zlib
+import struct
+import tempfile
+import weakref
+
+from PIL import Image, ImageDraw
+
+from core.sprite_atlas import sprite_atlas
+from utils.config_manager import config_manager
+
+# EN: Rows composed per band / CN: 每个条带合成的行数
+BAND_HEIGHT = 512
+# EN: Sheets above this many megapixels are composed in bands (config: contact_band_threshold_mp)
+# CN: 超过该百万像素数的索引页按条带合成（配置项：contact_band_threshold_mp）
+BAND_THRESHOLD_MP = 40
+# EN: Pasted images at least this large are spooled to disk / CN: 不小于该字节数的粘贴图像写入磁盘暂存
+SPOOL_MIN_BYTES = 1 << 18
+# EN: Modes that can be spooled as packed rows / CN: 可按紧凑行格式暂存的模式
+_SPOOL_MODES = frozenset(("L", "RGB", "RGBA"))
+
+
+def use_bands(width, height):
+    """EN: Whether a sheet of this size should be composed in bands / CN: 该尺寸的索引页是否应按条带合成"""
+    threshold = config_manager.get("contact_band_threshold_mp", BAND_THRESHOLD_MP)
+    return width * height > threshold * 1_000_000
+
+
+class BandDraw:
+    """
+    EN: Recording stand-in for ImageDraw.Draw(canvas), covering the calls the renderers make.
+    CN: ImageDraw.Draw(canvas) 的记录版替身，覆盖渲染器用到的调用。
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        # EN: Text metrics only; same font mode as an RGB canvas / CN: 仅用于文字度量；字体模式与 RGB 画布一致
+        self._metrics = ImageDraw.Draw(Image.new(canvas.mode, (1, 1)))
+
+    def textlength(self, text, font=None, *args, **kwargs):
+        return self._metrics.textlength(text, font, *args, **kwargs)
+
+    def rectangle(self, xy, fill=None, outline=None, width=1):
+        flat = [float(v) for point in xy for v in (point if isinstance(point, (tuple, list)) else (point,))]
+        y0, y1 = sorted((flat[1], flat[3]))
+        self.canvas._record(int(y0), int(y1) + 1 + width, ("rect", flat, fill, outline, width))
+
+    def bitmap(self, xy, bitmap, fill=None):
+        x, y = int(xy[0]), int(xy[1])
+        self.canvas._record(y, y + bitmap.height, ("bitmap", x, y, bitmap, fill))
+
+    def text(self, xy, text, fill=None, font=None):
+        # EN: Rasterized once at the absolute position through the atlas, then recorded as a bitmap
+        # CN: 在绝对坐标处经图集栅格化一次，再以位图形式记录
+        sprite_atlas.draw_text(self, xy, text, font, fill)
+
+
+class BandCanvas:
+    """
+    EN: Recording canvas with the PIL Image surface the contact renderers use (size, resize of the
+        blank sheet, paste, save). Use draw_for() instead of ImageDraw.Draw to draw on it.
+        Pasted images must not be modified afterwards (small ones are kept by reference).
+    CN: 记录式画布，提供接触印相渲染器用到的 PIL Image 接口（size、空白画布的 resize、paste、save）。
+        绘制时用 draw_for() 代替 ImageDraw.Draw。粘贴后的图像不可再修改（小图按引用保存）。
+    """
+
+    def __init__(self, size, color=0, mode="RGB"):
+        self.mode = mode
+        self.size = (int(size[0]), int(size[1]))
+        self.color = color
+        self._ops = []
+        self._spool = None
+        self._spooled = {}
+
+    @property
+    def width(self):
+        return self.size[0]
+
+    @property
+    def height(self):
+        return self.size[1]
+
+    def resize(self, size, *args, **kwargs):
+        """EN: Resizing the blank sheet allocates nothing / CN: 调整空白画布尺寸不分配像素"""
+        if self._ops:
+            raise ValueError("BandCanvas can only be resized before anything is drawn")
+        return BandCanvas(size, self.color, self.mode)
+
+    def draw(self):
+        return BandDraw(self)
+
+    # --- EN: Recording / CN: 记录 ---
+
+    def _record(self, y0, y1, op):
+        if y1 > 0 and y0 < self.height:
+            self._ops.append((y0, y1, op))
+
+    def paste(self, im, box=None, mask=None):
+        if not isinstance(im, Image.Image):
+            raise TypeError("BandCanvas.paste expects a PIL image")
+        x, y = (box[0], box[1]) if box else (0, 0)
+        if y + im.height <= 0 or y >= self.height:
+            return
+        src = self._hold(im)
+        msk = None if mask is None else ("same",) if mask is im else self._hold(mask)
+        self._record(y, y + im.height, ("paste", x, y, src, msk))
+
+    def _hold(self, im):
+        """EN: Keep small images by reference, spool large ones / CN: 小图按引用保存，大图写入暂存文件"""
+        bands = len(im.getbands())
+        if im.mode not in _SPOOL_MODES or im.width * im.height * bands < SPOOL_MIN_BYTES:
+            return ("mem", im)
+        # EN: The same cached image (e.g. a sprocket strip) is written once / CN: 同一缓存图像（如齿孔条）只写一次
+        known = self._spooled.get(id(im))
+        if known is not None and known[1]() is im:
+            return known[0]
+        if self._spool is None:
+            self._spool = tempfile.TemporaryFile(prefix="gt23_band_")
+        self._spool.seek(0, os.SEEK_END)
+        handle = ("spool", self._spool.tell(), im.mode, im.size, bands)
+        self._spool.write(im.tobytes())
+        self._spooled[id(im)] = (handle, weakref.ref(im))
+        return handle
+
+    def _rows(self, handle, y0, y1):
+        if handle[0] == "mem":
+            im = handle[1]
+            return im if (y0, y1) == (0, im.height) else im.crop((0, y0, im.width, y1))
+        _, offset, mode, (w, _h), bands = handle
+        self._spool.seek(offset + y0 * w * bands)
+        return Image.frombytes(mode, (w, y1 - y0), self._spool.read((y1 - y0) * w * bands))
+
+    # --- EN: Replay / CN: 回放 ---
+
+    def bands(self, band_height=BAND_HEIGHT):
+        """EN: Yield (top, band image) from top to bottom / CN: 自上而下逐条产出 (top, 条带图像)"""
+        w, h = self.size
+        for top in range(0, h, band_height):
+            bottom = min(h, top + band_height)
+            band = Image.new(self.mode, (w, bottom - top), self.color)
+            draw = ImageDraw.Draw(band)
+            for y0, y1, op in self._ops:
+                if y1 <= top or y0 >= bottom:
+                    continue
+                kind = op[0]
+                if kind == "rect":
+                    _, (x0, ry0, x1, ry1), fill, outline, width = op
+                    draw.rectangle([x0, ry0 - top, x1, ry1 - top], fill=fill, outline=outline, width=width)
+                elif kind == "bitmap":
+                    _, x, y, bitmap, fill = op
+                    draw.bitmap((x, y - top), bitmap, fill=fill)
+                else:
+                    _, x, y, src, msk = op
+                    r0, r1 = max(top, y) - y, min(bottom, y1) - y
+                    piece = self._rows(src, r0, r1)
+                    mask = piece if msk == ("same",) else (None if msk is None else self._rows(msk, r0, r1))
+                    band.paste(piece, (x, y + r0 - top), mask)
+            yield top, band
+
+    def save(self, fp, format=None, band_height=BAND_HEIGHT, **params):
+        """
+        EN: Stream the sheet to `fp` (path). JPEG: bands are written to a memory-mapped scratch file
+            that libjpeg reads row by row; TIFF: one strip per band (compression "tiff_deflate" or
+            "raw", optional dpi). Other formats are assembled in memory.
+        CN: 将索引页流式写入 `fp`（路径）。JPEG：条带写入内存映射的暂存文件，由 libjpeg 逐行读取；
+            TIFF：每个条带一个 strip（压缩 "tiff_deflate" 或 "raw"，可选 dpi）。其他格式在内存中拼合。
+        """
+        ext = (format or os.path.splitext(fp)[1].lstrip(".")).lower()
+        if ext in ("tif", "tiff"):
+            _write_tiff(fp, self.size, self.bands(band_height), band_height,
+                        params.get("compression", "tiff_deflate"), params.get("dpi"))
+            return
+        with tempfile.TemporaryFile(prefix="gt23_sheet_") as scratch:
+            raw_mode = "RGBX" if self.mode == "RGB" else self.mode
+            for _top, band in self.bands(band_height):
+                scratch.write(band.tobytes("raw", raw_mode))
+            scratch.flush()
+            with mmap.mmap(scratch.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                sheet = Image.frombuffer(raw_mode, self.size, mapped, "raw", raw_mode, 0, 1)
+                if ext not in ("jpg", "jpeg") and raw_mode != self.mode:
+                    sheet = sheet.convert(self.mode)
+                sheet.save(fp, format, **params)
+                # EN: Release the mapping before it closes / CN: 在映射关闭前释放引用
+                del sheet
+
+    def close(self):
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+        self._spooled.clear()
+        self._ops = []
+
+
+def draw_for(canvas):
+    """EN: ImageDraw for a PIL canvas, recording draw for a BandCanvas / CN: PIL 画布返回 ImageDraw，BandCanvas 返回记录版"""
+    return canvas.draw() if isinstance(canvas, BandCanvas) else ImageDraw.Draw(canvas)
+
+
+def _write_tiff(path, size, bands, band_height, compression, dpi):
+    """
+    EN: Baseline RGB TIFF writer with one strip per band (little-endian, chunky, 8 bit).
+    CN: 基线 RGB TIFF 写入器，每个条带一个 strip（小端、交错存储、8 位）。
+    """
+    deflate = compression not in (None, "raw", "none")
+    offsets, counts = [], []
+    with open(path, "wb") as f:
+        f.write(b"II*\x00\x00\x00\x00\x00")
+        for _top, band in bands:
+            data = band.tobytes()
+            if deflate:
+                data = zlib.compress(data, 6)
+            offsets.append(f.tell())
+            counts.append(len(data))
+            f.write(data)
+            if f.tell() % 2:
+                f.write(b"\x00")
+
+        # EN: Out-of-line values go before the IFD / CN: 超出 4 字节的值写在 IFD 之前
+        def extra(payload):
+            pos = f.tell()
+            f.write(payload)
+            if f.tell() % 2:
+                f.write(b"\x00")
+            return pos
+
+        def longs(values):
+            if len(values) == 1:
+                return 4, 1, values[0]
+            return 4, len(values), extra(struct.pack(f"<{len(values)}I", *values))
+
+        res = dpi[0] if isinstance(dpi, (tuple, list)) else dpi
+        entries = [
+            (256, 4, 1, size[0]),
+            (257, 4, 1, size[1]),
+            (258, 3, 3, extra(struct.pack("<3H", 8, 8, 8))),
+            (259, 3, 1, 8 if deflate else 1),
+            (262, 3, 1, 2),
+            (273, *longs(offsets)),
+            (277, 3, 1, 3),
+            (278, 4, 1, band_height),
+            (279, *longs(counts)),
+        ]
+        if res:
+            rational = extra(struct.pack("<2I", int(round(res)), 1))
+            entries += [(282, 5, 1, rational), (283, 5, 1, rational)]
+        entries.append((284, 3, 1, 1))
+        if res:
+            entries.append((296, 3, 1, 2))
+
+        ifd = f.tell()
+        out = io.BytesIO()
+        out.write(struct.pack("<H", len(entries)))
+        for tag, typ, count, value in entries:
+            packed = struct.pack("<HH", value, 0) if typ == 3 and count == 1 else struct.pack("<I", value)
+            out.write(struct.pack("<HHI", tag, typ, count) + packed)
+        out.write(b"\x00\x00\x00\x00")
+        f.write(out.getvalue())
+        f.seek(4)
+        f.write(struct.pack("<I", ifd))
@@ -0,0 +1,197 @@
+# core/batch_pool.py
+"""
+EN: Process-pool batch renderer. Each worker process keeps a warm FilmRenderer and
+    MetadataHandler so fonts, logo tables and film configs are loaded once per worker.
+CN: 多进程批量渲染器。每个工作进程常驻一个已预热的 FilmRenderer 与 MetadataHandler，
+    字体、图标表与胶片配置在每个进程中只加载一次。
+"""
+
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from core.image_source import image_source_cache
+from utils.config_manager import config_manager
+
+# EN: Per-process singletons (populated by _init_worker) / CN: 进程内单例（由 _init_worker 初始化）
+_worker_renderer = None
+_worker_meta = None
+
+# EN: 4500px reference edge used by GUI pixel settings / CN: GUI 像素设置所基于的 4500px 基准
+LAYOUT_REF_PX = 4500.0
+
+
+def resolve_worker_count(workers=None):
+    """
+    EN: Resolve worker count. None reads 'batch_workers' from config; <= 0 means auto.
+    CN: 解析进程数。None 时读取配置项 'batch_workers'；<= 0 表示自动。
+    """
+    if workers is None:
+        workers = config_manager.get("batch_workers", 0)
+    try:
+        workers = int(workers)
+    except (TypeError, ValueError):
+        workers = 0
+    if workers <= 0:
+        # EN: Leave one core for the GUI; 4500px canvases are memory heavy, cap at 4
+        # CN: 为 GUI 保留一个核心；4500px 画布占用内存较大，上限 4
+        workers = max(1, min(4, (os.cpu_count() or 2) - 1))
+    return workers
+
+
+def apply_render_overrides(data, job):
+    """
+    EN: Apply layout / EXIF / ratio overrides carried by a job onto extracted metadata.
+    CN: 将任务中携带的布局 / EXIF / 比例覆盖应用到提取出的元数据上。
+    """
+    layout_px = job.get('layout_px')
+    if layout_px is not None:
+        data.setdefault('layout', {}).update({
+            "left": layout_px.get('left_px', 180) / LAYOUT_REF_PX,
+            "right": layout_px.get('right_px', 180) / LAYOUT_REF_PX,
+            "top": layout_px.get('top_px', 180) / LAYOUT_REF_PX,
+            "bottom": layout_px.get('bottom_px', 585) / LAYOUT_REF_PX,
+            "font_main_scale": layout_px.get('font_scale', 144) / LAYOUT_REF_PX,
+            "font_sub_scale": layout_px.get('font_sub_px', 112) / LAYOUT_REF_PX,
+            "font_v_offset": layout_px.get('font_v_offset', 0) / LAYOUT_REF_PX
+        })
+
+    if job.get('layout'):
+        data.setdefault('layout', {}).update(job['layout'])
+
+    # EN: GUI field names -> metadata keys / CN: GUI 字段名 -> 元数据键名
+    key_map = {'Lens': 'LensModel', 'Shutter': 'ExposureTimeStr', 'Aperture': 'FNumber'}
+    for k, v in (job.get('exif') or {}).items():
+        if v is not None and v != "":
+            data[key_map.get(k, k)] = v
+
+    if 'target_ratio' in job:
+        data['target_ratio'] = job['target_ratio']
+    return data
+
+
+def render_border_job(job, renderer, meta):
+    """
+    EN: Render one job dict. Shared by the serial path and the pool workers.
+    CN: 渲染单个任务字典。串行路径与进程池工作进程共用。
+    """
+    img_path = job['img_path']
+    try:
+        data = meta.get_data(img_path, is_digital_mode=job.get('is_digital', False),
+                             manual_film=job.get('manual_film'))
+        apply_render_overrides(data, job)
+        img, _ = renderer.process_image(img_path, data, job['output_dir'], **job.get('render_kwargs', {}))
+        if img is None:
+            return {'index': job['index'], 'path': img_path, 'ok': False, 'error': "Renderer returned None"}
+        return {'index': job['index'], 'path': img_path, 'ok': True, 'error': None}
+    except Exception as e:
+        traceback.print_exc()
+        return {'index': job['index'], 'path': img_path, 'ok': False, 'error': str(e)}
+    finally:
+        # EN: Each file is rendered once per batch; drop its parsed source once EXIF is written
+        # CN: 批处理中每个文件只渲染一次；EXIF 写入后即释放其已解析的图像源
+        image_source_cache.discard(img_path)
+
+
+def _init_worker(layout_config, films_config):
+    """EN: Warm up per-process renderer and metadata handler / CN: 预热进程内的渲染器与元数据处理器"""
+    global _worker_renderer, _worker_meta
+    from core.metadata import MetadataHandler
+    from core.renderer import FilmRenderer
+    _worker_meta = MetadataHandler(layout_config=layout_config, films_config=films_config)
+    _worker_renderer = FilmRenderer()
+
+
+def _run_in_worker(job):
+    return render_border_job(job, _worker_renderer, _worker_meta)
+
+
+class BatchPool:
+    """
+    EN: Runs border jobs serially or on a process pool. Results are always reported in
+        submission order, so progress, output prefixes and rainbow slices stay stable.
+    CN: 串行或在进程池中执行边框任务。结果始终按提交顺序回报，
+        保证进度、输出前缀与彩虹切片顺序不变。
+    """
+
+    def __init__(self, workers=None, layout_config='layouts.json', films_config='films.json'):
+        self.workers = resolve_worker_count(workers)
+        self.layout_config = layout_config
+        self.films_config = films_config
+
+    def run(self, jobs, on_result=None, should_stop=None, renderer=None, meta=None):
+        """
+        EN: Execute jobs. on_result(result) is called in order; should_stop() is polled
+            between jobs and cancels everything not yet started. Returns ordered results.
+        CN: 执行任务。on_result(result) 按顺序回调；在任务之间轮询 should_stop()，
+            一旦为真即取消所有未开始的任务。返回有序结果列表。
+        """
+        should_stop = should_stop or (lambda: False)
+        if self.workers <= 1 or len(jobs) <= 1:
+            return self._run_serial(jobs, on_result, should_stop, renderer, meta)
+        return self._run_pool(jobs, on_result, should_stop)
+
+    def _run_serial(self, jobs, on_result, should_stop, renderer, meta):
+        if renderer is None or meta is None:
+            from core.metadata import MetadataHandler
+            from core.renderer import FilmRenderer
+            renderer = renderer or FilmRenderer()
+            meta = meta or MetadataHandler(layout_config=self.layout_config, films_config=self.films_config)
+
+        results = []
+        for job in jobs:
+            if should_stop():
+                break
+            res = render_border_job(job, renderer, meta)
+            results.append(res)
+            if on_result:
+                on_result(res)
+        return results
+
+    def _run_pool(self, jobs, on_result, should_stop):
+        results = []
+        done_map = {}
+        next_emit = 0
+        next_submit = 0
+        # EN: Bounded in-flight window keeps memory flat and makes cancellation prompt
+        # CN: 限制在途任务数量，保持内存平稳并让取消及时生效
+        max_in_flight = self.workers + 1
+        pending = {}
+
+        executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                       initargs=(self.layout_config, self.films_config))
+        try:
+            while next_emit < len(jobs):
+                stopped = should_stop()
+                if stopped:
+                    # EN: Cancel queued jobs, let running ones finish / CN: 取消排队任务，等待运行中的任务结束
+                    for fut in list(pending):
+                        if fut.cancel():
+                            del pending[fut]
+                else:
+                    while next_submit < len(jobs) and len(pending) < max_in_flight:
+                        pending[executor.submit(_run_in_worker, jobs[next_submit])] = next_submit
+                        next_submit += 1
+
+                if not pending:
+                    break
+
+                finished, _ = wait(list(pending), timeout=0.2, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    idx = pending.pop(fut)
+                    try:
+                        done_map[idx] = fut.result()
+                    except Exception as e:
+                        # EN: Worker crashed (e.g. out of memory) / CN: 工作进程崩溃（如内存不足）
+                        done_map[idx] = {'index': idx, 'path': jobs[idx]['img_path'], 'ok': False, 'error': str(e)}
+
+                # EN: Emit contiguous results in submission order / CN: 按提交顺序输出连续结果
+                while next_emit in done_map:
+                    res = done_map.pop(next_emit)
+                    results.append(res)
+                    if on_result:
+                        on_result(res)
+                    next_emit += 1
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        return results
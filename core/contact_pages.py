@@ -0,0 +1,128 @@
+# core/contact_pages.py
+"""
+EN: Multi-page contact sheets. A roll longer than one sheet is split into pages of the renderer's
+    capacity; every page carries its frame offset, so numbering and edge codes continue across
+    pages. Pages render concurrently on a process pool whose workers keep warm renderers and a
+    MetadataHandler, in the same way as the border BatchPool.
+CN: 多页接触印相。超出单页容量的胶卷按渲染器容量分页；每页携带帧号偏移，帧号与喷码跨页连续。
+    各页在进程池中并发渲染，工作进程常驻已预热的渲染器与 MetadataHandler，与边框 BatchPool 的方式一致。
+"""
+
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from core.batch_pool import resolve_worker_count
+
+# EN: Per-process singletons (populated by _init_worker) / CN: 进程内单例（由 _init_worker 初始化）
+_worker_renderers = None
+_worker_meta = None
+
+
+def make_renderers():
+    """EN: Layout key -> contact sheet renderer / CN: 画幅键 -> 接触印相渲染器"""
+    from core.renderers.renderer_66 import Renderer66
+    from core.renderers.renderer_645 import Renderer645
+    from core.renderers.renderer_67 import Renderer67
+    from core.renderers.renderer_135 import Renderer135
+    from core.renderers.renderer_135hf import Renderer135HF
+    return {
+        "66": Renderer66(),
+        "645": Renderer645(),
+        "67": Renderer67(),
+        "135": Renderer135(),
+        "135HF": Renderer135HF()
+    }
+
+
+def paginate(img_paths, capacity):
+    """EN: [(frame_offset, paths)] per page / CN: 每页的 [(帧号偏移, 路径列表)]"""
+    if not capacity or len(img_paths) <= capacity:
+        return [(0, list(img_paths))]
+    return [(start, img_paths[start:start + capacity]) for start in range(0, len(img_paths), capacity)]
+
+
+def render_page_job(job, renderers, meta):
+    """
+    EN: Render and save one page job dict. Shared by the in-process path and the pool workers.
+    CN: 渲染并保存单页任务字典。进程内路径与进程池工作进程共用。
+    """
+    try:
+        renderer = renderers.get(job['layout_key'], renderers["66"])
+        cfg = job['cfg']
+        canvas, user_emulsion = renderer.prepare_canvas(
+            cfg.get("canvas_w", 4800),
+            cfg.get("canvas_h", 6000),
+            emulsion_number=job['user_emulsion'],
+            banded=job.get('banded', False)
+        )
+        canvas = renderer.render(
+            canvas,
+            job['paths'],
+            cfg,
+            meta,
+            user_emulsion,
+            sample_data=job['sample_data'],
+            orientation=job['orientation'],
+            show_date=job['show_date'],
+            show_exif=job['show_exif'],
+            frame_offset=job['frame_offset']
+        )
+        canvas.save(job['save_path'], **job.get('save_kwargs', {}))
+        canvas.close()
+        return {'page': job['page'], 'path': job['save_path'], 'frames': len(job['paths']), 'ok': True, 'error': None}
+    except Exception as e:
+        traceback.print_exc()
+        return {'page': job['page'], 'path': job['save_path'], 'frames': len(job['paths']), 'ok': False, 'error': str(e)}
+
+
+def _init_worker():
+    """EN: Warm up per-process renderers and metadata handler / CN: 预热进程内的渲染器与元数据处理器"""
+    global _worker_renderers, _worker_meta
+    from core.metadata import MetadataHandler
+    _worker_meta = MetadataHandler()
+    _worker_renderers = make_renderers()
+
+
+def _run_in_worker(job):
+    return render_page_job(job, _worker_renderers, _worker_meta)
+
+
+def render_pages(jobs, renderers, meta, workers=None, on_result=None):
+    """
+    EN: Render page jobs; a single page (or a single worker) stays in this process. on_result(result)
+        is called in page order as pages finish. Returns results in page order.
+    CN: 渲染分页任务；只有一页（或只有一个工作进程）时在本进程内完成。页面完成时按页码顺序回调 on_result(result)。
+        返回按页码排序的结果。
+    """
+    workers = min(resolve_worker_count(workers), len(jobs))
+    results = []
+    if workers <= 1:
+        for job in jobs:
+            res = render_page_job(job, renderers, meta)
+            results.append(res)
+            if on_result:
+                on_result(res)
+        return results
+
+    done_map = {}
+    next_emit = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = {executor.submit(_run_in_worker, job): idx for idx, job in enumerate(jobs)}
+        for fut in as_completed(futures):
+            idx = futures[fut]
+            job = jobs[idx]
+            try:
+                done_map[idx] = fut.result()
+            except Exception as e:
+                # EN: Worker crashed (e.g. out of memory) / CN: 工作进程崩溃（如内存不足）
+                done_map[idx] = {'page': job['page'], 'path': job['save_path'], 'frames': len(job['paths']),
+                                 'ok': False, 'error': str(e)}
+
+            # EN: Emit contiguous results in page order / CN: 按页码顺序输出连续结果
+            while next_emit in done_map:
+                res = done_map.pop(next_emit)
+                results.append(res)
+                if on_result:
+                    on_result(res)
+                next_emit += 1
+    return results
@@ -0,0 +1,86 @@
+# core/decode_planner.py
+"""
+EN: Resolution-aware decode planner. For a known output size it picks the largest shrink that
+    still leaves the decoded image `oversample` times larger than the target: JPEG sources use the
+    DCT scaling of Image.draft (1/2, 1/4, 1/8, decoded directly at the smaller size), anything left
+    over (or non-JPEG sources) uses an integer Image.reduce box filter. Callers then finish with
+    their usual high-quality resample (LANCZOS / ImageOps.fit / thumbnail).
+CN: 基于分辨率的解码规划器。已知输出尺寸时，选取最大的缩小倍数，同时保证解码结果仍是目标尺寸的
+    `oversample` 倍以上：JPEG 源使用 Image.draft 的 DCT 缩放（1/2、1/4、1/8，直接以小尺寸解码），
+    剩余倍数（或非 JPEG 源）使用 Image.reduce 整数盒式缩小。调用方最后仍执行原有的高质量重采样
+    （LANCZOS / ImageOps.fit / thumbnail）。
+"""
+
+from PIL import Image, ImageOps
+
+# EN: Decoded size must stay >= target * DECODE_OVERSAMPLE / CN: 解码尺寸须不小于 目标 * DECODE_OVERSAMPLE
+DECODE_OVERSAMPLE = 2.0
+# EN: libjpeg DCT scale denominators, largest first / CN: libjpeg DCT 缩放分母（从大到小）
+DCT_SCALES = (8, 4, 2)
+# EN: Modes supported by Image.reduce / CN: Image.reduce 支持的模式
+_REDUCE_MODES = frozenset(("L", "LA", "RGB", "RGBA", "RGBX", "CMYK", "I", "F"))
+# EN: EXIF orientations that swap width and height / CN: 会交换宽高的 EXIF 方向值
+_SWAPPING_ORIENTATIONS = (5, 6, 7, 8)
+
+
+def required_scale(src_size, target_size, fit="cover"):
+    """
+    EN: Output/source scale the caller's resample will apply. "cover" for resize-to-box, fit and
+        crop (both axes must be filled); "contain" for thumbnail-style fitting inside the box.
+    CN: 调用方重采样将使用的 输出/源 比例。"cover" 用于缩放到框、fit 与裁切（两个方向都需填满）；
+        "contain" 用于 thumbnail 式的框内适配。
+    """
+    sx = target_size[0] / max(1, src_size[0])
+    sy = target_size[1] / max(1, src_size[1])
+    return max(sx, sy) if fit == "cover" else min(sx, sy)
+
+
+def plan_factor(src_size, target_size, fit="cover", oversample=DECODE_OVERSAMPLE):
+    """EN: Largest integer shrink keeping the oversample margin (1 = none) / CN: 保留过采样余量的最大整数缩小倍数（1 为不缩小）"""
+    scale = required_scale(src_size, target_size, fit) * oversample
+    if scale <= 0:
+        return 1
+    return max(1, int(1.0 / scale))
+
+
+def decode_for_size(img, target_size, fit="cover", oversample=DECODE_OVERSAMPLE):
+    """
+    EN: Shrink `img` (ideally still undecoded) for a later resample to `target_size`, given in the
+        image's stored orientation. Returns `img` itself when no shrink is worthwhile.
+    CN: 为后续重采样到 `target_size`（按图像存储方向给出）预先缩小 `img`（最好尚未解码）。
+        无需缩小时直接返回 `img`。
+    """
+    factor = plan_factor(img.size, target_size, fit, oversample)
+    if factor < 2:
+        return img
+    if img.format == "JPEG":
+        # EN: draft only takes effect before load; it keeps both sides >= the requested size
+        # CN: draft 仅在解码前生效；保证两边均不小于请求尺寸
+        dct = next(s for s in DCT_SCALES if s <= factor)
+        before = img.size
+        img.draft(img.mode, (img.width // dct, img.height // dct))
+        if img.size != before:
+            factor = plan_factor(img.size, target_size, fit, oversample)
+            if factor < 2:
+                return img
+    if img.mode not in _REDUCE_MODES:
+        return img
+    return img.reduce(factor)
+
+
+def open_for_size(path, target_size, fit="cover", oversample=DECODE_OVERSAMPLE, transpose=False):
+    """
+    EN: Open and decode `path` just large enough for `target_size` (file closed on return). With
+        transpose=True the target is given in display orientation and EXIF orientation is applied.
+    CN: 以刚好满足 `target_size` 的分辨率打开并解码 `path`（返回时文件已关闭）。transpose=True 时
+        目标尺寸按显示方向给出，并应用 EXIF 方向。
+    """
+    with Image.open(path) as img:
+        if transpose and img.getexif().get(0x0112, 1) in _SWAPPING_ORIENTATIONS:
+            target_size = (target_size[1], target_size[0])
+        out = decode_for_size(img, target_size, fit, oversample)
+        if transpose:
+            out = ImageOps.exif_transpose(out)
+        # EN: Decode before the file closes / CN: 在文件关闭前完成解码
+        out.load()
+        return out
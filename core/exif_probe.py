@@ -0,0 +1,188 @@
+# core/exif_probe.py
+"""
+EN: Header-only probe for pixel size, EXIF orientation and DateTimeOriginal. JPEG reads only the
+    marker headers up to SOF plus the Exif APP1 segment, PNG reads IHDR and TIFF reads IFD0 and
+    the Exif IFD; nothing is decoded. Other formats fall back to a lazy PIL header open.
+CN: 仅读取文件头的探测器，获取像素尺寸、EXIF 方向与 DateTimeOriginal。JPEG 只读取 SOF 之前的标记头与
+    Exif APP1 段，PNG 只读 IHDR，TIFF 只读 IFD0 与 Exif IFD；不做任何解码。其他格式回退到 PIL 延迟打开文件头。
+"""
+
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+# EN: TIFF / EXIF tags / CN: TIFF / EXIF 标签
+TAG_WIDTH = 0x0100
+TAG_HEIGHT = 0x0101
+TAG_ORIENTATION = 0x0112
+TAG_EXIF_IFD = 0x8769
+TAG_DATETIME_ORIGINAL = 0x9003
+
+# EN: SOFn markers carrying frame size (DHT/JPG/DAC excluded) / CN: 携带帧尺寸的 SOFn 标记（排除 DHT/JPG/DAC）
+_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 7: 1, 9: 4}
+# EN: Thread count for probe_many (I/O bound) / CN: probe_many 的线程数（I/O 密集）
+PROBE_WORKERS = 8
+
+
+def _read_at(f, base, offset, n):
+    f.seek(base + offset)
+    data = f.read(n)
+    if len(data) != n:
+        raise ValueError("truncated TIFF structure")
+    return data
+
+
+def _read_ifd(f, base, offset, endian, wanted):
+    """
+    EN: Values of the wanted tags in one IFD (SHORT/LONG as int, ASCII as str).
+    CN: 读取单个 IFD 中所需标签的值（SHORT/LONG 为整数，ASCII 为字符串）。
+    """
+    count = struct.unpack(endian + "H", _read_at(f, base, offset, 2))[0]
+    table = _read_at(f, base, offset + 2, count * 12)
+    values = {}
+    for i in range(count):
+        tag, typ, n = struct.unpack_from(endian + "HHI", table, i * 12)
+        if tag not in wanted or typ not in _TYPE_SIZES or n == 0:
+            continue
+        size = _TYPE_SIZES[typ] * n
+        raw = table[i * 12 + 8:i * 12 + 12]
+        if size > 4:
+            raw = _read_at(f, base, struct.unpack(endian + "I", raw)[0], size)
+        if typ == 2:
+            values[tag] = raw[:size].split(b"\x00", 1)[0].decode("utf-8", "replace")
+        elif typ == 3:
+            values[tag] = struct.unpack_from(endian + "H", raw)[0]
+        elif typ in (4, 9):
+            values[tag] = struct.unpack_from(endian + "I", raw)[0]
+    return values
+
+
+def _parse_tiff(f, base, with_size=False):
+    """
+    EN: Parse a TIFF structure starting at `base` (a TIFF file, or the payload of a JPEG Exif APP1).
+    CN: 解析从 `base` 开始的 TIFF 结构（TIFF 文件本身，或 JPEG Exif APP1 的负载）。
+    """
+    head = _read_at(f, base, 0, 8)
+    if head[:2] == b"II":
+        endian = "<"
+    elif head[:2] == b"MM":
+        endian = ">"
+    else:
+        raise ValueError("bad TIFF byte order")
+    wanted = {TAG_ORIENTATION, TAG_EXIF_IFD}
+    if with_size:
+        wanted |= {TAG_WIDTH, TAG_HEIGHT}
+    ifd0 = _read_ifd(f, base, struct.unpack(endian + "I", head[4:8])[0], endian, wanted)
+    result = {'orientation': ifd0.get(TAG_ORIENTATION, 1), 'datetime': ""}
+    if with_size and TAG_WIDTH in ifd0 and TAG_HEIGHT in ifd0:
+        result['width'], result['height'] = ifd0[TAG_WIDTH], ifd0[TAG_HEIGHT]
+    if TAG_EXIF_IFD in ifd0:
+        exif = _read_ifd(f, base, ifd0[TAG_EXIF_IFD], endian, {TAG_DATETIME_ORIGINAL})
+        result['datetime'] = exif.get(TAG_DATETIME_ORIGINAL, "")
+    return result
+
+
+def _probe_jpeg(f):
+    result = {'orientation': 1, 'datetime': ""}
+    pos = 2
+    while True:
+        f.seek(pos)
+        head = f.read(4)
+        if len(head) < 4 or head[0] != 0xFF:
+            raise ValueError("bad JPEG marker")
+        marker = head[1]
+        if marker == 0xFF:
+            # EN: Fill byte before the marker / CN: 标记前的填充字节
+            pos += 1
+            continue
+        if marker == 0xD8 or 0xD0 <= marker <= 0xD7 or marker == 0x01:
+            pos += 2
+            continue
+        if marker in (0xD9, 0xDA):
+            raise ValueError("no SOF before image data")
+        length = struct.unpack(">H", head[2:4])[0]
+        if marker == 0xE1 and f.read(6) == b"Exif\x00\x00":
+            try:
+                result.update(_parse_tiff(f, pos + 10))
+            except (ValueError, struct.error):
+                pass
+        elif marker in _SOF_MARKERS:
+            h, w = struct.unpack(">xHH", f.read(5))
+            result['width'], result['height'] = w, h
+            # EN: Exif APP1 always precedes SOF / CN: Exif APP1 总是位于 SOF 之前
+            return result
+        pos += 2 + length
+
+
+def _probe_png(f):
+    f.seek(8)
+    length, ctype, w, h = struct.unpack(">I4sII", f.read(16))
+    if ctype != b"IHDR":
+        raise ValueError("PNG without IHDR")
+    return {'width': w, 'height': h, 'orientation': 1, 'datetime': ""}
+
+
+def _probe_pil(path):
+    with Image.open(path) as img:
+        exif = img.getexif()
+        dt = exif.get_ifd(TAG_EXIF_IFD).get(TAG_DATETIME_ORIGINAL, "")
+        return {'width': img.width, 'height': img.height,
+                'orientation': exif.get(TAG_ORIENTATION, 1), 'datetime': str(dt).rstrip("\x00")}
+
+
+def probe(path):
+    """
+    EN: {'width', 'height', 'orientation', 'datetime'} from the file header. Width/height match
+        PIL's img.size (stored size, except TIFF where PIL applies orientation); datetime is ""
+        when absent. Raises like Image.open when the file cannot be read.
+    CN: 从文件头读取 {'width', 'height', 'orientation', 'datetime'}。宽高与 PIL 的 img.size 一致
+        （即存储尺寸；TIFF 例外，PIL 已应用方向）；无拍摄时间时 datetime 为 ""。文件无法读取时与 Image.open 一样抛出异常。
+    """
+    with open(path, "rb") as f:
+        sig = f.read(8)
+        try:
+            if sig[:2] == b"\xff\xd8":
+                return _probe_jpeg(f)
+            if sig == _PNG_SIGNATURE:
+                return _probe_png(f)
+            if sig[:4] in (b"II*\x00", b"MM\x00*"):
+                result = _parse_tiff(f, 0, with_size=True)
+                if 'width' in result:
+                    # EN: PIL reports TIFF size with orientation applied / CN: PIL 报告的 TIFF 尺寸已应用方向
+                    if result['orientation'] in (5, 6, 7, 8):
+                        result['width'], result['height'] = result['height'], result['width']
+                    return result
+        except (ValueError, struct.error):
+            pass
+    return _probe_pil(path)
+
+
+def probe_size(path):
+    """EN: (width, height) as PIL reports it / CN: 与 PIL 一致的 (宽, 高)"""
+    info = probe(path)
+    return info['width'], info['height']
+
+
+def _probe_or_none(path):
+    try:
+        return probe(path)
+    except Exception:
+        return None
+
+
+def probe_many(paths, workers=PROBE_WORKERS):
+    """
+    EN: Probe many files on a thread pool. Returns {path: info}, with None for unreadable files.
+    CN: 使用线程池批量探测。返回 {路径: 信息}，无法读取的文件对应 None。
+    """
+    paths = list(paths)
+    if not paths:
+        return {}
+    workers = max(1, min(workers, len(paths)))
+    if workers == 1:
+        return {p: _probe_or_none(p) for p in paths}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(paths, pool.map(_probe_or_none, paths)))
@@ -1,5 +1,6 @@
 # core/film_simulator.py
 from PIL import Image, ImageDraw, ImageFont
+from core.sprite_atlas import sprite_atlas
 
 class FilmSimulator:
     """
@@ -22,13 +23,16 @@ class FilmSimulator:
         """
         EN: Creates a vertical transparent layer with amber text.
         CN: 创建一个带有琥珀色文字的垂直透明图层。
+        EN: Cached in the sprite atlas per (font, text, colour) / CN: 按 (字体, 文本, 颜色) 缓存在贴图图集中
         """
-        txt_img = Image.new('RGBA', (1200, 80), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(txt_img)
-        draw.text((0, 10), text, font=self.font, fill=self.fuji_amber)
-        # EN: Rotate 90 degrees to fit the side of the film strip
-        # CN: 旋转 90 度以符合胶片侧边排布
-        return txt_img.rotate(90, expand=True)
+        def build():
+            txt_img = Image.new('RGBA', (1200, 80), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(txt_img)
+            draw.text((0, 10), text, font=self.font, fill=self.fuji_amber)
+            # EN: Rotate 90 degrees to fit the side of the film strip
+            # CN: 旋转 90 度以符合胶片侧边排布
+            return txt_img.rotate(90, expand=True)
+        return sprite_atlas.rotated_layer("sim", self.font, text, self.fuji_amber, 90, build)
 
     def draw_markings(self, canvas, x, y, w, h, film_full_name, frame_idx, emulsion=""):
         """
@@ -0,0 +1,114 @@
+# core/font_service.py
+"""
+EN: Process-wide FreeType font service. Faces are cached in a bounded, lock-protected LRU keyed by
+    (path, index, size), so preview threads, batch workers and contact sheet renderers share warm
+    fonts instead of calling ImageFont.truetype for every draw.
+CN: 进程级 FreeType 字体服务。字体以 (path, index, size) 为键存入有界、加锁的 LRU 缓存，
+    预览线程、批处理进程与底片渲染器共享已加载字体，不再每次绘制都调用 ImageFont.truetype。
+"""
+
+import threading
+from collections import OrderedDict
+
+from PIL import ImageFont
+
+
+class FontService:
+    """
+    EN: Bounded LRU of ImageFont.FreeTypeFont objects with load / hit metrics.
+    CN: 带加载 / 命中统计的 ImageFont.FreeTypeFont 有界 LRU 缓存。
+    """
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self._fonts = OrderedDict()
+        self._lock = threading.Lock()
+        self._default = None
+        self.loads = 0
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self.evictions = 0
+
+    def get(self, path, size, index=None):
+        """
+        EN: Return a cached FreeTypeFont; raises OSError like ImageFont.truetype when loading fails.
+        CN: 返回缓存的 FreeTypeFont；加载失败时与 ImageFont.truetype 一样抛出 OSError。
+        """
+        # EN: Collections (.ttc) use face 0 unless told otherwise / CN: 字体集合 (.ttc) 默认使用第 0 个字体
+        key = (path, 0 if index is None else int(index), int(size))
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is not None:
+                self._fonts.move_to_end(key)
+                self.hits += 1
+                return font
+            self.misses += 1
+
+        # EN: Load outside the lock; a concurrent duplicate load is harmless
+        # CN: 在锁外加载；并发重复加载无副作用
+        try:
+            font = ImageFont.truetype(path, key[2], index=key[1])
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            raise
+
+        with self._lock:
+            self.loads += 1
+            existing = self._fonts.get(key)
+            if existing is not None:
+                return existing
+            self._fonts[key] = font
+            while len(self._fonts) > self.capacity:
+                self._fonts.popitem(last=False)
+                self.evictions += 1
+        return font
+
+    def get_or_default(self, path, size, index=None):
+        """EN: Like get(), but falls back to Pillow's default font / CN: 同 get()，失败时回退到 Pillow 默认字体"""
+        try:
+            return self.get(path, size, index)
+        except Exception:
+            return self.default_font()
+
+    def variant(self, font, size):
+        """
+        EN: Cached replacement for font.font_variant(size=...). Fonts without a file path
+            (e.g. the built-in default) fall back to font_variant.
+        CN: font.font_variant(size=...) 的缓存版本。无文件路径的字体（如内置默认字体）回退到 font_variant。
+        """
+        path = getattr(font, "path", None)
+        if isinstance(path, str):
+            try:
+                return self.get(path, size, getattr(font, "index", 0))
+            except Exception:
+                pass
+        if hasattr(font, "font_variant"):
+            return font.font_variant(size=size)
+        return font
+
+    def default_font(self):
+        with self._lock:
+            if self._default is None:
+                self._default = ImageFont.load_default()
+            return self._default
+
+    def clear(self):
+        with self._lock:
+            self._fonts.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'loads': self.loads,
+                'hits': self.hits,
+                'misses': self.misses,
+                'failures': self.failures,
+                'evictions': self.evictions,
+                'size': len(self._fonts),
+            }
+
+
+# EN: Shared by every renderer in this process / CN: 本进程内所有渲染器共享
+font_service = FontService(capacity=64)
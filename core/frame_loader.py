@@ -0,0 +1,91 @@
+# core/frame_loader.py
+"""
+EN: Prefetching frame loader for contact sheet renderers. Frames are opened, rotated and resized
+    on a thread pool (Pillow releases the GIL while decoding and resampling) ahead of compositing;
+    the renderer takes them back in placement order. Only `window` frames are in flight or waiting
+    at any time, so memory stays bounded regardless of roll length.
+CN: 接触印相渲染器的预取帧加载器。帧的打开、旋转与缩放在线程池中提前完成（Pillow 解码与重采样时会释放 GIL），
+    渲染器按排版顺序取回。任意时刻最多只有 `window` 帧在处理或等待，内存占用与胶卷张数无关。
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+# EN: Decode threads per sheet / CN: 每张索引页的解码线程数
+FRAME_LOADER_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+
+def _load_frame(path, prepare):
+    with Image.open(path) as img:
+        frame = prepare(img)
+        # EN: Detach from the file before the handle closes / CN: 在文件句柄关闭前与文件解绑
+        frame.load()
+        return frame
+
+
+class FrameLoader:
+    """
+    EN: Sliding-window prefetcher over `paths`. `prepare(img)` turns an opened PIL image into the
+        frame to paste (rotate / resize); None paths yield None. Use as a context manager or call
+        close() when done.
+    CN: 基于 `paths` 的滑动窗口预取器。`prepare(img)` 将打开的 PIL 图像处理为待粘贴的帧（旋转 / 缩放）；
+        路径为 None 时返回 None。以上下文管理器方式使用，或用完后调用 close()。
+    """
+
+    def __init__(self, paths, prepare, workers=None, window=None):
+        self.paths = list(paths)
+        self.prepare = prepare
+        self.workers = workers or FRAME_LOADER_WORKERS
+        self.window = window or self.workers * 2
+        self._pool = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        self._pending = {}
+        self._next = 0
+        self._fill(0)
+
+    def _fill(self, start):
+        if self._pool is None:
+            return
+        self._next = max(self._next, start)
+        while self._next < len(self.paths) and self._next < start + self.window:
+            path = self.paths[self._next]
+            if path is not None:
+                self._pending[self._next] = self._pool.submit(_load_frame, path, self.prepare)
+            self._next += 1
+
+    def get(self, idx):
+        """
+        EN: Frame for position `idx` (blocks until ready); each index is handed out once.
+            Decode errors are raised here, as the serial Image.open path would.
+        CN: 返回位置 `idx` 的帧（未完成时阻塞）；每个索引只交付一次。解码异常在此抛出，与串行 Image.open 行为一致。
+        """
+        if self.paths[idx] is None:
+            frame = None
+        elif self._pool is None:
+            frame = _load_frame(self.paths[idx], self.prepare)
+        else:
+            future = self._pending.pop(idx, None)
+            frame = future.result() if future is not None else _load_frame(self.paths[idx], self.prepare)
+        self._fill(idx + 1)
+        return frame
+
+    def close(self, wait=True):
+        """EN: Cancel queued frames and stop the pool / CN: 取消排队中的帧并关闭线程池"""
+        if getattr(self, '_pool', None) is not None:
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def __del__(self):
+        # EN: Safety net when a render aborts before close() / CN: 渲染在 close() 之前中断时的兜底
+        self.close(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
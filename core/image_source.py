@@ -0,0 +1,177 @@
+# core/image_source.py
+"""
+EN: Read-once image source. The PIL header, exifread tags and the piexif dictionary are parsed
+    lazily from file handles (only the header / EXIF blocks are touched) and cached, so metadata,
+    decode, orientation and EXIF re-embedding never read the pixel data more than once, whatever
+    the file size. The decode itself streams the file a single time.
+CN: 只读一次的图像源。PIL 文件头、exifread 标签与 piexif 字典从文件句柄延迟解析（只读取文件头 / EXIF 数据块）
+    并缓存，无论文件多大，元数据提取、解码、方向校正与 EXIF 回写都不会重复读取像素数据。解码本身只流式读取文件一次。
+"""
+
+import os
+import copy
+import mmap
+import threading
+from collections import OrderedDict
+
+import exifread
+from PIL import Image
+
+try:
+    import piexif
+except ImportError:
+    piexif = None
+
+# EN: EXIF Orientation tag / CN: EXIF 方向标签
+ORIENTATION_TAG = 0x0112
+# EN: Parsed sources kept (header + tags only, a few KB each) / CN: 保留的已解析图像源数量（仅文件头与标签，每个数 KB）
+SOURCE_CACHE_SIZE = 512
+
+
+class ImageSource:
+    """
+    EN: One image file. Parsing results are cached on the instance; no file bytes are held.
+    CN: 单个图像文件；解析结果缓存在实例上，不持有文件字节。
+    """
+
+    def __init__(self, path, stamp=None):
+        self.path = path
+        # EN: (mtime_ns, size) identifies the on-disk version / CN: (mtime_ns, size) 标识磁盘上的文件版本
+        if stamp is None:
+            st = os.stat(path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        self.stamp = stamp
+        self._lock = threading.Lock()
+        self._header = None
+        self._tags = None
+        self._exif_dict = None
+
+    def stream(self):
+        """EN: Fresh binary file handle / CN: 新的二进制文件句柄"""
+        return open(self.path, 'rb')
+
+    def open_image(self):
+        """
+        EN: Lazily-decoding PIL image; only the header is read until load (draft / exif_transpose work as usual).
+        CN: 延迟解码的 PIL 图像；load 之前只读取文件头（draft / exif_transpose 用法不变）。
+        """
+        return Image.open(self.path)
+
+    def _parse_header(self):
+        with self._lock:
+            if self._header is None:
+                with self.open_image() as img:
+                    exif = img.getexif()
+                    self._header = {
+                        'size': img.size,
+                        'format': img.format,
+                        'mode': img.mode,
+                        'orientation': exif.get(ORIENTATION_TAG, 1),
+                        'exif': img.info.get('exif', b""),
+                    }
+            return self._header
+
+    @property
+    def size(self):
+        """EN: Stored pixel size (before orientation) / CN: 存储的像素尺寸（未做方向校正）"""
+        return self._parse_header()['size']
+
+    @property
+    def format(self):
+        return self._parse_header()['format']
+
+    @property
+    def orientation(self):
+        return self._parse_header()['orientation']
+
+    @property
+    def exif_bytes(self):
+        """EN: Raw EXIF block as PIL exposes it / CN: PIL 提供的原始 EXIF 数据块"""
+        return self._parse_header()['exif']
+
+    def exif_tags(self):
+        """EN: exifread tags (details=False), parsed once / CN: exifread 标签（details=False），只解析一次"""
+        with self._lock:
+            if self._tags is None:
+                with self.stream() as f:
+                    self._tags = exifread.process_file(f, details=False)
+            return self._tags
+
+    def piexif_dict(self):
+        """
+        EN: Deep copy of the piexif dictionary (callers patch it freely); raises like piexif.load.
+            Parsed from the EXIF block PIL already holds; TIFF-style files without one are mapped,
+            so only the IFD pages are read.
+        CN: piexif 字典的深拷贝（调用方可自由修改）；异常行为与 piexif.load 一致。
+            从 PIL 已读取的 EXIF 数据块解析；没有该数据块的 TIFF 类文件通过内存映射读取，只访问 IFD 所在页。
+        """
+        if piexif is None:
+            return None
+        raw = self.exif_bytes
+        with self._lock:
+            if self._exif_dict is None:
+                if raw:
+                    self._exif_dict = piexif.load(raw)
+                else:
+                    with self.stream() as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        self._exif_dict = piexif.load(mm)
+            return copy.deepcopy(self._exif_dict)
+
+
+class ImageSourceCache:
+    """
+    EN: Thread-safe LRU of ImageSource objects; entries are revalidated against (mtime, size)
+        so edited files are re-parsed.
+    CN: ImageSource 对象的线程安全 LRU；条目会按 (mtime, size) 重新校验，文件被修改后会重新解析。
+    """
+
+    def __init__(self, capacity=SOURCE_CACHE_SIZE):
+        self.capacity = capacity
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.reads = 0
+
+    def get(self, path):
+        key = os.path.normcase(os.path.abspath(path))
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            src = self._items.get(key)
+            if src is not None and src.stamp == stamp:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return src
+
+        src = ImageSource(path, stamp)
+        with self._lock:
+            self.reads += 1
+            self._items.pop(key, None)
+            self._items[key] = src
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+        return src
+
+    def discard(self, path):
+        key = os.path.normcase(os.path.abspath(path))
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'reads': self.reads, 'size': len(self._items)}
+
+
+# EN: Shared by metadata, renderer and EXIF writer in this process / CN: 本进程内元数据、渲染器与 EXIF 写入共享
+image_source_cache = ImageSourceCache()
+
+
+def get_image_source(path):
+    """EN: Shared ImageSource for a path / CN: 获取路径对应的共享 ImageSource"""
+    if isinstance(path, ImageSource):
+        return path
+    return image_source_cache.get(path)
@@ -0,0 +1,190 @@
+# core/kerning.py
+"""
+EN: Precompiled pair-kerning tables. Each font is parsed once (lazily, via fontTools) into
+    integer-keyed pair adjustments from GPOS PairPos ('kern' feature) or the legacy 'kern'
+    table; the per-size scale is applied on lookup.
+CN: 预编译的字偶距表。每个字体只解析一次（通过 fontTools 延迟加载），
+    从 GPOS PairPos（'kern' 特性）或旧版 'kern' 表生成以整数为键的字偶调整值；按字号缩放在查询时计算。
+"""
+
+import threading
+
+try:
+    from fontTools.ttLib import TTFont
+except ImportError:
+    TTFont = None
+
+
+def _pair_key(left, right):
+    """EN: Pack two code points into one int (21 bits each) / CN: 将两个码位打包为一个整数（各 21 位）"""
+    return (ord(left) << 21) | ord(right)
+
+
+class _PairSubtable:
+    """EN: GPOS PairPos format 1 (explicit glyph pairs) / CN: GPOS PairPos 格式 1（显式字偶）"""
+
+    def __init__(self, st, glyph_codes):
+        self.first = set()
+        self.pairs = {}
+        for idx, g1 in enumerate(st.Coverage.glyphs):
+            codes1 = glyph_codes.get(g1)
+            if not codes1 or idx >= len(st.PairSet):
+                continue
+            self.first.update(codes1)
+            for rec in st.PairSet[idx].PairValueRecord:
+                x_adv = getattr(rec.Value1, "XAdvance", 0) if rec.Value1 else 0
+                for c2 in glyph_codes.get(rec.SecondGlyph, ()):
+                    for c1 in codes1:
+                        self.pairs.setdefault((c1 << 21) | c2, x_adv)
+
+    def get(self, c1, c2):
+        """EN: None = not applicable (fall through to next subtable) / CN: None 表示不适用（继续下一子表）"""
+        if c1 not in self.first:
+            return None
+        return self.pairs.get((c1 << 21) | c2)
+
+
+class _ClassSubtable:
+    """EN: GPOS PairPos format 2 (class-based) / CN: GPOS PairPos 格式 2（基于字形类）"""
+
+    def __init__(self, st, glyph_codes):
+        self.first = set()
+        for g1 in st.Coverage.glyphs:
+            self.first.update(glyph_codes.get(g1, ()))
+        self.class1 = {}
+        for g, cls in (st.ClassDef1.classDefs if st.ClassDef1 else {}).items():
+            for c in glyph_codes.get(g, ()):
+                self.class1[c] = cls
+        self.class2 = {}
+        for g, cls in (st.ClassDef2.classDefs if st.ClassDef2 else {}).items():
+            for c in glyph_codes.get(g, ()):
+                self.class2[c] = cls
+        self.matrix = [[(getattr(r2.Value1, "XAdvance", 0) or 0) if r2.Value1 else 0 for r2 in r1.Class2Record]
+                       for r1 in st.Class1Record]
+
+    def get(self, c1, c2):
+        if c1 not in self.first:
+            return None
+        row = self.matrix[self.class1.get(c1, 0)]
+        cls2 = self.class2.get(c2, 0)
+        return row[cls2] if cls2 < len(row) else 0
+
+
+class KerningTable:
+    """
+    EN: Compiled kerning for one font face. lookup() returns font units; offset() returns pixels.
+    CN: 单个字体的已编译字偶距。lookup() 返回字体单位，offset() 返回像素值。
+    """
+
+    def __init__(self, font_path, font_number=0):
+        self.upm = 1000
+        self.pairs = {}       # EN: legacy 'kern' pairs: int key -> units
+        self.lookups = []     # EN: GPOS lookups: [[subtable, ...], ...]
+        self._memo = {}       # EN: resolved GPOS pairs: int key -> units
+        self._load(font_path, font_number)
+
+    def _load(self, font_path, font_number):
+        if TTFont is None:
+            return
+        kwargs = {"lazy": True}
+        if font_path.lower().endswith(".ttc"):
+            kwargs["fontNumber"] = font_number
+        ttfont = TTFont(font_path, **kwargs)
+        try:
+            self.upm = ttfont["head"].unitsPerEm or 1000
+            cmap = ttfont.getBestCmap() or {}
+            glyph_codes = {}
+            for code, glyph in cmap.items():
+                glyph_codes.setdefault(glyph, []).append(code)
+
+            if "GPOS" in ttfont:
+                self._load_gpos(ttfont["GPOS"].table, glyph_codes)
+            # EN: Shapers ignore 'kern' when GPOS kerning exists / CN: 存在 GPOS 字偶距时排版引擎会忽略 'kern' 表
+            if not self.lookups and "kern" in ttfont:
+                self._load_kern(ttfont["kern"], glyph_codes)
+        finally:
+            ttfont.close()
+
+    def _load_gpos(self, gpos, glyph_codes):
+        if not gpos.FeatureList or not gpos.LookupList:
+            return
+        indices = set()
+        for rec in gpos.FeatureList.FeatureRecord:
+            if rec.FeatureTag == "kern":
+                indices.update(rec.Feature.LookupListIndex)
+        for li in sorted(indices):
+            lookup = gpos.LookupList.Lookup[li]
+            subtables = []
+            for st in lookup.SubTable:
+                # EN: Unwrap Extension (type 9) subtables / CN: 展开扩展（类型 9）子表
+                if lookup.LookupType == 9:
+                    if st.ExtensionLookupType != 2:
+                        continue
+                    st = st.ExtSubTable
+                elif lookup.LookupType != 2:
+                    continue
+                if st.Format == 1:
+                    subtables.append(_PairSubtable(st, glyph_codes))
+                elif st.Format == 2:
+                    subtables.append(_ClassSubtable(st, glyph_codes))
+            if subtables:
+                self.lookups.append(subtables)
+
+    def _load_kern(self, kern, glyph_codes):
+        for sub in getattr(kern, "kernTables", []):
+            if getattr(sub, "format", None) != 0 or not hasattr(sub, "kernTable"):
+                continue
+            for (g1, g2), value in sub.kernTable.items():
+                for c1 in glyph_codes.get(g1, ()):
+                    for c2 in glyph_codes.get(g2, ()):
+                        key = (c1 << 21) | c2
+                        self.pairs[key] = self.pairs.get(key, 0) + value
+
+    def lookup(self, left, right):
+        """EN: Pair adjustment in font units / CN: 字偶调整值（字体单位）"""
+        key = _pair_key(left, right)
+        value = self.pairs.get(key)
+        if value is not None:
+            return value
+        if not self.lookups:
+            return 0
+        value = self._memo.get(key)
+        if value is None:
+            c1, c2 = ord(left), ord(right)
+            value = 0
+            for subtables in self.lookups:
+                for st in subtables:
+                    v = st.get(c1, c2)
+                    if v is not None:
+                        value += v
+                        break
+            self._memo[key] = value
+        return value
+
+    def offset(self, left, right, font_size):
+        """EN: Conversion formula: (Units / EM) * FontSize / CN: 转换公式：(Units / EM) * FontSize"""
+        units = self.lookup(left, right)
+        return (units / self.upm) * font_size if units else 0
+
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def get_kerning_table(font_path, font_number=0):
+    """
+    EN: Shared, size-independent KerningTable per font (None if the font cannot be parsed).
+    CN: 获取按字体共享、与字号无关的 KerningTable（字体无法解析时返回 None）。
+    """
+    key = (font_path, font_number)
+    with _tables_lock:
+        if key in _tables:
+            return _tables[key]
+    try:
+        table = KerningTable(font_path, font_number)
+    except Exception as e:
+        print(f"CN: [!] 字偶距表解析失败 / EN: Kerning table load failed: {font_path} ({e})")
+        table = None
+    with _tables_lock:
+        _tables[key] = table
+    return table
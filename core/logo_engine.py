@@ -0,0 +1,195 @@
+# core/logo_engine.py
+"""
+EN: Camera logo helpers: vectorized theme tinting and a shared sprite cache for rasterized logos.
+CN: 相机 Logo 辅助模块：栅格化 Logo 的向量化主题着色与共享贴图缓存。
+"""
+
+import os
+import threading
+
+from PIL import Image, ImageChops
+
+from core.sprite_cache import SpriteDiskCache, DISK_CACHE_MAX_FILES
+from utils.config_manager import config_manager
+
+# EN: Dark-neutral detection thresholds (black ink vs. brand colours such as Leica red)
+# CN: 暗中性色识别阈值（区分黑色墨迹与徕卡红等品牌色）
+TINT_DARK_MAX = 180
+TINT_NEUTRAL_MAX_DIFF = 40
+
+
+def is_black_tint(color):
+    """EN: Near-black theme colours keep the original logo / CN: 接近黑色的主题色保持 Logo 原样"""
+    return color[0] < 40 and color[1] < 40 and color[2] < 40
+
+
+def tint_logo(logo_img, color):
+    """
+    EN: Recolour dark neutral pixels (r, g, b < 180 and |r-g|, |g-b| < 40) to `color`,
+        keeping alpha and preserving saturated brand colours. Returns a new RGBA image.
+    CN: 将暗中性色像素（r, g, b < 180 且 |r-g|、|g-b| < 40）染为 `color`，
+        保留透明度与高饱和品牌色。返回新的 RGBA 图像。
+    """
+    if logo_img.mode != 'RGBA':
+        logo_img = logo_img.convert('RGBA')
+    color = tuple(int(c) for c in color[:3])
+
+    # EN: Whole-image channel ops (C-level, no per-pixel Python); benchmarked faster than NumPy masks
+    # CN: 整图通道运算（C 层执行，无逐像素 Python 循环）；实测快于 NumPy 掩码方案
+    r, g, b, a = logo_img.split()
+    dark_lut = [255 if v < TINT_DARK_MAX else 0 for v in range(256)]
+    near_lut = [255 if v < TINT_NEUTRAL_MAX_DIFF else 0 for v in range(256)]
+    # EN: 0/255 masks combined with multiply == logical AND / CN: 0/255 掩码相乘即逻辑与
+    mask = r.point(dark_lut)
+    for part in (g.point(dark_lut), b.point(dark_lut),
+                 ImageChops.difference(r, g).point(near_lut),
+                 ImageChops.difference(g, b).point(near_lut)):
+        mask = ImageChops.multiply(mask, part)
+    tinted = Image.composite(Image.new('RGB', logo_img.size, color), Image.merge('RGB', (r, g, b)), mask)
+    tinted.putalpha(a)
+    return tinted
+
+
+class LogoSpriteCache(SpriteDiskCache):
+    """
+    EN: Process-wide cache of finished logo sprites (rasterized, cropped, scaled, tinted),
+        keyed by (logo_path, mtime, target_h, tint), with the shared sprite LRU and PNG mirror.
+    CN: 进程级已完成 Logo 贴图缓存（已栅格化、裁剪、缩放、着色），键为 (logo_path, mtime, target_h, tint)，
+        使用通用贴图 LRU 与磁盘 PNG 镜像。
+    """
+
+    def __init__(self, capacity=32, disk_dir=None, disk_max_files=DISK_CACHE_MAX_FILES):
+        super().__init__(capacity, disk_dir, disk_max_files, label=("Logo", "Logo"))
+
+    @staticmethod
+    def make_key(logo_path, target_h, tint=None):
+        """EN: Build cache key; mtime invalidates edited / re-synced logos / CN: 构建缓存键；mtime 使被修改或重新同步的 Logo 失效"""
+        try:
+            mtime = os.stat(logo_path).st_mtime_ns
+        except OSError:
+            mtime = 0
+        tint = tuple(int(c) for c in tint[:3]) if tint is not None else None
+        return (os.path.normcase(os.path.abspath(logo_path)), mtime, int(target_h), tint)
+
+
+def _default_disk_dir():
+    if not config_manager.get("logo_disk_cache", True):
+        return None
+    return os.path.join(config_manager.config_dir, "cache", "logos")
+
+
+# EN: Shared by every FilmRenderer in this process / CN: 本进程内所有 FilmRenderer 共享
+logo_sprite_cache = LogoSpriteCache(capacity=32, disk_dir=_default_disk_dir())
+
+
+# EN: Extensions accepted in the logo folder / CN: Logo 目录中接受的扩展名
+LOGO_EXTS = (".svg", ".png", ".jpg", ".jpeg")
+# EN: Strict-pass priority (JPEG long form is only reachable via loose matching, as before)
+# CN: 严格匹配的优先级（与旧逻辑一致，.jpeg 只参与宽松匹配）
+STRICT_EXTS = (".SVG", ".PNG", ".JPG")
+
+
+def _alnum(s):
+    return "".join(c for c in s if c.isalnum())
+
+
+class LogoIndex:
+    """
+    EN: One-shot index of a logo directory: upper-cased file names, every '-'/'_' suffix stem
+        and alnum-normalized stems, all mapped to file names for O(1) lookups.
+    CN: Logo 目录的一次性索引：大写文件名、所有 '-'/'_' 后缀词干与仅字母数字的规范化词干，
+        均映射到文件名，实现 O(1) 检索。
+    """
+
+    def __init__(self, l_dir):
+        self.l_dir = l_dir
+        self.mtime = os.stat(l_dir).st_mtime_ns
+        self.exact = {}
+        # EN: suffix / norm maps keep (listing order, name) so ties resolve like the old linear scan
+        # CN: 后缀 / 规范化映射保存 (列举顺序, 文件名)，冲突时与旧版线性扫描结果一致
+        self.suffix = {}
+        self.norm = {}
+
+        names = [f for f in os.listdir(l_dir) if f.lower().endswith(LOGO_EXTS)]
+        for order, name in enumerate(names):
+            key = name.upper()
+            self.exact[key] = name
+            stem = os.path.splitext(key)[0]
+            for i, ch in enumerate(stem):
+                if ch in "-_":
+                    self.suffix.setdefault(stem[i + 1:], (order, name))
+            self.norm.setdefault(_alnum(stem), (order, name))
+
+    def lookup(self, make_u, model_u):
+        """EN: Return file path or None (make_u / model_u already upper-cased) / CN: 返回文件路径或 None（参数已大写）"""
+        search_stems = []
+        if make_u:
+            search_stems.append(f"{make_u}-{model_u}")
+            search_stems.append(f"{make_u}_{model_u}")
+            search_stems.append(f"{make_u}{model_u}")
+        search_stems.append(model_u)
+
+        # EN: First pass - strict matching with candidate stems / CN: 第一轮 - 候选词干严格匹配
+        for stem in search_stems:
+            for ext in STRICT_EXTS:
+                name = self.exact.get(f"{stem}{ext}")
+                if name:
+                    return os.path.join(self.l_dir, name)
+
+        # EN: Second pass - suffix or alnum-normalized match, earliest listed file wins
+        # CN: 第二轮 - 后缀或规范化匹配，列举顺序靠前者优先
+        hits = [h for h in (self.suffix.get(model_u), self.norm.get(_alnum(model_u))) if h]
+        if hits:
+            return os.path.join(self.l_dir, min(hits)[1])
+        return None
+
+
+_logo_indexes = {}
+_logo_index_lock = threading.Lock()
+
+
+def get_logo_index(l_dir):
+    """
+    EN: Cached LogoIndex for a directory; rebuilt when the directory mtime changes.
+    CN: 获取目录的缓存索引；目录 mtime 变化时自动重建。
+    """
+    try:
+        mtime = os.stat(l_dir).st_mtime_ns
+    except OSError:
+        return None
+    with _logo_index_lock:
+        index = _logo_indexes.get(l_dir)
+        if index is None or index.mtime != mtime:
+            try:
+                index = LogoIndex(l_dir)
+            except OSError:
+                return None
+            _logo_indexes[l_dir] = index
+        return index
+
+
+def invalidate_logo_index():
+    """
+    EN: Drop all logo indexes and in-memory sprites (called after asset sync, since
+        overwriting existing files does not change the directory mtime).
+    CN: 清空所有 Logo 索引与内存贴图（资源同步后调用，因为覆盖已有文件不会改变目录 mtime）。
+    """
+    with _logo_index_lock:
+        _logo_indexes.clear()
+    logo_sprite_cache.clear()
+
+
+def find_logo(search_dirs, make, model):
+    """EN: Case-insensitive logo lookup across directories / CN: 跨目录的不区分大小写 Logo 检索"""
+    make_u = str(make or "").upper().strip()
+    model_u = str(model or "").upper().strip()
+    if not model_u:
+        return None
+    for l_dir in search_dirs:
+        index = get_logo_index(l_dir)
+        if index is None:
+            continue
+        path = index.lookup(make_u, model_u)
+        if path:
+            return path
+    return None
@@ -2,10 +2,11 @@
 import os
 import sys
 import json
-import exifread
 from fractions import Fraction
-from PIL import Image
 from utils.config_manager import config_manager
+from core.image_source import get_image_source
+from core.metadata_cache import metadata_cache
+from core.exif_probe import probe_size
 
 class MetadataHandler:
     def __init__(self, layout_config='layouts.json', films_config='films.json', contact_config='contact_layouts.json'):
@@ -121,26 +122,71 @@ class MetadataHandler:
         return None
 
 
-    def get_data(self, img_path, is_digital_mode=False, manual_film=None):
-        """ CN: 核心数据提取逻辑。 [必要修改 2/3] 增加 manual_film 参数默认值，确保 Renderer66/67 等调用不报错。 """
-        with open(img_path, 'rb') as f:
-            tags = exifread.process_file(f, details=False)
+    def get_raw_fields(self, img_path):
+        """
+        EN: Raw EXIF fields + pixel size, served from the persistent metadata cache when the
+            file (path, size, mtime) is unchanged.
+        CN: 原始 EXIF 字段与像素尺寸；文件 (路径, 大小, mtime) 未变化时直接读取持久化元数据缓存。
+        """
+        try:
+            key = metadata_cache.make_key(img_path)
+        except OSError:
+            key = None
+        if key is not None:
+            fields = metadata_cache.get(key)
+            if fields is not None:
+                return fields
+        fields = self._extract_raw_fields(img_path)
+        if key is not None:
+            metadata_cache.put(key, fields)
+        return fields
+
+    def _extract_raw_fields(self, img_path):
+        # EN: The shared source parses header and EXIF once for exifread, the size probe and the EXIF writer
+        # CN: 共享图像源只解析一次文件头与 EXIF，同时服务 exifread、尺寸读取与 EXIF 写入
+        src = get_image_source(img_path)
+        tags = src.exif_tags()
 
         # --- 基础 EXIF 提取逻辑 (完全保留，不改动任何变量名) ---
-        make = str(tags.get('Image Make', 'Unknown'))
-        model = str(tags.get('Image Model', 'Unknown'))
-        lens = str(tags.get('EXIF LensModel', 'Unknown Lens'))
         f_num = tags.get('EXIF FNumber')
-        aperture_str = str(float(f_num.values[0])) if f_num else None
         expo = tags.get('EXIF ExposureTime')
-        shutter_str = str(expo.values[0]) if expo else None
         focal = tags.get('EXIF FocalLength')
         focal_val = float(focal.values[0].num) / float(focal.values[0].den) if focal else 0
-        focal_str = f"{int(focal_val)}mm" if focal_val > 0 else None
         dt = tags.get('EXIF DateTimeOriginal') #or tags.get('Image DateTime')
-        dt_str = str(dt.values) if dt else ""
         iso = tags.get('EXIF ISOSpeedRatings')
-        iso_str = str(iso.values[0]) if iso else ""
+        w, h = src.size
+        return {
+            'make': str(tags.get('Image Make', 'Unknown')),
+            'model': str(tags.get('Image Model', 'Unknown')),
+            'lens': str(tags.get('EXIF LensModel', 'Unknown Lens')),
+            'aperture': str(float(f_num.values[0])) if f_num else None,
+            'shutter': str(expo.values[0]) if expo else None,
+            'focal': f"{int(focal_val)}mm" if focal_val > 0 else None,
+            'datetime': str(dt.values) if dt else "",
+            'iso': str(iso.values[0]) if iso else "",
+            # EN: Description fields scanned for film keywords / CN: 用于扫描胶片关键字的描述字段
+            'descriptions': [str(tags.get('Image ImageDescription', '')),
+                             str(tags.get('EXIF UserComment', '')),
+                             str(tags.get('EXIF ImageDescription', ''))],
+            'width': w,
+            'height': h,
+        }
+
+    def cache_stats(self):
+        """EN: Persistent metadata cache statistics / CN: 持久化元数据缓存统计"""
+        return metadata_cache.stats()
+
+    def get_data(self, img_path, is_digital_mode=False, manual_film=None):
+        """ CN: 核心数据提取逻辑。 [必要修改 2/3] 增加 manual_film 参数默认值，确保 Renderer66/67 等调用不报错。 """
+        raw = self.get_raw_fields(img_path)
+        make = raw['make']
+        model = raw['model']
+        lens = raw['lens']
+        aperture_str = raw['aperture']
+        shutter_str = raw['shutter']
+        focal_str = raw['focal']
+        dt_str = raw['datetime']
+        iso_str = raw['iso']
 
         # --- [核心逻辑修复] 三级识别引擎 ---
         display_film = ""
@@ -171,9 +217,7 @@ class MetadataHandler:
                 # EN: Auto-detection from EXIF (only when manual_film is not specified)
                 # CN: 从EXIF自动识别（仅在未指定手动胶片时）
                 # 1. 自动扫描 (合并多个 Description 字段以体现专业性)
-                d1 = str(tags.get('Image ImageDescription', ''))
-                d2 = str(tags.get('EXIF UserComment', ''))
-                d3 = str(tags.get('EXIF ImageDescription', ''))
+                d1, d2, d3 = raw['descriptions']
                 # 补充扫描位
                 search_pool = f"{d1} {d2} {d3}".upper()
 
@@ -190,10 +234,9 @@ class MetadataHandler:
                     contact_color = tuple(auto_bundle["color"])
 
         # --- 布局参数计算 (完全保留) ---
-        with Image.open(img_path) as img:
-            w, h = img.size
-            ratio = max(w, h) / min(w, h)
-            is_portrait = h > w
+        w, h = raw['width'], raw['height']
+        ratio = max(w, h) / min(w, h)
+        is_portrait = h > w
 
         layout_params = {"name": "CUSTOM", "side": 0.04, "top": 0.04, "bottom": 0.13, "font_scale": 0.032, "is_portrait": is_portrait}
         for name, cfg in self.layout_db.items():
@@ -221,10 +264,9 @@ class MetadataHandler:
 
 
     def detect_batch_layout(self, img_paths):
-        with Image.open(img_paths[0]) as img:
-            w, h = img.size
-            ratio = max(w, h) / min(w, h)
-            is_portrait = h > w
+        w, h = probe_size(img_paths[0])
+        ratio = max(w, h) / min(w, h)
+        is_portrait = h > w
         
         # EN: Map aspect ratio to layout name / CN: 将宽高比映射到布局名称
         if 0.95 <= ratio <= 1.05:
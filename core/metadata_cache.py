@@ -0,0 +1,130 @@
+# core/metadata_cache.py
+"""
+EN: Persistent SQLite cache of raw EXIF fields and pixel dimensions, keyed by
+    (absolute path, file size, mtime). Only extracted values are stored; film matching and
+    layout selection are recomputed from them, so config changes still take effect.
+CN: 基于 SQLite 的持久化缓存，保存原始 EXIF 字段与像素尺寸，键为 (绝对路径, 文件大小, mtime)。
+    只存储提取出的原始值；胶片匹配与画幅布局仍据此重新计算，配置修改依然即时生效。
+"""
+
+import os
+import json
+import sqlite3
+import threading
+
+from utils.config_manager import config_manager
+
+# EN: Bump when the stored field set changes / CN: 存储字段结构变化时递增
+SCHEMA_VERSION = 1
+
+
+class MetadataCache:
+    """
+    EN: Thread-safe wrapper around one SQLite connection (WAL mode, so batch worker processes
+        can share the same file). Any database error degrades to a cache miss.
+    CN: 对单个 SQLite 连接的线程安全封装（WAL 模式，批处理子进程可共享同一文件）。
+        任何数据库错误都降级为缓存未命中。
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = None
+        self._pid = None
+        self._disabled = db_path is None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+
+    def _connect(self):
+        # EN: Never reuse a connection inherited through fork / CN: 不复用通过 fork 继承的连接
+        if self._conn is not None and self._pid != os.getpid():
+            self._conn = None
+        if self._conn is None and not self._disabled:
+            try:
+                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+                conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS exif_cache ("
+                    " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, version INTEGER, fields TEXT)"
+                )
+                conn.commit()
+                self._conn = conn
+                self._pid = os.getpid()
+            except Exception as e:
+                print(f"CN: [!] 元数据缓存不可用 / EN: Metadata cache unavailable: {e}")
+                self._disabled = True
+        return self._conn
+
+    @staticmethod
+    def make_key(img_path):
+        """EN: (normalized abs path, size, mtime_ns) / CN: (规范化绝对路径, 文件大小, mtime_ns)"""
+        st = os.stat(img_path)
+        return (os.path.normcase(os.path.abspath(img_path)), st.st_size, st.st_mtime_ns)
+
+    def get(self, key):
+        """EN: Cached field dict or None / CN: 返回缓存字段字典或 None"""
+        with self._lock:
+            conn = self._connect()
+            row = None
+            if conn is not None:
+                try:
+                    row = conn.execute(
+                        "SELECT fields FROM exif_cache WHERE path = ? AND size = ? AND mtime_ns = ? AND version = ?",
+                        (key[0], key[1], key[2], SCHEMA_VERSION)).fetchone()
+                except sqlite3.Error:
+                    self.errors += 1
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, fields):
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO exif_cache (path, size, mtime_ns, version, fields) VALUES (?, ?, ?, ?, ?)",
+                    (key[0], key[1], key[2], SCHEMA_VERSION, json.dumps(fields, ensure_ascii=False)))
+                conn.commit()
+                self.writes += 1
+            except sqlite3.Error:
+                self.errors += 1
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            if conn is not None:
+                try:
+                    conn.execute("DELETE FROM exif_cache")
+                    conn.commit()
+                except sqlite3.Error:
+                    self.errors += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'writes': self.writes,
+                'errors': self.errors,
+                'hit_rate': (self.hits / total) if total else 0.0,
+                'enabled': not self._disabled,
+            }
+
+
+def _default_db_path():
+    if not config_manager.get("metadata_cache", True):
+        return None
+    return os.path.join(config_manager.config_dir, "cache", "metadata.sqlite3")
+
+
+# EN: Shared by every MetadataHandler in this process / CN: 本进程内所有 MetadataHandler 共享
+metadata_cache = MetadataCache(_default_db_path())
@@ -0,0 +1,193 @@
+# core/preview_cache.py
+"""
+EN: Decoded-source cache for interactive border previews. Preview-ready source images (decoded,
+    EXIF-transposed, rotated and resized to the preview long edge) are kept in an LRU bounded by a
+    memory budget in MB, keyed by (path, mtime, rotation, target_long_edge); extracted metadata is
+    kept alongside, keyed by (path, mtime, digital mode, manual film). Repeated previews of the same
+    photo skip decode and EXIF work; only layout and compositing re-run. Finished previews are kept
+    in a small result cache, keyed by path and checked against the full request signature, so a
+    pre-rendered neighbour shows instantly and any config change is a miss.
+CN: 交互式边框预览的已解码源图缓存。预览就绪的源图（已解码、按 EXIF 转正、旋转并缩放到预览长边）保存在
+    按内存预算（MB）限额的 LRU 中，键为 (路径, mtime, 旋转, 目标长边)；提取出的元数据一并缓存，键为
+    (路径, mtime, 数码模式, 手动胶片)。同一张照片的重复预览跳过解码与 EXIF 处理，只重新执行排版与合成。
+    完成的预览保存在小型结果缓存中，按路径存放并与完整请求签名比对：预渲染的相邻照片可立即显示，
+    任何配置改动都会失效。
+"""
+
+import os
+import copy
+import threading
+from collections import OrderedDict
+
+from utils.config_manager import config_manager
+
+# EN: Default memory budget for cached sources / CN: 缓存源图的默认内存预算
+PREVIEW_CACHE_MB = 256
+# EN: Metadata entries kept (small dicts) / CN: 保留的元数据条目数（小字典）
+PREVIEW_META_CAPACITY = 512
+# EN: Finished previews kept (current photo, its neighbours and the last one left) / CN: 保留的完成预览数（当前照片、相邻照片与上一张）
+PREVIEW_RESULT_CAPACITY = 8
+
+
+def _image_bytes(img):
+    # EN: Pillow stores 3-band images as 4 bytes per pixel / CN: Pillow 以每像素 4 字节存储三通道图像
+    bands = len(img.getbands())
+    return img.width * img.height * (4 if bands == 3 else bands)
+
+
+class PreviewSourceCache:
+    """
+    EN: Thread-safe LRU of preview-ready source images (bounded by bytes) and metadata dicts.
+        Cached images are shared: callers must treat them as read-only. Metadata is returned as a
+        deep copy, because previews overwrite layout and EXIF fields on it.
+    CN: 线程安全的 LRU，保存预览就绪的源图（按字节数限额）与元数据字典。缓存图像为共享对象：调用方只可读取。
+        元数据以深拷贝返回，因为预览会覆盖其中的布局与 EXIF 字段。
+    """
+
+    def __init__(self, budget_mb=PREVIEW_CACHE_MB, meta_capacity=PREVIEW_META_CAPACITY):
+        self.max_bytes = int(budget_mb * 1024 * 1024)
+        self.meta_capacity = meta_capacity
+        self._images = OrderedDict()
+        self._meta = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.meta_hits = 0
+        self.meta_misses = 0
+
+    @staticmethod
+    def _stamp(path):
+        return os.path.normcase(os.path.abspath(path)), os.stat(path).st_mtime_ns
+
+    def get_source(self, path, rotation, target_long_edge, loader):
+        """
+        EN: Preview-ready source for (path, mtime, rotation, target_long_edge); loader() builds it on a miss.
+        CN: 返回 (路径, mtime, 旋转, 目标长边) 对应的预览源图；未命中时由 loader() 构建。
+        """
+        key = (*self._stamp(path), int(rotation or 0) % 360, int(target_long_edge))
+        with self._lock:
+            img = self._images.get(key)
+            if img is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return img
+
+        img = loader()
+        size = _image_bytes(img)
+        with self._lock:
+            self.misses += 1
+            # EN: Sources larger than the whole budget are served but not retained / CN: 超过总预算的源图照常返回但不缓存
+            if size <= self.max_bytes:
+                old = self._images.pop(key, None)
+                if old is not None:
+                    self._bytes -= _image_bytes(old)
+                self._images[key] = img
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._images.popitem(last=False)
+                    self._bytes -= _image_bytes(evicted)
+        return img
+
+    def get_data(self, path, is_digital, manual_film, loader):
+        """
+        EN: Deep copy of the metadata for (path, mtime, is_digital, manual_film); loader() extracts it on a miss.
+        CN: 返回 (路径, mtime, 数码模式, 手动胶片) 对应元数据的深拷贝；未命中时由 loader() 提取。
+        """
+        key = (*self._stamp(path), bool(is_digital), manual_film or "")
+        with self._lock:
+            data = self._meta.get(key)
+            if data is not None:
+                self._meta.move_to_end(key)
+                self.meta_hits += 1
+                return copy.deepcopy(data)
+
+        data = loader()
+        with self._lock:
+            self.meta_misses += 1
+            self._meta[key] = copy.deepcopy(data)
+            while len(self._meta) > self.meta_capacity:
+                self._meta.popitem(last=False)
+        return data
+
+    def discard(self, path):
+        """EN: Drop every entry for a path / CN: 移除某路径的全部条目"""
+        norm = os.path.normcase(os.path.abspath(path))
+        with self._lock:
+            for key in [k for k in self._images if k[0] == norm]:
+                self._bytes -= _image_bytes(self._images.pop(key))
+            for key in [k for k in self._meta if k[0] == norm]:
+                del self._meta[key]
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self._meta.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._images),
+                    'bytes': self._bytes, 'meta_hits': self.meta_hits, 'meta_misses': self.meta_misses}
+
+
+class PreviewResultCache:
+    """
+    EN: Thread-safe LRU of finished previews, one per path. An entry is only served when its request
+        signature (config, mode, rotation, batch order...) equals the caller's, so stale entries
+        simply miss. Stored images are private copies; callers get their own copy.
+    CN: 线程安全的完成预览 LRU，每个路径一条。仅当条目的请求签名（配置、模式、旋转、批次顺序等）与调用方一致时
+        才返回，过期条目自然不命中。缓存图像为私有副本，调用方获得各自的副本。
+    """
+
+    def __init__(self, capacity=PREVIEW_RESULT_CAPACITY):
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _peek(self, path, signature):
+        entry = self._entries.get(os.path.normcase(os.path.abspath(path)))
+        return entry if entry is not None and entry[0] == signature else None
+
+    def contains(self, path, signature):
+        with self._lock:
+            return self._peek(path, signature) is not None
+
+    def get(self, path, signature):
+        """EN: (image copy, report) or None / CN: 返回 (图像副本, 报告) 或 None"""
+        with self._lock:
+            entry = self._peek(path, signature)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(os.path.normcase(os.path.abspath(path)))
+            self.hits += 1
+        return entry[1].copy(), dict(entry[2])
+
+    def put(self, path, signature, img, report):
+        entry = (signature, img.copy(), dict(report))
+        key = os.path.normcase(os.path.abspath(path))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def discard(self, path):
+        with self._lock:
+            self._entries.pop(os.path.normcase(os.path.abspath(path)), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
+# EN: Shared by the border preview path in this process / CN: 本进程内边框预览路径共享
+preview_source_cache = PreviewSourceCache(config_manager.get("preview_cache_mb", PREVIEW_CACHE_MB))
+preview_result_cache = PreviewResultCache(max(PREVIEW_RESULT_CAPACITY, 2 * config_manager.get("preview_prefetch", 2) + 2))
@@ -0,0 +1,154 @@
+# core/preview_worker.py
+"""
+EN: Single long-lived preview worker with a latest-wins slot. Each submit supersedes whatever is
+    queued and cancels the job in flight through its CancelToken; renders check the token between
+    stages (load, canvas, text, shadow), so a superseded preview stops within one stage instead of
+    finishing and being discarded. Only one preview renders at a time, so fast clicking no longer
+    piles up threads fighting over the GIL. Speculative (idle) jobs run on the same thread only while
+    no preview is queued, and any new preview cancels them.
+CN: 单个常驻预览工作线程，采用“最新者胜出”的单槽队列。每次提交都会替换排队中的任务，并通过 CancelToken
+    取消正在执行的任务；渲染在各阶段之间（加载、画布、文字、阴影）检查令牌，被替换的预览在一个阶段内停止，
+    而不是渲染完成后再被丢弃。同一时刻只渲染一个预览，快速点击不再堆积争抢 GIL 的线程。
+    推测性（空闲）任务在同一线程上仅于没有排队预览时运行，任何新预览都会取消它们。
+"""
+
+import threading
+import traceback
+from collections import deque
+
+
+class PreviewCancelled(Exception):
+    """EN: Raised by CancelToken.check() once a job is superseded / CN: 任务被替换后由 CancelToken.check() 抛出"""
+
+
+class CancelToken:
+    """EN: Cooperative cancellation flag / CN: 协作式取消标志"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """EN: Raise PreviewCancelled if cancelled / CN: 若已取消则抛出 PreviewCancelled"""
+        if self._event.is_set():
+            raise PreviewCancelled()
+
+
+def check_cancel(token):
+    """EN: check() that accepts None (no token) / CN: 支持 None（无令牌）的 check()"""
+    if token is not None:
+        token.check()
+
+
+class PreviewWorker:
+    """
+    EN: Runs job(token) callables one at a time on a daemon thread. on_done(result) / on_error(exc)
+        are called on the worker thread, and never for a superseded job.
+    CN: 在守护线程上逐个执行 job(token)。on_done(result) / on_error(exc) 在工作线程上回调，
+        被替换的任务不会回调。
+    """
+
+    def __init__(self, name="GT23-Preview"):
+        self._cond = threading.Condition()
+        self._pending = None
+        self._idle = deque()
+        self._token = None
+        self._closed = False
+        self.submitted = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        self.completed = 0
+        self.idle_completed = 0
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, job, on_done=None, on_error=None):
+        """EN: Queue job, superseding queued and running ones; returns its token / CN: 提交任务并替换排队与运行中的任务；返回其令牌"""
+        token = CancelToken()
+        with self._cond:
+            self.submitted += 1
+            if self._pending is not None:
+                # EN: Never started: dropped without running / CN: 尚未开始：直接丢弃
+                self._pending[1].cancel()
+                self.coalesced += 1
+            if self._token is not None:
+                self._token.cancel()
+            # EN: Speculation around the old selection is obsolete / CN: 围绕旧选择的推测任务已过时
+            self._idle.clear()
+            self._pending = (job, token, on_done, on_error)
+            self._cond.notify()
+        return token
+
+    def submit_idle(self, jobs):
+        """
+        EN: Replace the idle queue with job(token) callables, run in order only while no preview is queued.
+        CN: 以 job(token) 列表替换空闲队列，仅在没有排队预览时按顺序执行。
+        """
+        with self._cond:
+            self._idle = deque((job, CancelToken(), None, None) for job in jobs)
+            self._cond.notify()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._idle and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                idle = self._pending is None
+                if idle:
+                    job, token, on_done, on_error = self._idle.popleft()
+                else:
+                    job, token, on_done, on_error = self._pending
+                    self._pending = None
+                self._token = token
+            try:
+                token.check()
+                result = job(token)
+                token.check()
+            except PreviewCancelled:
+                with self._cond:
+                    self.cancelled += 1
+                continue
+            except Exception as e:
+                if on_error and not token.cancelled:
+                    on_error(e)
+                elif not on_error and not idle:
+                    traceback.print_exc()
+                continue
+            finally:
+                with self._cond:
+                    if self._token is token:
+                        self._token = None
+            with self._cond:
+                if idle:
+                    self.idle_completed += 1
+                else:
+                    self.completed += 1
+            if on_done:
+                on_done(result)
+
+    def close(self):
+        """EN: Cancel everything and stop the thread / CN: 取消全部任务并停止线程"""
+        with self._cond:
+            self._closed = True
+            if self._pending is not None:
+                self._pending[1].cancel()
+                self._pending = None
+            self._idle.clear()
+            if self._token is not None:
+                self._token.cancel()
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {'submitted': self.submitted, 'coalesced': self.coalesced,
+                    'cancelled': self.cancelled, 'completed': self.completed,
+                    'idle_completed': self.idle_completed, 'idle_queued': len(self._idle),
+                    'busy': self._token is not None or self._pending is not None}
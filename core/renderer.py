@@ -10,12 +10,28 @@ try:
 except ImportError:
     piexif = None
 from utils.config_manager import config_manager
+from core.logo_engine import tint_logo, is_black_tint, logo_sprite_cache, find_logo
+from core.gradient_engine import render_gradient, FUJI_RAINBOW_COLORS, INSTAX_RAINBOW_COLORS
+from core.font_service import font_service
+from core.shadow_engine import apply_shadow, floating_shadow_bands
+from core.texture_engine import apply_matte_texture
+from core.image_source import get_image_source
+from core.decode_planner import decode_for_size
+from core.preview_compositor import text_signature
+from core.preview_worker import PreviewCancelled, check_cancel
 
 try:
     import cairosvg
 except ImportError:
     cairosvg = None
 
+# EN: Canvas margin (px) around the drop shadow / CN: 投影四周的画布边距（像素）
+PRO_SHADOW_MARGIN = 80
+
+# EN: Blur radius (px) kept at the frosted background's working resolution
+# CN: 磨砂背景在工作分辨率下保留的模糊半径（像素）
+FROSTED_WORK_RADIUS = 24
+
 class FilmRenderer:
     """
     EN: Pro-grade renderer with dynamic typography hierarchy.
@@ -81,6 +97,11 @@ class FilmRenderer:
         CN: 主渲染入口，增强主题、全局彩虹长卷与 SAMPLE 样品模式支持。
         """
         timings = kwargs.get('timing_results', {})
+        # EN: Optional PreviewCompositor: stage caches for interactive previews only
+        # CN: 可选的 PreviewCompositor：仅用于交互式预览的分层缓存
+        layers = kwargs.get('layers') if target_long_edge <= 1200 and not output_dir else None
+        # EN: Optional CancelToken, checked between stages / CN: 可选的 CancelToken，在各阶段之间检查
+        cancel = kwargs.get('cancel')
         t_start = time.perf_counter()
         
         try:
@@ -92,28 +113,8 @@ class FilmRenderer:
                 # EN: Skip rotation and initial resize as it's assumed pre-processed
                 # CN: 跳过旋转和初始缩放，假定已预处理
             else:
-                t_load_start = time.perf_counter()
-                # EN: Use draft mode for faster loading if it's a preview
-                # CN: 如果是预览模式，使用 draft 模式加速加载
-                img = Image.open(img_path)
-                if target_long_edge <= 1200 and img.format == 'JPEG':
-                    # EN: Target approx 2x preview size for draft to keep some head room
-                    # CN: 为 draft 设置约 2 倍预览尺寸的目标，保留一定的余量
-                    img.draft(img.mode, (target_long_edge * 2, target_long_edge * 2))
-                
-                # EN: Handle EXIF orientation automatically / CN: 自动处理 EXIF 旋转信息
-                img = ImageOps.exif_transpose(img)
-                
-                # EN: Apply manual rotation (0, 90, 180, 270) / CN: 应用手动旋转
-                if manual_rotation != 0:
-                    img = img.rotate(-manual_rotation, expand=True)
-
-                if img.mode != "RGB": img = img.convert("RGB")
-                timings['load_rotate'] = time.perf_counter() - t_load_start
-
-                t_resize_start = time.perf_counter()
-                img = self._smart_resize(img, target_long_edge)
-                timings['resize'] = time.perf_counter() - t_resize_start
+                img = self.load_source(img_path, target_long_edge, manual_rotation, timings)
+            check_cancel(cancel)
             
             w, h = img.size
             
@@ -199,82 +200,21 @@ class FilmRenderer:
             
             # --- EN: DRAWING ---
             t_canvas_start = time.perf_counter()
-            # EN: Rainbow mode uses a global sliced gradient canvas
-            # CN: 彩虹模式使用全局分段横向渐变画布
-            # EN: Rainbow modes (Macaron/Rainbow) use different gradient engines
-            # CN: 彩虹模式：区分长卷系统（彩虹）与随机渐变系统（马卡龙）
-            if theme == "rainbow":
-                # EN: Pass specific t_start/t_end for physical continuity / CN: 传递具体的起始/结束比例以实现物理连贯
-                t_range = kwargs.get('rainbow_range', (0.0, 1.0))
-                canvas = self._create_fuji_rainbow_canvas(new_w, new_h, t_range[0], t_range[1])
-            elif theme == "macaron":
-                # EN: Dynamic 2-color gradient for Macaron / CN: 马卡龙系统：动态双色随机渐变
-                macaron_palette = [
-                    (255, 180, 200), (210, 180, 255), (180, 220, 255), 
-                    (180, 255, 220), (255, 250, 190), (255, 210, 180),
-                    (200, 255, 255), (255, 220, 255), (220, 255, 180)
-                ]
-                # EN: Resolve color index (Must be deterministic)
-                if rainbow_index >= 0:
-                    c_idx = rainbow_index
-                else:
-                    import hashlib
-                    c_idx = int(hashlib.md5(img_path.encode()).hexdigest(), 16) % len(macaron_palette)
-
-                c1 = macaron_palette[c_idx % len(macaron_palette)]
-                c2 = macaron_palette[(c_idx + 1) % len(macaron_palette)]
-                canvas = self._create_linear_gradient_canvas(new_w, new_h, c1, c2)
-            elif theme == "sakura":
-                # EN: Sakura Pink Palette (Varying intensities for better visual distinction)
-                # CN: 樱花粉色库：优化明度，让整体色调更轻盈（响应老大反馈：调淡左侧和暗部）
-                sakura_palette = [
-                    # EN: Interleaved shades (Pale, Soft, Classic) - Lightened for better blending
-                    # CN: 交织色序 (淡妆 -> 柔粉 -> 经典)，整体上移明度，确保背景轻盈
-                    (255, 245, 247), (255, 203, 217), (255, 180, 200),
-                    (255, 235, 240), (255, 190, 205), (255, 170, 190),
-                    (255, 220, 235), (255, 185, 200), (255, 160, 180)
-                ]
-                # EN: Resolve color index (Deterministic based on position/path)
-                if rainbow_index >= 0:
-                    c_idx = rainbow_index
-                else:
-                    import hashlib
-                    c_idx = int(hashlib.md5(img_path.encode()).hexdigest(), 16) % len(sakura_palette)
-
-                # EN: Use a step of 2 to ensure we jump between distinctive shades
-                # CN: 使用跨步采样，确保渐变色对具备明显的明度或色相差
-                base_idx = c_idx % len(sakura_palette)
-                next_idx = (base_idx + 1) % len(sakura_palette)
-                
-                c1 = sakura_palette[base_idx]
-                c2 = sakura_palette[next_idx]
-                canvas = self._create_linear_gradient_canvas(new_w, new_h, c1, c2)
-            elif theme == "frosted":
-                # EN: Glassmorphism (Blurred Original) / CN: 磨砂玻璃（基于原图的高斯模糊背景）
-                canvas = self._create_frosted_canvas(img, new_w, new_h)
-            elif theme == "slate_teal":
-                # EN: Premium Slate-Teal Gradient (Ultimate Luminous Replica)
-                # CN: 石板青（终极通透版：复刻福伦达“空明石板青”模拟渐变）
-                c_top = (210, 222, 228)    # Luminous Air / 空明青灰
-                c_bottom = (125, 142, 152) # Breathable Slate / 通透石板
-                # EN: Use gamma 1.6 for expansive highlight falloff / CN: 使用伽态 1.6 引导大范围高光衰减
-                canvas = self._create_linear_gradient_canvas(new_w, new_h, c_top, c_bottom, vertical=True, gamma=1.6)
-                # EN: Apply matte texture for "Fine Art Paper" feel
-                # CN: 应用磨砂纹理，模拟“艺术纸”质感
-                canvas = self._apply_matte_texture(canvas, intensity=0.06)
+            t_range = kwargs.get('rainbow_range', (0.0, 1.0))
+            if layers is not None:
+                # EN: Background + photo only depend on the source, theme and geometry; text never dirties them
+                # CN: 背景 + 照片只取决于源图、主题与几何尺寸；文字改动不会使其失效
+                base_key = (id(img), img_path, theme, new_w, new_h, side_pad_left, top_pad, rainbow_index, tuple(t_range))
+                canvas = layers.base(base_key, img, lambda: self._build_base_canvas(
+                    img, img_path, theme, new_w, new_h, side_pad_left, top_pad, bg_color, line_color, rainbow_index, t_range),
+                    timings)
             else:
-                canvas = Image.new("RGB", (new_w, new_h), bg_color)
-            
-            if theme in ["frosted", "slate_teal"]:
-                # EN: Floating Photo Effect (Inner Shadow + Image + Border)
-                self._draw_floating_photo(canvas, img, side_pad_left, top_pad, line_color)
-            else:
-                canvas.paste(img, (side_pad_left, top_pad))
-                # EN: 1px inner border
-                ImageDraw.Draw(canvas).rectangle([side_pad_left, top_pad, side_pad_left + w, top_pad + h], outline=line_color, width=1)
+                canvas = self._build_base_canvas(img, img_path, theme, new_w, new_h, side_pad_left, top_pad,
+                                                 bg_color, line_color, rainbow_index, t_range)
             
             draw = ImageDraw.Draw(canvas)
             timings['canvas_paste'] = time.perf_counter() - t_canvas_start
+            check_cancel(cancel)
             
             # --- EN: TYPOGRAPHY HIERARCHY ---
             t_draw_start = time.perf_counter()
@@ -366,16 +306,50 @@ class FilmRenderer:
                 v_offset_ratio = layout.get('font_v_offset', 0) if layout else 0
                 v_offset_px = int(long_edge * v_offset_ratio)
                 
-                self._draw_pro_text(draw, new_w, h, side_pad_left, side_pad_right, top_pad, bottom_splice, 
-                                main_text, sub_text, actual_main_size, actual_sub_size, 
-                                data=data, main_color=main_color, sub_color=sub_color, 
-                                use_lens_branding=use_lens_branding, timings=timings,
-                                v_offset=v_offset_px)
+                if layers is not None:
+                    # EN: Text is anti-aliased against the background, so the text layer is drawn onto a
+                    #     copy of the cached base (byte-identical to a full render) and cached by its inputs
+                    # CN: 文字的抗锯齿与背景相关，因此文字层绘制在缓存底图的副本上（与完整渲染逐字节一致），
+                    #     并按其输入参数缓存
+                    text_key = (base_key, main_text, sub_text, actual_main_size, actual_sub_size, main_color, sub_color,
+                                use_lens_branding, v_offset_px, text_signature(data))
+                    canvas = layers.text(text_key, img, canvas, lambda layer: self._draw_pro_text(
+                        ImageDraw.Draw(layer), new_w, h, side_pad_left, side_pad_right, top_pad, bottom_splice,
+                        main_text, sub_text, actual_main_size, actual_sub_size,
+                        data=data, main_color=main_color, sub_color=sub_color,
+                        use_lens_branding=use_lens_branding, timings=timings,
+                        v_offset=v_offset_px, persist_logo=False), timings)
+                else:
+                    self._draw_pro_text(draw, new_w, h, side_pad_left, side_pad_right, top_pad, bottom_splice, 
+                                    main_text, sub_text, actual_main_size, actual_sub_size, 
+                                    data=data, main_color=main_color, sub_color=sub_color, 
+                                    use_lens_branding=use_lens_branding, timings=timings,
+                                    v_offset=v_offset_px, persist_logo=bool(output_dir))
                 timings['text_logo_total'] = time.perf_counter() - t_logo_start
+                font_stats = font_service.stats()
+                timings['font_loads'] = font_stats['loads']
+                timings['font_hits'] = font_stats['hits']
             timings['draw_text_outer'] = time.perf_counter() - t_draw_start
             
             # --- EN: FINAL POLISH ---
+            check_cancel(cancel)
             t_shadow_start = time.perf_counter()
+            if layers is not None:
+                # EN: Cached layers are shared: the returned preview is always a fresh image
+                # CN: 缓存图层为共享对象：返回的预览始终是新图像
+                if theme in ["dark", "frosted", "slate_teal"]:
+                    # EN: An opaque canvas flattens onto itself / CN: 不透明画布复合后即其自身
+                    final_output = canvas.copy()
+                else:
+                    # EN: Flattened shadow frame depends only on the canvas size; the canvas is pasted over it
+                    # CN: 复合后的阴影边框只取决于画布尺寸；画布直接粘贴在其上
+                    frame = layers.shadow(canvas.size, lambda: self._pro_shadow_frame(canvas.size), timings)
+                    final_output = frame.copy()
+                    final_output.paste(canvas, (PRO_SHADOW_MARGIN // 2, PRO_SHADOW_MARGIN // 2))
+                timings['shadow'] = time.perf_counter() - t_shadow_start
+                timings['total'] = time.perf_counter() - t_start
+                return final_output, timings
+
             # EN: Disable shadow for Dark/Slate-Teal Mode to avoid edge artifacts and match user's clean aesthetic
             # CN: 深色/石板青模式下不加阴影，避免边缘白边产生（黑色阴影在暗色底色上效果不佳）
             if theme in ["dark", "frosted", "slate_teal"]:
@@ -418,6 +392,9 @@ class FilmRenderer:
             timings['total'] = time.perf_counter() - t_start
             return final_output, timings
 
+        except PreviewCancelled:
+            # EN: Superseded preview: propagate to the worker, not an error / CN: 预览已被替换：交给工作线程处理，不算错误
+            raise
         except Exception as e:
             print(f"CN: [ERR] 渲染程序出错: {e}")
             import traceback
@@ -425,6 +402,87 @@ class FilmRenderer:
             return None, {}
             return False
 
+    def _build_base_canvas(self, img, img_path, theme, new_w, new_h, side_pad_left, top_pad,
+                           bg_color, line_color, rainbow_index=0, t_range=(0.0, 1.0)):
+        """
+        EN: Background layer (theme canvas) with the photo and its border composited in.
+        CN: 背景层（主题画布）并合成照片及其描边。
+        """
+        w, h = img.size
+        # EN: Rainbow mode uses a global sliced gradient canvas
+        # CN: 彩虹模式使用全局分段横向渐变画布
+        # EN: Rainbow modes (Macaron/Rainbow) use different gradient engines
+        # CN: 彩虹模式：区分长卷系统（彩虹）与随机渐变系统（马卡龙）
+        if theme == "rainbow":
+            # EN: Pass specific t_start/t_end for physical continuity / CN: 传递具体的起始/结束比例以实现物理连贯
+            canvas = self._create_fuji_rainbow_canvas(new_w, new_h, t_range[0], t_range[1])
+        elif theme == "macaron":
+            # EN: Dynamic 2-color gradient for Macaron / CN: 马卡龙系统：动态双色随机渐变
+            macaron_palette = [
+                (255, 180, 200), (210, 180, 255), (180, 220, 255), 
+                (180, 255, 220), (255, 250, 190), (255, 210, 180),
+                (200, 255, 255), (255, 220, 255), (220, 255, 180)
+            ]
+            # EN: Resolve color index (Must be deterministic)
+            if rainbow_index >= 0:
+                c_idx = rainbow_index
+            else:
+                import hashlib
+                c_idx = int(hashlib.md5(img_path.encode()).hexdigest(), 16) % len(macaron_palette)
+
+            c1 = macaron_palette[c_idx % len(macaron_palette)]
+            c2 = macaron_palette[(c_idx + 1) % len(macaron_palette)]
+            canvas = self._create_linear_gradient_canvas(new_w, new_h, c1, c2)
+        elif theme == "sakura":
+            # EN: Sakura Pink Palette (Varying intensities for better visual distinction)
+            # CN: 樱花粉色库：优化明度，让整体色调更轻盈（响应老大反馈：调淡左侧和暗部）
+            sakura_palette = [
+                # EN: Interleaved shades (Pale, Soft, Classic) - Lightened for better blending
+                # CN: 交织色序 (淡妆 -> 柔粉 -> 经典)，整体上移明度，确保背景轻盈
+                (255, 245, 247), (255, 203, 217), (255, 180, 200),
+                (255, 235, 240), (255, 190, 205), (255, 170, 190),
+                (255, 220, 235), (255, 185, 200), (255, 160, 180)
+            ]
+            # EN: Resolve color index (Deterministic based on position/path)
+            if rainbow_index >= 0:
+                c_idx = rainbow_index
+            else:
+                import hashlib
+                c_idx = int(hashlib.md5(img_path.encode()).hexdigest(), 16) % len(sakura_palette)
+
+            # EN: Use a step of 2 to ensure we jump between distinctive shades
+            # CN: 使用跨步采样，确保渐变色对具备明显的明度或色相差
+            base_idx = c_idx % len(sakura_palette)
+            next_idx = (base_idx + 1) % len(sakura_palette)
+            
+            c1 = sakura_palette[base_idx]
+            c2 = sakura_palette[next_idx]
+            canvas = self._create_linear_gradient_canvas(new_w, new_h, c1, c2)
+        elif theme == "frosted":
+            # EN: Glassmorphism (Blurred Original) / CN: 磨砂玻璃（基于原图的高斯模糊背景）
+            canvas = self._create_frosted_canvas(img, new_w, new_h)
+        elif theme == "slate_teal":
+            # EN: Premium Slate-Teal Gradient (Ultimate Luminous Replica)
+            # CN: 石板青（终极通透版：复刻福伦达“空明石板青”模拟渐变）
+            c_top = (210, 222, 228)    # Luminous Air / 空明青灰
+            c_bottom = (125, 142, 152) # Breathable Slate / 通透石板
+            # EN: Use gamma 1.6 for expansive highlight falloff / CN: 使用伽态 1.6 引导大范围高光衰减
+            canvas = self._create_linear_gradient_canvas(new_w, new_h, c_top, c_bottom, vertical=True, gamma=1.6)
+            # EN: Apply matte texture for "Fine Art Paper" feel
+            # CN: 应用磨砂纹理，模拟“艺术纸”质感
+            canvas = self._apply_matte_texture(canvas, intensity=0.06)
+        else:
+            canvas = Image.new("RGB", (new_w, new_h), bg_color)
+        
+        if theme in ["frosted", "slate_teal"]:
+            # EN: Floating Photo Effect (Inner Shadow + Image + Border)
+            self._draw_floating_photo(canvas, img, side_pad_left, top_pad, line_color)
+        else:
+            canvas.paste(img, (side_pad_left, top_pad))
+            # EN: 1px inner border
+            ImageDraw.Draw(canvas).rectangle([side_pad_left, top_pad, side_pad_left + w, top_pad + h], outline=line_color, width=1)
+        return canvas
+
     def _apply_theme_colors(self, theme, index=0):
         """
         EN: Define theme color palettes with rainbow sequence index.
@@ -468,33 +526,32 @@ class FilmRenderer:
         CN: 创建支持伽态校正的高精度线性渐变 (支持横向/纵向)。
         gamma: >1.0 makes color transition slower at start, <1.0 makes it faster.
         """
-        canvas = Image.new("RGB", (w, h))
-        draw = ImageDraw.Draw(canvas)
-        
-        steps = h if vertical else w
-        for i in range(steps):
-            t = i / steps if steps > 0 else 0
-            # EN: Apply gamma for organic transition / CN: 应用伽态以实现自然的模拟感过渡
-            if gamma != 1.0:
-                t = t ** gamma
-                
-            r = int(c1[0] + (c2[0] - c1[0]) * t)
-            g = int(c1[1] + (c2[1] - c1[1]) * t)
-            b = int(c1[2] + (c2[2] - c1[2]) * t)
-            if vertical:
-                draw.line([(0, i), (w, i)], fill=(r, g, b))
-            else:
-                draw.line([(i, 0), (i, h)], fill=(r, g, b))
-        return canvas
+        # EN: LUT-based engine, byte-identical to the former per-line loop
+        # CN: 基于查找表的渐变引擎，与旧版逐行绘制逐字节一致
+        return render_gradient(w, h, (c1, c2), vertical=vertical, gamma=gamma)
 
     def _create_frosted_canvas(self, source_img, w, h):
         """
         EN: Create glassmorphism background using blurred original.
         CN: 使用模糊后的原图生成磨砂玻璃质感背景。
         """
+        canvas = self._create_frosted_base(source_img, w, h)
+        if canvas is source_img:
+            return canvas
+        
+        # 4. EN: Apply matte texture for premium grain feel (full resolution, grain is per-pixel)
+        # CN: 应用哑光纹理，增加高级感颗粒（需在全分辨率下进行，颗粒为逐像素细节）
+        return self._apply_matte_texture(canvas, intensity=0.05)
+
+    def _create_frosted_base(self, source_img, w, h):
+        """
+        EN: Blurred, brightened cover-fit of the source at w x h. The blur (~8.5% of the long edge)
+            runs at a small working resolution where it is cheap, then the result is upscaled.
+        CN: 生成 w x h 的模糊提亮背景（原图铺满裁剪）。模糊（约长边 8.5%）在低成本的小工作分辨率下完成，再放大输出。
+        """
         from PIL import Image, ImageFilter, ImageEnhance
         
-        # 1. EN: Scale and center-crop to fill target canvas / CN: 缩放并居中裁剪以填满画布
+        # 1. EN: Cover-fit crop box in source coordinates / CN: 在原图坐标系中计算铺满裁剪框
         iw, ih = source_img.size
         # EN: Avoid zero division / CN: 避免除以零
         if ih == 0 or h == 0: return source_img
@@ -503,20 +560,17 @@ class FilmRenderer:
         
         if aspect > target_aspect:
             # EN: Source is wider / CN: 原图过宽，裁剪两侧
-            new_ih = h
             new_iw = int(h * aspect)
-            # EN: Use cheaper resizing for background but keep quality / CN: 背景渲染可适当优化性能
-            resized = source_img.resize((new_iw, new_ih), Image.Resampling.BILINEAR)
             left = (new_iw - w) // 2
-            canvas = resized.crop((left, 0, left + w, h))
+            scale = iw / new_iw
+            crop_box = (left * scale, 0, (left + w) * scale, ih)
         else:
             # EN: Source is taller / CN: 原图过高，裁剪上下
-            new_iw = w
             new_ih = int(w / aspect)
-            resized = source_img.resize((new_iw, new_ih), Image.Resampling.BILINEAR)
             top = (new_ih - h) // 2
-            canvas = resized.crop((0, top, w, top + h))
-            
+            scale = ih / new_ih
+            crop_box = (0, top * scale, iw, (top + h) * scale)
+        
         # --- 2. EN: ENHANCED BLUR LOGIC / CN: 增强型模糊逻辑 ---
         # EN: Use proportional radius based on target size for consistent look
         # CN: 使用基于基准尺寸的比例半径，确保大图小图视觉一致
@@ -524,126 +578,64 @@ class FilmRenderer:
         # EN: target ~380px blur for 4500px long edge (approx 8.5% of long edge)
         # CN: 针对 4500px 长边，应用约 380px 的模糊半径 (约 8.5% 长边)
         radius = int(long_edge * 0.085)
-        canvas = canvas.filter(ImageFilter.GaussianBlur(radius=radius))
         
-        # 3. EN: Brighten and add a white "frost" tint / CN: 提亮并添加白色磨砂蒙版
-        canvas = ImageEnhance.Brightness(canvas).enhance(1.15)
-        
-        # 4. EN: Apply matte texture for premium grain feel / CN: 应用哑光纹理，增加高级感颗粒
-        canvas = self._apply_matte_texture(canvas, intensity=0.05)
+        # EN: Working resolution keeps ~FROSTED_WORK_RADIUS px of blur; a blurred field carries no
+        #     detail finer than its radius, so upscaling it back loses nothing visible
+        # CN: 工作分辨率下保留约 FROSTED_WORK_RADIUS 像素的模糊半径；模糊后的图像不含小于半径的细节，放大回去不会损失可见信息
+        work_scale = min(1.0, FROSTED_WORK_RADIUS / radius) if radius > 0 else 1.0
+        work_w = max(1, round(w * work_scale))
+        work_h = max(1, round(h * work_scale))
+        # EN: Crop + shrink in one pass; reducing_gap box-reduces first so the wide filter stays cheap
+        # CN: 裁剪与缩小一次完成；reducing_gap 先做整数倍盒式缩小，避免宽核滤波的开销
+        canvas = source_img.resize((work_w, work_h), Image.Resampling.BILINEAR, box=crop_box, reducing_gap=2.0)
+        canvas = canvas.filter(ImageFilter.GaussianBlur(radius=radius * work_w / w))
         
+        # 3. EN: Brighten at working resolution (per-pixel gain commutes with upscaling) / CN: 在工作分辨率下提亮（逐像素增益与放大可交换）
+        canvas = ImageEnhance.Brightness(canvas).enhance(1.15)
+        if canvas.size != (w, h):
+            canvas = canvas.resize((w, h), Image.Resampling.BILINEAR)
         return canvas
 
     def _apply_matte_texture(self, canvas, intensity=0.03):
         """
-        EN: Add subtle paper-like/matte noise texture to a canvas
-        CN: 为画布添加微细的纸质感/哑光磨砂噪点纹理
+        EN: Add subtle paper-like/matte noise texture to a canvas (seeded, so renders are reproducible)
+        CN: 为画布添加微细的纸质感/哑光磨砂噪点纹理（固定种子，渲染结果可复现）
         """
-        from PIL import Image, ImageDraw, ImageChops
-        import random
-        
-        w, h = canvas.size
-        # EN: Create a tileable noise block for performance (256x256)
-        # CN: 为性能考虑，创建一个可平铺的噪点块
-        tile_size = 256
-        noise_tile = Image.new('L', (tile_size, tile_size))
-        
-        # EN: Fast noise generation / CN: 快速随机噪点生成
-        pixels = [random.randint(110, 145) for _ in range(tile_size * tile_size)]
-        noise_tile.putdata(pixels)
-        
-        # EN: Create full-size noise overlay / CN: 创建覆盖全画面的噪点层
-        noise_overlay = Image.new('L', (w, h))
-        for y in range(0, h, tile_size):
-            for x in range(0, w, tile_size):
-                noise_overlay.paste(noise_tile, (x, y))
-        
-        # EN: Blend noise with canvas using "Soft Light" style (manually here)
-        # CN: 将噪点层以微弱比例叠加到原画布
-        noise_rgb = Image.merge("RGB", (noise_overlay, noise_overlay, noise_overlay))
-        return Image.blend(canvas, noise_rgb, intensity)
+        # EN: Cached 256x256 noise tile + full-size overlay, blended at a weak ratio
+        # CN: 使用缓存的 256x256 噪点块与全尺寸叠加层，以微弱比例混合
+        return apply_matte_texture(canvas, intensity)
 
     def _draw_floating_photo(self, canvas, img, x, y, outline_color):
         """
         EN: Draw premium floating shadows using rounded masks and multi-layer composites.
         CN: 使用圆角遮罩和多层离屏复合绘制高级悬浮投影，彻底消除硬影边缘。
         """
-        from PIL import Image, ImageFilter, ImageDraw
-        
         # 0. EN: Calculate shadow scale factor
         long_edge = max(img.width, img.height)
         sf = long_edge / 2000.0
         
-        # --- 1. EN: OFF-SCREEN SHADOW COMPOSITE / CN: 离屏阴影复合 ---
-        # EN: Create a large RGBA buffer to composite ALL shadows first
-        # CN: 创建一个大型 RGBA 缓冲区，先在这里复合所有投影层
-        # EN: Increase margin to 4x blur to avoid hard-edge clipping on large offsets
-        # CN: 将边距增加到 4 倍模糊半径，避免在大偏移量下出现阴影裁断硬边
-        max_blur = int(200 * sf)
-        margin = max_blur * 4
-        shadow_buf = Image.new("RGBA", (img.width + margin * 2, img.height + margin * 2), (0, 0, 0, 0))
-        
-        def draw_layer(radius, opacity, off_x, off_y, spread_neg, fade_strength=0.0):
-            """EN: Draw a rounded soft shadow layer with optional fading / CN: 绘制一层带可选消隐效果的圆角软阴影"""
-            nonlocal shadow_buf
-            from PIL import ImageChops
-            # EN: Calculate mask size with Negative Spread / CN: 计算具有负扩张的遮罩尺寸
-            s_w = max(10, img.width - int(spread_neg * sf) * 2)
-            s_h = max(10, img.height - int(spread_neg * sf) * 2)
-            
-            # EN: Create a ROUNDED mask for the core shape
-            mask_l = Image.new("L", (s_w, s_h), 0)
-            d = ImageDraw.Draw(mask_l)
-            r = int(60 * sf)
-            d.rounded_rectangle([0, 0, s_w, s_h], radius=r, fill=255)
-            
-            # EN: Apply "Air Falloff" self-fading if requested
-            # CN: 为阴影应用“空气衰减”自消隐渐变
-            if fade_strength > 0:
-                # EN: Generate 2D gradient via bilinear multiplication (Fast & Smooth)
-                # CN: 通过双向线性相乘生成 2D 渐变 (快速且顺滑)
-                h_grad = Image.new("L", (s_w, 1))
-                for x_px in range(s_w): 
-                    h_grad.putpixel((x_px, 0), int(255 * (1.0 - (x_px / s_w) * fade_strength)))
-                h_grad = h_grad.resize((s_w, s_h))
-                
-                v_grad = Image.new("L", (1, s_h))
-                for y_px in range(s_h):
-                    v_grad.putpixel((0, y_px), int(255 * (1.0 - (y_px / s_h) * fade_strength)))
-                v_grad = v_grad.resize((s_w, s_h))
-                
-                grad = ImageChops.multiply(h_grad, v_grad)
-                mask_l = ImageChops.multiply(mask_l, grad)
-
-            # EN: Convert L to RGBA with the specified base opacity
-            mask_cv = Image.new("RGBA", (s_w, s_h), (0, 0, 0, 0))
-            # EN: Use mask_l as alpha channel / CN: 使用 mask_l 作为 Alpha 通道
-            mask_cv.putalpha(Image.eval(mask_l, lambda x: int(x * opacity / 255)))
-            
-            # EN: Position on buffer
-            pos_x = margin + int(spread_neg * sf) + int(off_x * sf)
-            pos_y = margin + int(spread_neg * sf) + int(off_y * sf)
-            
-            layer = Image.new("RGBA", shadow_buf.size, (0, 0, 0, 0))
-            layer.paste(mask_cv, (pos_x, pos_y))
-            layer = layer.filter(ImageFilter.GaussianBlur(radius=radius))
-            
-            shadow_buf = Image.alpha_composite(shadow_buf, layer)
-
-        # --- 2. EN: STACK LAYERS (Refined Structured Stack) / CN: 堆叠投影层 (精细结构化模型) ---
-        # Layer A: EN: Ambient Foundation (Soft but defined) / CN: 环境基底层 (柔和但有形)
-        # EN: radius 180-220 for defined softness, moderate offset for gravity
-        # CN: 中等模糊半径营造清晰的“空气感”，配合适度位移增加重力感
-        draw_layer(radius=int(180 * sf), opacity=100, off_x=0, off_y=70, spread_neg=20, fade_strength=0.15)
-        
-        # Layer B: EN: Supporting Float / CN: 支撑悬浮层
-        draw_layer(radius=int(80 * sf), opacity=140, off_x=0, off_y=40, spread_neg=10, fade_strength=0.0)
+        # --- 1. EN: STACK LAYERS (Refined Structured Stack) / CN: 堆叠投影层 (精细结构化模型) ---
+        # EN: (radius, opacity, off_x, off_y, spread_neg, fade_strength); offsets / spread in 2000px units
+        # CN: (模糊半径, 不透明度, x 偏移, y 偏移, 负扩张, 消隐强度)；偏移与扩张以 2000px 为基准
+        layers = (
+            # Layer A: EN: Ambient Foundation (Soft but defined) / CN: 环境基底层 (柔和但有形)
+            # EN: radius 180-220 for defined softness, moderate offset for gravity
+            # CN: 中等模糊半径营造清晰的“空气感”，配合适度位移增加重力感
+            (int(180 * sf), 100, 0, 70, 20, 0.15),
+            # Layer B: EN: Supporting Float / CN: 支撑悬浮层
+            (int(80 * sf), 140, 0, 40, 10, 0.0),
+            # Layer C: EN: Tactile Core (Sharp Contact) / CN: 触控核心层（利落细节）
+            (int(20 * sf), 180, 0, 15, 0, 0.0),
+        )
         
-        # Layer C: EN: Tactile Core (Sharp Contact) / CN: 触控核心层（利落细节）
-        draw_layer(radius=int(20 * sf), opacity=180, off_x=0, off_y=15, spread_neg=0, fade_strength=0.0)
+        # --- 2. EN: PYRAMID SHADOW COMPOSITE / CN: 金字塔阴影复合 ---
+        # EN: Each layer is blurred at reduced resolution and upsampled; the stack is cached per photo size
+        #     and only the bands around the photo are composited (the photo covers the rest)
+        # CN: 各层在降低的分辨率下模糊后放大；按照片尺寸缓存，且只复合照片四周的条带（其余被照片覆盖）
+        for mask, (dx, dy) in floating_shadow_bands(img.size, sf, layers):
+            canvas.paste((0, 0, 0), (x + dx, y + dy), mask)
         
-        # --- 3. EN: PASTE TO CANVAS & FINAL PHOTO / CN: 粘贴至画布与最终照片 ---
-        canvas.paste(shadow_buf, (x - margin, y - margin), shadow_buf)
+        # --- 3. EN: FINAL PHOTO / CN: 最终照片 ---
         canvas.paste(img, (x, y))
 
     def _create_fuji_rainbow_canvas(self, w, h, t_start=0, t_end=1):
@@ -651,100 +643,20 @@ class FilmRenderer:
         EN: Generate a global rainbow slice for the Rainbow theme using range [t_start, t_end].
         CN: 使用范围 [t_start, t_end] 为“彩虹”主题生成全局彩虹切片。
         """
-        canvas = Image.new("RGB", (w, h))
-        draw = ImageDraw.Draw(canvas)
-        
-        # EN: Vibrant & High-Saturation Fuji Rainbow palette (Recovered from "Grey" feedback)
-        # CN: 高饱和度“真·鲜艳”富士彩虹色谱（针对“太灰”反馈的最终校准）
-        colors = [
-            (255, 110, 110),  # Vibrant Coral Red / 鲜珊瑚红
-            (255, 180, 70),   # Vibrant Gold Orange / 鲜亮金橙
-            (255, 230, 80),   # Vibrant Sunny Yellow / 鲜亮阳光黄
-            (120, 240, 120),  # Vibrant Mint Green / 鲜嫩薄荷绿
-            (100, 230, 245),  # Vibrant Sky Cyan / 鲜碧空青
-            (100, 160, 255),  # Vibrant Ultramarine / 鲜亮群青
-            (200, 100, 255)   # Vibrant Electric Violet / 鲜亮紫罗兰
-        ]
-        
         # EN: Range is now passed directly as floats / CN: 范围现在作为浮点数直接传入
         t_start = max(0.0, min(1.0, float(t_start)))
         t_end = max(0.0, min(1.0, float(t_end)))
-        
-        for x in range(w):
-            # EN: Map the local pixel position to the global rainbow position
-            # CN: 将局部像素位置映射到全局彩虹位置
-            pos = t_start + (x / w) * (t_end - t_start)
-            
-            # EN: Find colors to interpolate
-            # CN: 寻找插值颜色
-            num_segments = len(colors) - 1
-            scaled_pos = pos * num_segments
-            idx = int(scaled_pos)
-            next_idx = min(idx + 1, num_segments)
-            inner_t = scaled_pos - idx
-            
-            c1 = colors[idx]
-            c2 = colors[next_idx]
-            
-            r = int(c1[0] + (c2[0] - c1[0]) * inner_t)
-            g = int(c1[1] + (c2[1] - c1[1]) * inner_t)
-            b = int(c1[2] + (c2[2] - c1[2]) * inner_t)
-            
-            # EN: Draw horizontal gradient line by line
-            # CN: 逐行绘制横向渐变
-            draw.line([(x, 0), (x, h)], fill=(r, g, b))
-            
-        return canvas
+
+        # EN: Map the local pixel position to the global rainbow position
+        # CN: 将局部像素位置映射到全局彩虹位置
+        return render_gradient(w, h, FUJI_RAINBOW_COLORS, t_start=t_start, t_end=t_end)
 
     def _create_rainbow_canvas(self, w, h):
         """
         EN: Generate a premium Fujifilm Instax Wide style rainbow gradient.
         CN: 生成高级感富士拍立得 Wide 风格彩虹渐变。
         """
-        canvas = Image.new("RGB", (w, h))
-        
-        # EN: Fujifilm Instax Wide Rainbow Palette (Soft Macaron tones)
-        # CN: 富士拍立得 Wide 彩虹调色板（马卡龙色系）
-        colors = [
-            (255, 180, 200), # Soft Pink / 粉
-            (210, 180, 255), # Lavender / 紫
-            (180, 220, 255), # Sky Blue / 蓝
-            (180, 255, 220), # Mint / 绿
-            (255, 250, 190), # Soft Yellow / 黄
-            (255, 210, 180)  # Peach / 橙
-        ]
-        
-        draw = ImageDraw.Draw(canvas)
-        
-        # EN: Use 30-degree diagonal soft gradient for more dynamic look
-        # CN: 使用 30 度斜向软渐变，增加动态感
-        for y in range(h):
-            # EN: Calculate gradient position based on X and Y to create diagonal effect
-            # CN: 根据 X 和 Y 计算渐变位置，创建斜向效果
-            # Formula: (y + x * tan(30)) / (h + w * tan(30))
-            # simplified to (y + x*0.58)
-            tan30 = 0.577
-            max_val = h + w * tan30
-            
-            # Since we draw line by line, we interpolate along the line
-            for x in [0, w-1]: # We only need to interpolate for the full width if needed
-                pass
-                
-            # Optimized Horizontal-ish with slight shift
-            pos = y / h
-            idx = int(pos * (len(colors) - 1))
-            next_idx = min(idx + 1, len(colors) - 1)
-            inner_pos = (pos * (len(colors) - 1)) - idx
-            
-            c1 = colors[idx]
-            c2 = colors[next_idx]
-            
-            r = int(c1[0] + (c2[0] - c1[0]) * inner_pos)
-            g = int(c1[1] + (c2[1] - c1[1]) * inner_pos)
-            b = int(c1[2] + (c2[2] - c1[2]) * inner_pos)
-            
-            draw.line([(0, y), (w, y)], fill=(r, g, b))
-            
+        canvas = render_gradient(w, h, INSTAX_RAINBOW_COLORS, vertical=True)
         # EN: Use a smaller radius to keep the "stripe" structure but soft
         # CN: 使用较小的模糊半径，保持“条纹感”且柔和
         return canvas.filter(ImageFilter.GaussianBlur(radius=15))
@@ -902,7 +814,7 @@ class FilmRenderer:
         sub_text = "".join([s["content"] for s in sub_segments if s["type"] == "text"])
         return main_text, sub_text
 
-    def _draw_pro_text(self, draw, new_w, h, side_pad_left, side_pad_right, top_pad, bottom_splice, main_text, sub_text, m_size, s_size, data=None, main_color=None, sub_color=None, use_lens_branding=True, timings=None, v_offset=0):
+    def _draw_pro_text(self, draw, new_w, h, side_pad_left, side_pad_right, top_pad, bottom_splice, main_text, sub_text, m_size, s_size, data=None, main_color=None, sub_color=None, use_lens_branding=True, timings=None, v_offset=0, persist_logo=True):
         if timings is None: timings = {}
         # EN: Use provided colors or fallback to defaults
         # CN: 使用提供的颜色，或回退至默认值
@@ -944,51 +856,17 @@ class FilmRenderer:
                     ascent, descent = main_font.getmetrics()
                     target_h = ascent + descent
                     
-                    if logo_path.lower().endswith(".svg"):
-                        # EN: Render SVG at high res first to find paths precisely
-                        # CN: 先以较高分辨率渲染 SVG 以精准获取路径边界
-                        png_data = cairosvg.svg2png(url=logo_path, output_height=target_h * 2)
-                        logo_img = Image.open(io.BytesIO(png_data))
-                    else:
-                        # EN: Load PNG/other formats directly / CN: 直接加载 PNG 等其他格式
-                        logo_img = Image.open(logo_path).convert("RGBA")
-                    
-                    # EN: Step 1 - Crop to actual content (Ink Area)
-                    # CN: 第一步 - 裁剪至实际墨迹区域（去除所有周围留白）
-                    bbox = logo_img.getbbox()
-                    if bbox:
-                        logo_img = logo_img.crop(bbox)
-                    
-                    # EN: Step 2 - Scale the "Ink" to match target text height
-                    # CN: 第二步 - 将“墨迹”等比缩放至目标文字高度
-                    orig_w, orig_h = logo_img.size
-                    if orig_h > 0:
-                        scaled_w = int(orig_w * (target_h / orig_h))
-                        logo_img = logo_img.resize((scaled_w, target_h), Image.Resampling.LANCZOS)
-
-                    # --- EN: LOGO INTELLIGENT TINTING / CN: LOGO 智能着色 ---
-                    # EN: If theme color is NOT black, adapt dark parts to match while preserving brand colors
-                    # CN: 如果文字颜色不是黑色，则将 Logo 暗部适配为该颜色，同时保留其品牌特有色彩
-                    is_black_theme = (m_color[0] < 40 and m_color[1] < 40 and m_color[2] < 40)
-                    if not is_black_theme:
-                        if logo_img.mode != 'RGBA': logo_img = logo_img.convert('RGBA')
-                        # EN: Pixel-level scan to protect color brands while tinting "ink" parts
-                        # CN: 像素级扫描，在染色“墨迹”部分的同时保护徕卡红等专业标识
-                        pixels = list(logo_img.getdata())
-                        new_pixels = []
-                        for r, g, b, a in pixels:
-                            # EN: Identify dark neutral pixels (potential candidates for theme tinting)
-                            # CN: 识别暗中性色像素（可能是黑色文字或线条）
-                            is_dark = (r < 180 and g < 180 and b < 180) # EN: Wider range / CN: 更宽的识别范围
-                            is_neutral = (abs(r-g) < 40 and abs(g-b) < 40)
-                            if is_dark and is_neutral:
-                                # EN: Tint to theme color / CN: 染色为主题色
-                                new_pixels.append((*m_color, a))
-                            else:
-                                # EN: Preserve brand colors (e.g. Leica Red, Nikon Yellow)
-                                # CN: 保留品牌特有色彩
-                                new_pixels.append((r, g, b, a))
-                        logo_img.putdata(new_pixels)
+                    # EN: Finished sprites are cached per (logo, mtime, height, tint) across the process;
+                    #     only exports write the disk mirror
+                    # CN: 完成的贴图按 (Logo, mtime, 高度, 着色) 在进程内缓存复用；仅导出时写入磁盘
+                    tint = None if is_black_tint(m_color) else tuple(m_color)
+                    cache_key = logo_sprite_cache.make_key(logo_path, target_h, tint)
+                    logo_img, cache_src = logo_sprite_cache.get_or_build(
+                        cache_key, lambda: self._render_logo_sprite(logo_path, target_h, tint), persist=persist_logo)
+                    stats = logo_sprite_cache.stats()
+                    timings['logo_cache'] = cache_src
+                    timings['logo_cache_hits'] = stats['hits'] + stats['disk_hits']
+                    timings['logo_cache_misses'] = stats['misses']
 
                     # EN: Center horizontally, align vertically with text pos
                     # CN: 水平居中，垂直与文字位置对齐
@@ -1049,6 +927,42 @@ class FilmRenderer:
         timings['text_render_pure'] = time.perf_counter() - t_text_sub_start
 
 
+    def _render_logo_sprite(self, logo_path, target_h, tint=None):
+        """
+        EN: Rasterize, crop, scale and (optionally) tint a logo into a finished RGBA sprite.
+        CN: 将 Logo 栅格化、裁剪、缩放并（可选）着色，生成最终 RGBA 贴图。
+        """
+        if logo_path.lower().endswith(".svg"):
+            # EN: Render SVG at high res first to find paths precisely
+            # CN: 先以较高分辨率渲染 SVG 以精准获取路径边界
+            png_data = cairosvg.svg2png(url=logo_path, output_height=target_h * 2)
+            logo_img = Image.open(io.BytesIO(png_data))
+        else:
+            # EN: Load PNG/other formats directly / CN: 直接加载 PNG 等其他格式
+            logo_img = Image.open(logo_path).convert("RGBA")
+
+        # EN: Step 1 - Crop to actual content (Ink Area)
+        # CN: 第一步 - 裁剪至实际墨迹区域（去除所有周围留白）
+        bbox = logo_img.getbbox()
+        if bbox:
+            logo_img = logo_img.crop(bbox)
+
+        # EN: Step 2 - Scale the "Ink" to match target text height
+        # CN: 第二步 - 将“墨迹”等比缩放至目标文字高度
+        orig_w, orig_h = logo_img.size
+        if orig_h > 0:
+            scaled_w = int(orig_w * (target_h / orig_h))
+            logo_img = logo_img.resize((scaled_w, target_h), Image.Resampling.LANCZOS)
+
+        # --- EN: LOGO INTELLIGENT TINTING / CN: LOGO 智能着色 ---
+        # EN: If theme color is NOT black, adapt dark parts to match while preserving brand colors
+        # CN: 如果文字颜色不是黑色，则将 Logo 暗部适配为该颜色，同时保留其品牌特有色彩
+        if tint is not None:
+            # EN: Vectorized scan to protect color brands while tinting "ink" parts
+            # CN: 向量化扫描，在染色“墨迹”部分的同时保护徕卡红等专业标识
+            logo_img = tint_logo(logo_img, tint)
+        return logo_img
+
     def _find_logo_path(self, make, model):
         """EN: Universal case-insensitive logo lookup.
            CN: 通用的不区分大小写 Logo 检索逻辑。支持多路径（源码 + dist）搜索。"""
@@ -1058,45 +972,40 @@ class FilmRenderer:
         if os.path.exists(dist_logo_path) and dist_logo_path not in search_dirs:
             search_dirs.append(dist_logo_path)
         
-        # 1. EN: Normalize input / CN: 正则化输入
-        make_u = str(make or "").upper().strip()
-        model_u = str(model or "").upper().strip()
-        if not model_u: return None
-
-        def _norm(s): return "".join(c for c in s if c.isalnum())
-        norm_model = _norm(model_u)
-
-        search_stems = []
-        if make_u:
-            search_stems.append(f"{make_u}-{model_u}")
-            search_stems.append(f"{make_u}_{model_u}")
-            search_stems.append(f"{make_u}{model_u}")
-        search_stems.append(model_u)
-
-        for l_dir in search_dirs:
-            if not os.path.exists(l_dir): continue
-            try:
-                files = os.listdir(l_dir)
-                supported_exts = [".svg", ".png", ".jpg", ".jpeg"]
-                file_map = {f.upper(): f for f in files if any(f.lower().endswith(ext) for ext in supported_exts)}
-                
-                # EN: First pass - strict matching with candidate stems
-                for stem in search_stems:
-                    for ext in [".svg", ".png", ".jpg"]:
-                        target_key = f"{stem}{ext.upper()}"
-                        if target_key in file_map:
-                            return os.path.join(l_dir, file_map[target_key])
-                
-                # EN: Second pass - Suffix matching
-                for file_key, actual_name in file_map.items():
-                    name_stem = os.path.splitext(file_key)[0]
-                    if name_stem.endswith(f"-{model_u}") or name_stem.endswith(f"_{model_u}"):
-                        return os.path.join(l_dir, actual_name)
-                    if _norm(name_stem) == norm_model:
-                        return os.path.join(l_dir, actual_name)
-            except:
-                continue
-        return None
+        # EN: Indexed lookup (built once per directory, refreshed on mtime change)
+        # CN: 基于索引的检索（每个目录只构建一次，mtime 变化时刷新）
+        return find_logo(search_dirs, make, model)
+
+    def load_source(self, img_path, target_long_edge, manual_rotation=0, timings=None):
+        """
+        EN: Decode, orient, rotate and resize the source photo for a render at target_long_edge.
+            This is what process_image does without source_img; previews cache the result.
+        CN: 为 target_long_edge 尺寸的渲染解码、转正、旋转并缩放源照片。
+            与 process_image 未传 source_img 时的处理一致；预览会缓存其结果。
+        """
+        timings = timings if timings is not None else {}
+        t_load_start = time.perf_counter()
+        # EN: Decode from the shared read-once source (header already parsed by get_data), shrunk by
+        #     the decode planner to ~2x the target long edge (JPEG DCT scaling / reduce)
+        # CN: 从共享的只读一次图像源解码（get_data 已解析过文件头），并由解码规划器缩小到约 2 倍
+        #     目标长边（JPEG DCT 缩放 / reduce）
+        img = get_image_source(img_path).open_image()
+        img = decode_for_size(img, (target_long_edge, target_long_edge), fit="contain")
+
+        # EN: Handle EXIF orientation automatically / CN: 自动处理 EXIF 旋转信息
+        img = ImageOps.exif_transpose(img)
+
+        # EN: Apply manual rotation (0, 90, 180, 270) / CN: 应用手动旋转
+        if manual_rotation != 0:
+            img = img.rotate(-manual_rotation, expand=True)
+
+        if img.mode != "RGB": img = img.convert("RGB")
+        timings['load_rotate'] = time.perf_counter() - t_load_start
+
+        t_resize_start = time.perf_counter()
+        img = self._smart_resize(img, target_long_edge)
+        timings['resize'] = time.perf_counter() - t_resize_start
+        return img
 
     def _smart_resize(self, img, target):
         w, h = img.size
@@ -1107,30 +1016,24 @@ class FilmRenderer:
         return img.resize((int(w * scale), int(h * scale)), algo)
 
     def _apply_pro_shadow(self, canvas, radius=20):
-        shadow_margin = 80
-        # EN: Use transparent black (0,0,0,0) to avoid white corners on compression
-        # CN: 使用透明黑 (0,0,0,0) 作为基色，防止压缩后出现白角
-        full_canvas = Image.new("RGBA", (canvas.width + shadow_margin, canvas.height + shadow_margin), (0, 0, 0, 0))
-        shadow_mask = Image.new("RGBA", canvas.size, (0, 0, 0, 140))
-        shadow_pos = (shadow_margin // 2, shadow_margin // 2 + 10)
-        full_canvas.paste(shadow_mask, shadow_pos)
-        full_canvas = full_canvas.filter(ImageFilter.GaussianBlur(radius=radius))
-        canvas_rgba = canvas.convert("RGBA")
-        full_canvas.paste(canvas_rgba, (shadow_margin // 2, shadow_margin // 2), canvas_rgba)
-        return full_canvas
+        # EN: Edge-only 9-slice shadow (same pixels as blurring the whole canvas + 80px margin)
+        # CN: 仅处理边缘的九宫格阴影（与对整幅画布 + 80px 边距做模糊的像素结果一致）
+        return apply_shadow(canvas, radius=radius, opacity=140, margin=PRO_SHADOW_MARGIN, offset=(0, 10))
+
+    def _pro_shadow_frame(self, size, radius=20):
+        """
+        EN: Light-theme preview shadow flattened onto white, with a placeholder where the canvas goes.
+        CN: 浅色主题预览阴影复合到白底上的结果，画布位置为占位区域。
+        """
+        shadow = self._apply_pro_shadow(Image.new("RGB", size), radius=radius)
+        frame = Image.new("RGB", shadow.size, (255, 255, 255))
+        frame.paste(shadow, mask=shadow.split()[3])
+        return frame
 
     def _apply_pro_shadow_fast(self, canvas, radius=5):
         # EN: Fast version for preview using BoxBlur
         # CN: 预览专用快速版，使用 BoxBlur
-        shadow_margin = 60
-        full_canvas = Image.new("RGBA", (canvas.width + shadow_margin, canvas.height + shadow_margin), (0, 0, 0, 0))
-        shadow_mask = Image.new("RGBA", canvas.size, (0, 0, 0, 120))
-        shadow_pos = (shadow_margin // 2, shadow_margin // 2 + 6)
-        full_canvas.paste(shadow_mask, shadow_pos)
-        full_canvas = full_canvas.filter(ImageFilter.BoxBlur(radius=radius))
-        canvas_rgba = canvas.convert("RGBA")
-        full_canvas.paste(canvas_rgba, (shadow_margin // 2, shadow_margin // 2), canvas_rgba)
-        return full_canvas
+        return apply_shadow(canvas, radius=radius, opacity=120, margin=60, offset=(0, 6), kind="box")
 
     def _save_with_limit(self, img, original_path, output_dir, data, current_res, layout_name, output_prefix="", theme="light"):
         # EN: Default to JPG for better social media compatibility, fallback to PNG if requested
@@ -1177,9 +1080,10 @@ class FilmRenderer:
         CN: 提取原始 EXIF 并根据 UI 手动覆盖参数进行 Patch。
         """
         raw_fallback = b""
+        src = None
         try:
-            with Image.open(original_path) as test_img:
-                raw_fallback = test_img.info.get("exif", b"")
+            src = get_image_source(original_path)
+            raw_fallback = src.exif_bytes
         except: pass
 
         if not piexif:
@@ -1187,7 +1091,7 @@ class FilmRenderer:
         
         try:
             # 1. EN: Load original EXIF / CN: 加载原始 EXIF
-            exif_dict = piexif.load(original_path)
+            exif_dict = src.piexif_dict() if src is not None else piexif.load(original_path)
             
             # 2. EN: Patch 0th IFD (Make, Model) / CN: 更新 0th IFD (品牌、型号)
             # ... (lines 740-784) ...
@@ -1269,12 +1173,11 @@ class FilmRenderer:
         try:
             actual_path = self._resolve_path(font_path)
             if os.path.exists(actual_path):
-                if actual_path.lower().endswith(".ttc"):
-                    return ImageFont.truetype(actual_path, size, index=0)
-                return ImageFont.truetype(actual_path, size)
-            return ImageFont.load_default()
+                # EN: Shared LRU font service (no reload per call) / CN: 共享 LRU 字体服务（不再每次调用都重新加载）
+                return font_service.get_or_default(actual_path, size)
+            return font_service.default_font()
         except:
-            return ImageFont.load_default()
+            return font_service.default_font()
 
     def _contains_chinese(self, text):
         """EN: Detect if text contains CJK characters. / CN: 检测文本是否包含中文字符。"""
@@ -1,9 +1,16 @@
 # core/renderers/base_renderer.py
 import os
 import sys
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
+from core.font_service import font_service
+from core.sprite_atlas import sprite_atlas
+from core.band_canvas import BandCanvas
 
 class BaseFilmRenderer:
+    # EN: Frames one sheet holds; renderers with config-driven grids override page_capacity()
+    # CN: 单页可容纳的帧数；网格由配置决定的渲染器覆盖 page_capacity()
+    FRAMES_PER_PAGE = None
+
     def __init__(self, font_path="consola.ttf", font_size=44):
         # EN: Get resource base path (works both in dev and PyInstaller exe)
         # CN: 获取资源基础路径（开发环境和打包后的 exe 都适用）
@@ -15,23 +22,25 @@ class BaseFilmRenderer:
             current_dir = os.path.dirname(os.path.abspath(__file__))
             base_path = os.path.dirname(os.path.dirname(current_dir))
         
+        # EN: Faces come from the shared font service, so new renderer instances reuse warm fonts
+        # CN: 字体来自共享字体服务，新建渲染器实例可复用已加载的字体
         # A. EN: Standard Font / CN: 标准字体
         try:
-            self.font = ImageFont.truetype(font_path, font_size)
+            self.font = font_service.get(font_path, font_size)
         except:
-            self.font = ImageFont.load_default()
+            self.font = font_service.default_font()
 
         # B. EN: Metadata Font (Seven Segment) / CN: 元数据字体 (数码管)
         seg_path = os.path.join(base_path, "assets", "fonts", "LiquidCrystal-Bold.otf")
         try:
-            self.seg_font = ImageFont.truetype(seg_path, 40)
+            self.seg_font = font_service.get(seg_path, 40)
         except:
             self.seg_font = self.font
 
         # C. EN: Edge Marking Font (LED Dot-Matrix) / CN: 侧边喷码字体 (点阵)
         led_path = os.path.join(base_path, "assets", "fonts", "consola.ttf")
         try:
-            self.led_font = ImageFont.truetype(led_path, 48)
+            self.led_font = font_service.get(led_path, 48)
         except:
             print(f"CN: [!] 未找到喷码字体: {led_path}, 将回退。")
             self.led_font = self.font
@@ -39,7 +48,7 @@ class BaseFilmRenderer:
         # D. EN: LED Dot-Matrix1 Font (for 135 date display) / CN: LED Dot-Matrix1 字体 (用于 135 日期显示)
         led_dot_path = os.path.join(base_path, "assets", "fonts", "LED Dot-Matrix1.ttf")
         try:
-            self.led_dot_font = ImageFont.truetype(led_dot_path, 40)
+            self.led_dot_font = font_service.get(led_dot_path, 40)
         except:
             print(f"CN: [!] 未找到 LED Dot-Matrix1 字体: {led_dot_path}, 将回退到数码管字体。")
             self.led_dot_font = self.seg_font
@@ -47,32 +56,46 @@ class BaseFilmRenderer:
         # E. EN: IntoDotMatrix Font (alternative for 135 date stamp) / CN: IntoDotMatrix 字体（135 日期喷码备用）
         into_dot_path = os.path.join(base_path, "assets", "fonts", "intodotmatrix.ttf")
         try:
-            self.into_dot_font = ImageFont.truetype(into_dot_path, 40)
+            self.into_dot_font = font_service.get(into_dot_path, 40)
         except:
             print(f"CN: [!] 未找到 IntoDotMatrix 字体: {into_dot_path}, 将回退到 LED Dot-Matrix1。")
             self.into_dot_font = self.led_dot_font
 
-    def prepare_canvas(self, w, h, emulsion_number=None):
+    def page_capacity(self, meta_handler, orientation=None):
+        """EN: Frames per contact sheet page / CN: 每页索引页可容纳的帧数"""
+        return self.FRAMES_PER_PAGE
+
+    def resolve_emulsion(self, emulsion_number=None):
         """
-        EN: Prepare canvas and get emulsion number
-        CN: 准备画布并获取乳剂号
-        
-        Args:
-            emulsion_number: Optional emulsion number for GUI mode
+        EN: Emulsion number for the roll: the given value, a CLI prompt when interactive, else empty.
+        CN: 整卷乳剂号：优先使用传入值；可交互命令行时询问用户；否则为空。
         """
         if emulsion_number is None:
             # EN: If interactive (CLI), ask user; otherwise default to empty to avoid GUI blocking.
             # CN: 若为可交互命令行则询问用户；否则默认空字符串，避免 GUI 阻塞。
             if getattr(sys.stdin, "isatty", lambda: False)():
-                user_emulsion = input(
+                return input(
                     "EN: Enter emulsion number (e.g. 049) | CN: 请输入乳剂号 (如 049) >>> "
                 ).strip()
-            else:
-                user_emulsion = ""
+            return ""
+        # EN: GUI mode - use provided value / CN: GUI模式 - 使用提供的值
+        return (emulsion_number or "").strip() if isinstance(emulsion_number, str) else str(emulsion_number)
+
+    def prepare_canvas(self, w, h, emulsion_number=None, banded=False):
+        """
+        EN: Prepare canvas and get emulsion number
+        CN: 准备画布并获取乳剂号
+        
+        Args:
+            emulsion_number: Optional emulsion number for GUI mode
+            banded: Return a BandCanvas that is composed and saved in horizontal bands
+        """
+        user_emulsion = self.resolve_emulsion(emulsion_number)
+        if banded:
+            # EN: Record now, compose band by band on save / CN: 先记录，保存时逐条带合成
+            canvas = BandCanvas((w, h), (235, 235, 235))
         else:
-            # EN: GUI mode - use provided value / CN: GUI模式 - 使用提供的值
-            user_emulsion = (emulsion_number or "").strip() if isinstance(emulsion_number, str) else str(emulsion_number)
-        canvas = Image.new("RGB", (w, h), (235, 235, 235))
+            canvas = Image.new("RGB", (w, h), (235, 235, 235))
         return canvas, user_emulsion
 
     def get_marking_str(self, sample_data, user_emulsion):
@@ -93,23 +116,31 @@ class BaseFilmRenderer:
         return tri_img
 
     def create_rotated_text(self, text, angle=90, color=(245, 130, 35, 210)):
-        left, top, right, bottom = self.led_font.getbbox(text)
-        w, h = right - left, bottom - top
-        txt_img = Image.new('RGBA', (w + 20, h + 10), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(txt_img)
-        draw.text((10, 0), text, font=self.led_font, fill=color)
-        return txt_img.rotate(angle, expand=True)
+        """
+        EN: Rotated LED edge-code layer, cached in the sprite atlas (shared image: paste only).
+        CN: 旋转的 LED 喷码图层，缓存在贴图图集中（共享图像：只可粘贴）。
+        """
+        def build():
+            left, top, right, bottom = self.led_font.getbbox(text)
+            w, h = right - left, bottom - top
+            txt_img = Image.new('RGBA', (w + 20, h + 10), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(txt_img)
+            draw.text((10, 0), text, font=self.led_font, fill=color)
+            return txt_img.rotate(angle, expand=True)
+        return sprite_atlas.rotated_layer("led", self.led_font, text, color, angle, build)
     
     def create_rotated_seg_text(self, text, angle, color):
         """ 
-        EN: Standard Seven-Segment text generator with rotation.
-        CN: 标准数码管文字生成器，支持旋转，复用项目内置 seg_font。
+        EN: Standard Seven-Segment text generator with rotation (cached in the sprite atlas).
+        CN: 标准数码管文字生成器，支持旋转，复用项目内置 seg_font（缓存在贴图图集中）。
         """
-        l, t, r, b = self.seg_font.getbbox(text)
-        img = Image.new('RGBA', (r - l + 20, b - t + 10), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        draw.text((10, 0), text, font=self.seg_font, fill=color)
-        return img.rotate(angle, expand=True)
+        def build():
+            l, t, r, b = self.seg_font.getbbox(text)
+            img = Image.new('RGBA', (r - l + 20, b - t + 10), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(img)
+            draw.text((10, 0), text, font=self.seg_font, fill=color)
+            return img.rotate(angle, expand=True)
+        return sprite_atlas.rotated_layer("seg", self.seg_font, text, color, angle, build)
     
     def get_clean_exif(self, data):
         """
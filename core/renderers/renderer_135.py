@@ -3,8 +3,14 @@
 # CN: 135 画幅渲染器，带有动态喷码和精准定位
 
 import os
+from functools import partial
 from PIL import Image, ImageDraw, ImageFont
 from .base_renderer import BaseFilmRenderer
+from core.font_service import font_service
+from core.frame_loader import FrameLoader
+from core.decode_planner import decode_for_size
+from core.sprite_atlas import sprite_atlas
+from core.band_canvas import draw_for
 # EN: --- [New] Vector rendering dependencies ---
 # CN: --- [新增] 矢量渲染依赖 ---
 # EN: We now require cairosvg to be available, no longer providing fallback options.
@@ -16,11 +22,28 @@ from cairosvg import svg2png
 import io
 # EN: --- [END OF NEW IMPORTS] ---
 # CN: --- [新增导入结束] ---
+from core.sprite_cache import SpriteDiskCache
+from utils.config_manager import config_manager
+
+
+def _sprocket_disk_dir():
+    if not config_manager.get("sprocket_disk_cache", True):
+        return None
+    return os.path.join(config_manager.config_dir, "cache", "sprockets")
+
+
+# EN: Rasterized sprocket strips, shared by Renderer135 and Renderer135HF (LRU + PNG mirror)
+# CN: 栅格化齿孔条缓存，Renderer135 与 Renderer135HF 共享（LRU + 磁盘 PNG 镜像）
+sprocket_strip_cache = SpriteDiskCache(capacity=8, disk_dir=_sprocket_disk_dir(), label=("Sprocket strip", "齿孔条"))
 
 class Renderer135(BaseFilmRenderer):
     """EN: 135 Format - Dynamic EdgeCode & Precision Positioning (v9.2)
        CN: 135 画幅 - 动态喷码修正版：解决写死字符串问题、数据后背极低位压低、手动输入复用问题。"""
-    def render(self, canvas, img_list, cfg, meta_handler, user_emulsion, sample_data=None, orientation=None, show_date=True, show_exif=True):
+    def page_capacity(self, meta_handler, orientation=None):
+        cfg = meta_handler.get_contact_layout("135")
+        return cfg.get('cols', 6) * cfg.get('rows', 6)
+
+    def render(self, canvas, img_list, cfg, meta_handler, user_emulsion, sample_data=None, orientation=None, show_date=True, show_exif=True, frame_offset=0):
         # EN: Execute 135 rendering with fixed manual input reuse
         # CN: 执行 135 渲染，修复复用手动输入的 sample_data
         print("\n" + "="*65)
@@ -33,7 +56,7 @@ class Renderer135(BaseFilmRenderer):
         final_cfg = meta_handler.get_contact_layout("135")
         new_w, new_h = final_cfg.get('canvas_w', 4800), final_cfg.get('canvas_h', 6000)
         canvas = canvas.resize((new_w, new_h))
-        draw = ImageDraw.Draw(canvas)
+        draw = draw_for(canvas)
         draw.rectangle([0, 0, new_w, new_h], fill=(235, 235, 235))
 
         # EN: --- 1. ISO 1007 physical parameters (mm) ---
@@ -56,8 +79,8 @@ class Renderer135(BaseFilmRenderer):
 
         # EN: Unified reduced edge code font size (1.6mm physical height)
         # CN: 统一缩小的喷码字号 (1.6mm 物理高度)
-        em_font = self.led_font.font_variant(size=int(1.6 * px_per_mm))
-        db_font = self.seg_font.font_variant(size=int(1.6 * px_per_mm))
+        em_font = font_service.variant(self.led_font, int(1.6 * px_per_mm))
+        db_font = font_service.variant(self.seg_font, int(1.6 * px_per_mm))
 
         # EN: --- [Core modification] Read only once, get standard info ---
         # CN: --- [核心修改点] 只读取一次，获取标准信息 ---
@@ -73,139 +96,150 @@ class Renderer135(BaseFilmRenderer):
         # EN: --- [END OF MODIFICATION] ---
         # CN: --- [核心修改结束] ---
 
-        # EN: Render each row
-        # CN: 遍历每一行进行渲染
-        for r in range(rows):
-            sy = m_y_t + r * (strip_h + rg)
-            strip_start_x, strip_end_x = m_x - gap_w // 2, m_x + (cols * (photo_w + gap_w)) - gap_w // 2
-            draw.rectangle([strip_start_x, sy, strip_end_x, sy + strip_h], fill=(12, 12, 12))
-            # EN: --- [Core modification] Use high-precision vector sprockets ---
-            # CN: --- [核心修改] 使用高精度矢量齿孔 ---
-            self._draw_iso_sprockets_vector(canvas, strip_start_x, strip_end_x, sy, info_h, strip_h, sp_w, sp_h, px_per_mm, display_code_from_standard)
-            # EN: --- [END OF MODIFICATION] ---
-            # CN: --- [核心修改结束] ---
-
-            # EN: Render each column
-            # CN: 遍历每一列
-            for c in range(cols):
-                idx = r * cols + c
-                if idx >= len(img_list):
-                    break
-                curr_x, py = m_x + c * (photo_w + gap_w), sy + info_h
-
-                # EN: --- [Core modification] Use pre-read standard info ---
-                # CN: --- [核心修改点] 使用预读取的标准信息 ---
-                # EN: cur_color and display_code both come from first read standard_data
-                # CN: cur_color 和 display_code 都来自第一次读取的 standard_data
-                cur_color = cur_color_from_standard
-                display_code = display_code_from_standard
+        # EN: Frames are decoded, rotated and resized ahead on the shared loader
+        # CN: 帧由共享加载器提前解码、旋转并缩放
+        with FrameLoader(img_list[:rows * cols], partial(self._fit_photo_auto_rotate, w=photo_w, h=photo_h)) as frames:
+            # EN: Render each row
+            # CN: 遍历每一行进行渲染
+            for r in range(rows):
+                sy = m_y_t + r * (strip_h + rg)
+                strip_start_x, strip_end_x = m_x - gap_w // 2, m_x + (cols * (photo_w + gap_w)) - gap_w // 2
+                draw.rectangle([strip_start_x, sy, strip_end_x, sy + strip_h], fill=(12, 12, 12))
+                # EN: --- [Core modification] Use high-precision vector sprockets ---
+                # CN: --- [核心修改] 使用高精度矢量齿孔 ---
+                self._draw_iso_sprockets_vector(canvas, strip_start_x, strip_end_x, sy, info_h, strip_h, sp_w, sp_h, px_per_mm, display_code_from_standard)
                 # EN: --- [END OF MODIFICATION] ---
                 # CN: --- [核心修改结束] ---
 
-                # EN: Paste photo with auto rotation
-                # CN: 粘贴照片，自动旋转
-                self._paste_photo_auto_rotate(canvas, img_list[idx], curr_x, py, photo_w, photo_h)
-
-                # EN: --- [Logic correction] Dynamic EdgeCode ---
-                # CN: --- [修正逻辑] 动态 EdgeCode ---
-                # EN: Use display_code obtained from standard_data
-                # CN: 使用从 standard_data 获取的 display_code
-                top_label = f"{idx + 1} {display_code}"
-                tw = draw.textlength(top_label, font=em_font)
-                # EN: Center vertically in top 2mm gap
-                # CN: 顶部 2mm 缝隙垂直居中
-                draw.text((curr_x + (photo_w - tw)//2, sy + int(0.2 * px_per_mm)), top_label, font=em_font, fill=cur_color)
-
-                # EN: Frame number in bottom inter-frame gap
-                # CN: 底部过片间隙帧号
-                gap_center_x = curr_x + photo_w + (gap_w // 2)
-                frame_label = f"{idx + 1}A"
-                fw = draw.textlength(frame_label, font=em_font)
-                # EN: Center vertically in bottom 2mm gap
-                # CN: 底部 2mm 缝隙垂直居中
-                draw.text((gap_center_x - fw//2, sy + strip_h - int(1.8 * px_per_mm)), frame_label, font=em_font, fill=cur_color)
-
-                # EN: [Precise definition] Define two variables controlling date and EXIF
-                # CN: [精准定义] 定义两个变量，分别控制日期和 EXIF
-                # EN: date_font for bottom-right of photo, exif_font for black margin outside photo
-                # CN: date_font 用于照片内右下角，exif_font 用于照片外黑边
-                date_font = self.into_dot_font.font_variant(size=int(1.5 * px_per_mm))
-                exif_font = self.seg_font.font_variant(size=int(1.5 * px_per_mm))  # EN: EXIF slightly smaller to fit margin / CN: EXIF 稍微小一点，适合塞进黑边
-
-                # EN: --- [Important] Data back information ---
-                # CN: --- [重要] 数据背信息 ---
-                # EN: Data back may need to display photo-specific info (date, EXIF).
-                # EN: For compatibility and consistency, choose standard_data or individual_data here.
-                # EN: Option 1: All photos show same base info (e.g., unified camera model)
-                # EN: sample_data_for_back = standard_data
-                # EN: Option 2: Each photo shows its own specific EXIF
-                # CN: 数据背可能需要显示每张照片特有的信息（如具体日期、EXIF）。
-                # CN: 为了兼容性和一致性，这里可以选择使用 standard_data 或 individual_data。
-                # CN: 方案一：所有照片显示相同的基础信息（如统一的相机型号，若存在）
-                # CN: sample_data_for_back = standard_data
-                # CN: 方案二：照片显示各自的具体EXIF
-                sample_data_for_back = meta_handler.get_data(img_list[idx])
-
-                # EN: Lowered data back (far bottom-right corner)
-                # CN: 压低的数据后背 (极靠右下角)
-                self._draw_glowing_data_back(
-                    canvas,
-                    sample_data_for_back,
-                    curr_x,
-                    py,
-                    photo_w,
-                    photo_h,
-                    cur_color,
-                    date_font,
-                    exif_font,
-                    px_per_mm,
-                    show_date=show_date,
-                    show_exif=show_exif
-                )
-
-        # EN: --- [Final cutoff] Global right-side cleanup ---
-        # CN: --- [最终截断] 全局右侧清理 ---
-        # EN: 135 renderer has fixed dimensions, directly paint background color beyond last photo column to cut off all overflow.
-        # CN: 135 渲染器尺寸固定，直接在照片右边缘外侧刷一层背景色，切掉所有超出的序号。
-        # EN: Calculate theoretical right edge of last photo column (px)
-        # CN: 计算理论上最后一列照片的右边缘 (px)
-        # EN: 135 mode: margin + columns * (photo_w + gap) - last extra gap
-        # CN: 135 模式：起始偏移 + 列数 * (照片宽 + 间隙) - 最后一个多算的间隙
-        max_photo_right = m_x + cols * (photo_w + gap_w) - gap_w
-        # EN: Cutoff point: right edge of last photo + 1mm breathing room
-        # CN: 截断点：最后一张照片右边缘 + 1mm 呼吸位
-        final_cutoff_x = max_photo_right + int(1.0 * px_per_mm)
-        # EN: If cutoff point is within canvas, paint to the bottom
-        # CN: 如果截断点在画布内，直接刷到底
-        if final_cutoff_x < new_w:
-            # EN: draw.rectangle([left, top, right, bottom], fill=background_color)
-            # CN: draw.rectangle([左, 上, 右, 下], fill=背景色)
-            # EN: y1=0, y2=new_h represents painting from canvas top to bottom
-            # CN: y1=0, y2=new_h 代表从画布顶部一直刷到底部
-            draw.rectangle([final_cutoff_x, 0, new_w, new_h], fill=(235, 235, 235))
+                # EN: Render each column
+                # CN: 遍历每一列
+                for c in range(cols):
+                    idx = r * cols + c
+                    if idx >= len(img_list):
+                        break
+                    curr_x, py = m_x + c * (photo_w + gap_w), sy + info_h
+
+                    # EN: --- [Core modification] Use pre-read standard info ---
+                    # CN: --- [核心修改点] 使用预读取的标准信息 ---
+                    # EN: cur_color and display_code both come from first read standard_data
+                    # CN: cur_color 和 display_code 都来自第一次读取的 standard_data
+                    cur_color = cur_color_from_standard
+                    display_code = display_code_from_standard
+                    # EN: --- [END OF MODIFICATION] ---
+                    # CN: --- [核心修改结束] ---
+
+                    # EN: Paste photo with auto rotation
+                    # CN: 粘贴照片，自动旋转
+                    canvas.paste(frames.get(idx), (int(curr_x), int(py)))
+
+                    # EN: --- [Logic correction] Dynamic EdgeCode ---
+                    # CN: --- [修正逻辑] 动态 EdgeCode ---
+                    # EN: Use display_code obtained from standard_data
+                    # CN: 使用从 standard_data 获取的 display_code
+                    frame_no = str(frame_offset + idx + 1)
+                    top_label = f"{frame_no} {display_code}"
+                    tw = draw.textlength(top_label, font=em_font)
+                    # EN: Center vertically in top 2mm gap
+                    # CN: 顶部 2mm 缝隙垂直居中
+                    # EN: Number glyphs + the roll-constant code come from the sprite atlas
+                    # CN: 帧号字形与整卷不变的喷码来自贴图图集
+                    sprite_atlas.draw_text(draw, (curr_x + (photo_w - tw)//2, sy + int(0.2 * px_per_mm)), top_label, em_font, cur_color,
+                                           runs=[*frame_no, f" {display_code}"])
+
+                    # EN: Frame number in bottom inter-frame gap
+                    # CN: 底部过片间隙帧号
+                    gap_center_x = curr_x + photo_w + (gap_w // 2)
+                    frame_label = f"{frame_no}A"
+                    fw = draw.textlength(frame_label, font=em_font)
+                    # EN: Center vertically in bottom 2mm gap
+                    # CN: 底部 2mm 缝隙垂直居中
+                    sprite_atlas.draw_text(draw, (gap_center_x - fw//2, sy + strip_h - int(1.8 * px_per_mm)), frame_label, em_font, cur_color,
+                                           runs=list(frame_label))
+
+                    # EN: [Precise definition] Define two variables controlling date and EXIF
+                    # CN: [精准定义] 定义两个变量，分别控制日期和 EXIF
+                    # EN: date_font for bottom-right of photo, exif_font for black margin outside photo
+                    # CN: date_font 用于照片内右下角，exif_font 用于照片外黑边
+                    date_font = font_service.variant(self.into_dot_font, int(1.5 * px_per_mm))
+                    exif_font = font_service.variant(self.seg_font, int(1.5 * px_per_mm))  # EN: EXIF slightly smaller to fit margin / CN: EXIF 稍微小一点，适合塞进黑边
+
+                    # EN: --- [Important] Data back information ---
+                    # CN: --- [重要] 数据背信息 ---
+                    # EN: Data back may need to display photo-specific info (date, EXIF).
+                    # EN: For compatibility and consistency, choose standard_data or individual_data here.
+                    # EN: Option 1: All photos show same base info (e.g., unified camera model)
+                    # EN: sample_data_for_back = standard_data
+                    # EN: Option 2: Each photo shows its own specific EXIF
+                    # CN: 数据背可能需要显示每张照片特有的信息（如具体日期、EXIF）。
+                    # CN: 为了兼容性和一致性，这里可以选择使用 standard_data 或 individual_data。
+                    # CN: 方案一：所有照片显示相同的基础信息（如统一的相机型号，若存在）
+                    # CN: sample_data_for_back = standard_data
+                    # CN: 方案二：照片显示各自的具体EXIF
+                    sample_data_for_back = meta_handler.get_data(img_list[idx])
+
+                    # EN: Lowered data back (far bottom-right corner)
+                    # CN: 压低的数据后背 (极靠右下角)
+                    self._draw_glowing_data_back(
+                        canvas,
+                        sample_data_for_back,
+                        curr_x,
+                        py,
+                        photo_w,
+                        photo_h,
+                        cur_color,
+                        date_font,
+                        exif_font,
+                        px_per_mm,
+                        show_date=show_date,
+                        show_exif=show_exif
+                    )
+
+            # EN: --- [Final cutoff] Global right-side cleanup ---
+            # CN: --- [最终截断] 全局右侧清理 ---
+            # EN: 135 renderer has fixed dimensions, directly paint background color beyond last photo column to cut off all overflow.
+            # CN: 135 渲染器尺寸固定，直接在照片右边缘外侧刷一层背景色，切掉所有超出的序号。
+            # EN: Calculate theoretical right edge of last photo column (px)
+            # CN: 计算理论上最后一列照片的右边缘 (px)
+            # EN: 135 mode: margin + columns * (photo_w + gap) - last extra gap
+            # CN: 135 模式：起始偏移 + 列数 * (照片宽 + 间隙) - 最后一个多算的间隙
+            max_photo_right = m_x + cols * (photo_w + gap_w) - gap_w
+            # EN: Cutoff point: right edge of last photo + 1mm breathing room
+            # CN: 截断点：最后一张照片右边缘 + 1mm 呼吸位
+            final_cutoff_x = max_photo_right + int(1.0 * px_per_mm)
+            # EN: If cutoff point is within canvas, paint to the bottom
+            # CN: 如果截断点在画布内，直接刷到底
+            if final_cutoff_x < new_w:
+                # EN: draw.rectangle([left, top, right, bottom], fill=background_color)
+                # CN: draw.rectangle([左, 上, 右, 下], fill=背景色)
+                # EN: y1=0, y2=new_h represents painting from canvas top to bottom
+                # CN: y1=0, y2=new_h 代表从画布顶部一直刷到底部
+                draw.rectangle([final_cutoff_x, 0, new_w, new_h], fill=(235, 235, 235))
 
         return canvas
 
     
 
-    def _paste_photo_auto_rotate(self, canvas, path, x, y, w, h):
-        # EN: Helper method to paste and resize photo with auto rotation
-        # CN: 辅助方法：粘贴并调整照片大小，自动旋转
-        with Image.open(path) as img:
-            # EN: If portrait orientation, rotate to landscape
-            # CN: 如果是竖向，旋转为横向
-            if img.height > img.width:
-                img = img.rotate(-90, expand=True)
-            img = img.resize((w, h), Image.Resampling.LANCZOS)
-            canvas.paste(img, (int(x), int(y)))
+    @staticmethod
+    def _fit_photo_auto_rotate(img, w, h):
+        # EN: Frame loader helper: resize photo with auto rotation
+        # CN: 帧加载器辅助方法：自动旋转并调整照片大小
+        # EN: If portrait orientation, rotate to landscape
+        # CN: 如果是竖向，旋转为横向
+        if img.height > img.width:
+            img = decode_for_size(img, (h, w))
+            img = img.rotate(-90, expand=True)
+        else:
+            img = decode_for_size(img, (w, h))
+        return img.resize((w, h), Image.Resampling.LANCZOS)
 
     def _draw_single_glowing_text(self, canvas, text, pos, font, color):
         # EN: Draw text with subtle glow effect
         # CN: 绘制带微弱光晕效果的文字
-        draw = ImageDraw.Draw(canvas)
+        # CN: 两次绘制共用图集中的同一掩码
+        draw = draw_for(canvas)
         glow_color = (color[0], color[1], color[2], 75)
-        draw.text((pos[0]+1, pos[1]+1), text, font=font, fill=glow_color)
-        draw.text(pos, text, font=font, fill=color)
+        sprite_atlas.draw_text(draw, (pos[0]+1, pos[1]+1), text, font, glow_color)
+        sprite_atlas.draw_text(draw, pos, text, font, color)
 
     def _draw_glowing_data_back(self, canvas, data, px, py, pw, ph, color, d_font, e_font, px_mm, show_date=True, show_exif=True):
         # EN: Draw photo data on black margin (date and EXIF)
@@ -244,7 +278,7 @@ class Renderer135(BaseFilmRenderer):
             offset_y = 4 * px_mm
             # EN: Calculate X center: photo_start + (photo_width - text_width) / 2
             # CN: 计算 x 居中：照片起点 + (照片宽 - 文字宽) / 2
-            tw_e = ImageDraw.Draw(canvas).textlength(exif_str, font=e_font)
+            tw_e = draw_for(canvas).textlength(exif_str, font=e_font)
             pos_e_x = px + (pw - tw_e) // 2
             # EN: Y axis: photo bottom + offset
             # CN: y 轴：照片底边 py + ph 再加上偏移
@@ -256,15 +290,43 @@ class Renderer135(BaseFilmRenderer):
         """
         EN: Render high-precision anti-aliased sprockets using SVG + CairoSVG.
         EN: Determine sprocket shape based on film name: custom shape for movie film, rounded rect for others.
+        EN: The rasterized strip is cached by (strip_width, strip_h, px_per_mm, shape), so rows and
+            sheets (including 135HF strips) with the same geometry reuse one render.
         CN: 使用 SVG + CairoSVG 绘制高精度抗锯齿齿孔。
         CN: 根据胶片名称判断使用哪种齿孔形状：电影胶卷使用自定义形状，其他使用圆角矩形
+        CN: 栅格化后的齿孔条按 (strip_width, strip_h, px_per_mm, 形状) 缓存，几何相同的各行与各页
+            （包括 135HF 底片条）共用一次渲染。
         """
-        # EN: Create transparent canvas matching strip width/height (RGBA)
-        # CN: 创建一个与胶片条等宽高的透明画布 (RGBA)
+        # EN: Strip width/height of the transparent layer (RGBA)
+        # CN: 与胶片条等宽高的透明图层 (RGBA)
         strip_width = int(x_end - x_start)
         if strip_width <= 0:
             return
 
+        # EN: More accurately determine if movie film
+        # CN: 更精确地判断是否为电影胶卷
+        # EN: Check for movie film keywords
+        # CN: 检查是否包含电影胶卷的关键字
+        film_name_lower = film_name.lower()
+        is_movie_film = any(keyword in film_name_lower for keyword in [
+            'vision', 'tungsten', 'daylight', '52', '72', '53', 'double-x', 
+            'technical pan', 'infrared', '50d', '250d', '500t', '200t', '1000t',
+            'motion picture', 'movie', 'cinema', 'film'
+        ])
+        
+        key = (strip_width, int(strip_h), round(float(px_per_mm), 6), "movie" if is_movie_film else "standard")
+        vector_strip, _ = sprocket_strip_cache.get_or_build(
+            key, lambda: self._rasterize_sprocket_strip(strip_width, int(strip_h), px_per_mm, is_movie_film))
+
+        # EN: Paste vector strip onto main canvas
+        # CN: 将矢量条贴到主画布上
+        canvas.paste(vector_strip, (int(x_start), int(sy)), mask=vector_strip)
+
+    def _rasterize_sprocket_strip(self, strip_width, strip_h, px_per_mm, is_movie_film):
+        """
+        EN: Build the sprocket SVG for one strip and rasterize it to an RGBA layer.
+        CN: 为一条胶片条构建齿孔 SVG 并栅格化为 RGBA 图层。
+        """
         # EN: --- 1. Build SVG ---
         # CN: --- 1. 构建 SVG ---
         dwg = svgwrite.Drawing(size=(strip_width, strip_h), profile='tiny')
@@ -402,17 +464,6 @@ class Renderer135(BaseFilmRenderer):
             
             return "".join(path_parts)
 
-        # EN: More accurately determine if movie film
-        # CN: 更精确地判断是否为电影胶卷
-        # EN: Check for movie film keywords
-        # CN: 检查是否包含电影胶卷的关键字
-        film_name_lower = film_name.lower()
-        is_movie_film = any(keyword in film_name_lower for keyword in [
-            'vision', 'tungsten', 'daylight', '52', '72', '53', 'double-x', 
-            'technical pan', 'infrared', '50d', '250d', '500t', '200t', '1000t',
-            'motion picture', 'movie', 'cinema', 'film'
-        ])
-        
         # EN: Draw top and bottom sprockets
         # CN: 绘制顶部和底部齿孔
         current_x = (pitch_px / 4)  # EN: Starting offset, per standard / CN: 起始偏移，符合标准
@@ -457,8 +508,4 @@ class Renderer135(BaseFilmRenderer):
 
         # EN: --- 3. Convert to PIL Image ---
         # CN: --- 3. 转换为 PIL Image ---
-        vector_strip = Image.open(io.BytesIO(png_bytes)).convert('RGBA')
-
-        # EN: Paste vector strip onto main canvas
-        # CN: 将矢量条贴到主画布上
-        canvas.paste(vector_strip, (int(x_start), int(sy)), mask=vector_strip)
\ No newline at end of file
+        return Image.open(io.BytesIO(png_bytes)).convert('RGBA')
\ No newline at end of file
@@ -3,16 +3,27 @@
 # CN: 135 半格画幅渲染器 (18x24mm) - v3.0 (统一底片条旋转架构)
 
 import os
-from PIL import Image, ImageDraw, ImageFont
+from functools import partial
+from PIL import Image, ImageDraw, ImageOps
 from .renderer_135 import Renderer135
+from core.font_service import font_service
+from core.frame_loader import FrameLoader
+from core.decode_planner import decode_for_size
+from core.sprite_atlas import sprite_atlas
+from core.band_canvas import draw_for
 
 class Renderer135HF(Renderer135):
     """
     EN: 135 Half-Frame Format - Precision spacing (1.0mm) for 72 frames
     CN: 135 半格画幅 - 1.0mm 精准间距，适配 72 张超大容量预览
     """
+    FRAMES_PER_PAGE = 72  # EN: 6 strips x 12 half frames / CN: 6 条 x 12 个半格
+
+    def page_capacity(self, meta_handler, orientation=None):
+        # EN: Fixed strip geometry, not the 135 layout grid / CN: 固定的底片条结构，而非 135 版式网格
+        return self.FRAMES_PER_PAGE
     
-    def render(self, canvas, img_list, cfg, meta_handler, user_emulsion, sample_data=None, orientation=None, show_date=True, show_exif=True):
+    def render(self, canvas, img_list, cfg, meta_handler, user_emulsion, sample_data=None, orientation=None, show_date=True, show_exif=True, frame_offset=0):
         print("\n" + "="*65)
         print(f"EN: [135HF] Rendering Half-Frame Contact Sheet (Orientation: {orientation or 'P'})")
         print(f"CN: [135HF] 正在渲染半格索引页 (方向: {orientation or 'P'})")
@@ -22,7 +33,7 @@ class Renderer135HF(Renderer135):
         final_cfg = meta_handler.get_contact_layout("135HF")
         new_w, new_h = final_cfg.get('canvas_w', 4800), final_cfg.get('canvas_h', 6000)
         canvas = canvas.resize((new_w, new_h))
-        draw = ImageDraw.Draw(canvas)
+        draw = draw_for(canvas)
         draw.rectangle([0, 0, new_w, new_h], fill=(235, 235, 235))
 
         # 2. EN: Physical Constants (mm) / CN: 物理常数 (mm)
@@ -47,42 +58,57 @@ class Renderer135HF(Renderer135):
         # EN: Ensure 72 slots are filled / CN: 确保填充 72 个槽位
         total_slots = cols_per_strip * num_strips
         full_list = img_list + [None] * (total_slots - len(img_list))
-        
-        for i in range(num_strips):
-            chunk = full_list[i * cols_per_strip : (i + 1) * cols_per_strip]
+        # EN: All 72 slots are decoded and cropped ahead on the shared loader
+        # CN: 全部 72 个槽位由共享加载器提前解码并裁切
+        pw, ph = int(18.0 * px_per_mm), int(24.0 * px_per_mm)
+        with FrameLoader(full_list[:total_slots], partial(self._fit_hf_frame, w=pw, h=ph)) as frames:
+            for i in range(num_strips):
+                chunk = full_list[i * cols_per_strip : (i + 1) * cols_per_strip]
             
-            # EN: Render a Horizontal Strip (P-style) / CN: 渲染一个水平底片条 (P式布局)
-            strip_img = Image.new('RGBA', (s_w, s_h), (12, 12, 12, 255))
-            self._render_single_hf_strip(
-                strip_img, chunk, i, cols_per_strip, px_per_mm, 
-                display_name, cur_color, meta_handler, show_date, show_exif
-            )
+                # EN: Render a Horizontal Strip (P-style) / CN: 渲染一个水平底片条 (P式布局)
+                strip_img = Image.new('RGBA', (s_w, s_h), (12, 12, 12, 255))
+                self._render_single_hf_strip(
+                    strip_img, chunk, i, cols_per_strip, px_per_mm, 
+                    display_name, cur_color, meta_handler, show_date, show_exif, frames, frame_offset
+                )
             
-            # 5. EN: Paste based on Orientation / CN: 根据方向进行粘贴
-            if orientation == 'L':
-                # EN: L-Mode: Rotate strip 90 deg clockwise and paste vertically
-                # CN: L 模式: 顺时针旋转 90 度并垂直粘贴
-                rotated_strip = strip_img.rotate(-90, expand=True)
-                col_pitch = usable_w_px / num_strips
-                # Center-align strips horizontally
-                paste_x = m_x + i * col_pitch + (col_pitch - s_h) // 2 # s_h is the new width
-                canvas.paste(rotated_strip, (int(paste_x), m_y_t), rotated_strip)
-            else:
-                # EN: P-Mode: Paste horizontally
-                # CN: P 模式: 直接水平粘贴
-                row_gap = final_cfg.get('row_gap', 100)
-                paste_y = m_y_t + i * (s_h + row_gap)
-                canvas.paste(strip_img, (m_x, paste_y), strip_img)
+                # 5. EN: Paste based on Orientation / CN: 根据方向进行粘贴
+                if orientation == 'L':
+                    # EN: L-Mode: Rotate strip 90 deg clockwise and paste vertically
+                    # CN: L 模式: 顺时针旋转 90 度并垂直粘贴
+                    rotated_strip = strip_img.rotate(-90, expand=True)
+                    col_pitch = usable_w_px / num_strips
+                    # Center-align strips horizontally
+                    paste_x = m_x + i * col_pitch + (col_pitch - s_h) // 2 # s_h is the new width
+                    canvas.paste(rotated_strip, (int(paste_x), m_y_t), rotated_strip)
+                else:
+                    # EN: P-Mode: Paste horizontally
+                    # CN: P 模式: 直接水平粘贴
+                    row_gap = final_cfg.get('row_gap', 100)
+                    paste_y = m_y_t + i * (s_h + row_gap)
+                    canvas.paste(strip_img, (m_x, paste_y), strip_img)
 
-        # 6. EN: Cleanup right edge for P-Mode / CN: P 模式右边缘截断清理
-        if orientation != 'L':
-            final_cutoff_x = m_x + s_w + int(1.0 * px_per_mm)
-            if final_cutoff_x < new_w:
-                draw.rectangle([final_cutoff_x, 0, new_w, new_h], fill=(235, 235, 235))
+            # 6. EN: Cleanup right edge for P-Mode / CN: P 模式右边缘截断清理
+            if orientation != 'L':
+                final_cutoff_x = m_x + s_w + int(1.0 * px_per_mm)
+                if final_cutoff_x < new_w:
+                    draw.rectangle([final_cutoff_x, 0, new_w, new_h], fill=(235, 235, 235))
 
         return canvas
 
-    def _render_single_hf_strip(self, strip_canvas, img_paths, strip_idx, cols, px_per_mm, film_name, color, meta, show_date, show_exif):
+    @staticmethod
+    def _fit_hf_frame(img, w, h):
+        # EN: Force Portrait for the horizontal strip logic (will be rotated later in L-mode)
+        # CN: 在水平条逻辑中强制竖向 (L模式下后续会整体旋转)
+        if img.width > img.height:
+            img = decode_for_size(img, (h, w))
+            img = img.rotate(-90, expand=True)
+        else:
+            img = decode_for_size(img, (w, h))
+        # EN: Center Crop to 18:24 / CN: 居中裁切为 18:24
+        return ImageOps.fit(img, (w, h), method=Image.Resampling.LANCZOS, centering=(0.5, 0.5))
+
+    def _render_single_hf_strip(self, strip_canvas, img_paths, strip_idx, cols, px_per_mm, film_name, color, meta, show_date, show_exif, frames, frame_offset=0):
         """EN: Renders a single 35mm horizontal strip containing HF frames"""
         draw = ImageDraw.Draw(strip_canvas)
         pw_mm, ph_mm, gap_mm, info_mm = 18.0, 24.0, 1.0, 5.5
@@ -91,9 +117,9 @@ class Renderer135HF(Renderer135):
         info_h = int(info_mm * px_per_mm)
         strip_h = int(35.0 * px_per_mm)
         
-        em_font = self.led_font.font_variant(size=int(1.3 * px_per_mm))
-        date_font = self.into_dot_font.font_variant(size=int(1.2 * px_per_mm))
-        exif_font = self.seg_font.font_variant(size=int(1.2 * px_per_mm))
+        em_font = font_service.variant(self.led_font, int(1.3 * px_per_mm))
+        date_font = font_service.variant(self.into_dot_font, int(1.2 * px_per_mm))
+        exif_font = font_service.variant(self.seg_font, int(1.2 * px_per_mm))
 
         # EN: Draw High-Precision Sprockets using Parent SVG logic
         # CN: 使用父类 SVG 逻辑绘制高精度齿孔
@@ -108,23 +134,15 @@ class Renderer135HF(Renderer135):
             # Paste Photo (Crop - don't stretch)
             # CN: 居中裁切 - 不进行缩放拉伸
             if img_paths[c]:
-                from PIL import ImageOps
-                with Image.open(img_paths[c]) as img:
-                    # EN: Force Portrait for the horizontal strip logic (will be rotated later in L-mode)
-                    # CN: 在水平条逻辑中强制竖向 (L模式下后续会整体旋转)
-                    if img.width > img.height:
-                        img = img.rotate(-90, expand=True)
-                    
-                    # EN: Center Crop to 18:24 / CN: 居中裁切为 18:24
-                    img = ImageOps.fit(img, (pw, ph), method=Image.Resampling.LANCZOS, centering=(0.5, 0.5))
-                    strip_canvas.paste(img, (int(curr_x), py))
+                strip_canvas.paste(frames.get(strip_idx * cols + c), (int(curr_x), py))
             
             # Numbering (Top)
             if c % 2 == 0:
-                num_idx = (strip_idx * (cols // 2)) + (c // 2) + 1
+                # EN: Two half frames per 35mm frame number / CN: 每个 35mm 帧号对应两个半格
+                num_idx = frame_offset // 2 + (strip_idx * (cols // 2)) + (c // 2) + 1
                 val_str = str(num_idx)
                 tw = draw.textlength(val_str, font=em_font)
-                draw.text((curr_x + (pw - tw)//2, int(0.2 * px_per_mm)), val_str, font=em_font, fill=color)
+                sprite_atlas.draw_text(draw, (curr_x + (pw - tw)//2, int(0.2 * px_per_mm)), val_str, em_font, color, runs=list(val_str))
             
             # Branding (Top Periodical)
             if c % 4 == 1:
@@ -136,9 +154,3 @@ class Renderer135HF(Renderer135):
             if img_paths[c]:
                 p_data = meta.get_data(img_paths[c])
                 self._draw_glowing_data_back(strip_canvas, p_data, curr_x, py, pw, ph, color, date_font, exif_font, px_per_mm, show_date=show_date, show_exif=show_exif)
-
-    def _draw_single_glowing_text(self, canvas, text, pos, font, color):
-        draw = ImageDraw.Draw(canvas)
-        glow_color = (color[0], color[1], color[2], 75)
-        draw.text((pos[0]+1, pos[1]+1), text, font=font, fill=glow_color)
-        draw.text(pos, text, font=font, fill=color)
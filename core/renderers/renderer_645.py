@@ -3,11 +3,19 @@
 # CN: 645 胶片渲染器 (横纵向模式)
 
 import random
+from functools import partial
 from PIL import Image, ImageDraw
+from core.frame_loader import FrameLoader
+from core.decode_planner import decode_for_size
+from core.band_canvas import draw_for
 from .base_renderer import BaseFilmRenderer
 
 class Renderer645(BaseFilmRenderer):
-    def render(self, canvas, img_list, cfg, meta_handler, user_emulsion, sample_data=None, orientation=None, show_date=True, show_exif=True):
+    def page_capacity(self, meta_handler, orientation=None):
+        cfg = meta_handler.get_contact_layout(f"645_{orientation or 'L'}")
+        return cfg['cols'] * cfg['rows']
+
+    def render(self, canvas, img_list, cfg, meta_handler, user_emulsion, sample_data=None, orientation=None, show_date=True, show_exif=True, frame_offset=0):
         # EN: Execute 645 rendering | CN: 执行 645 渲染
         print("EN: [645 2.0] Executing render ... | CN: [645 2.0] 执行渲染 ...")
         
@@ -25,7 +33,7 @@ class Renderer645(BaseFilmRenderer):
         # CN: 关键步骤！根据 json 定义的宽高重新生成画布，确保 PL 模式长宽正确
         new_w, new_h = final_cfg['canvas_w'], final_cfg['canvas_h']
         canvas = canvas.resize((new_w, new_h))  # EN: Force stretch or reset / CN: 强制拉伸或重置
-        draw = ImageDraw.Draw(canvas)
+        draw = draw_for(canvas)
         draw.rectangle([0, 0, new_w, new_h], fill=(235, 235, 235))  # EN: Fill background color / CN: 刷上背景色
         
         c_w, c_h = new_w, new_h
@@ -67,82 +75,82 @@ class Renderer645(BaseFilmRenderer):
             
             edge_layer = self.create_rotated_text(raw_text, angle=90, color=cur_color)
             tri_l = self.create_stretched_triangle(color=cur_color).resize((int(15 * 3.5), 15)).rotate(-90, expand=True)
-
-            for c in range(cols):
-                sx = m_x + c * (area_w + cg) + (area_w - strip_w) // 2
-                draw.rectangle([sx, m_y_t - 80, sx + strip_w, c_h], fill=(12, 12, 12))
+            with FrameLoader(img_list[:cols * rows], partial(self._fit_photo, w=photo_w, h=photo_h, rotate=True)) as frames:
+                for c in range(cols):
+                    sx = m_x + c * (area_w + cg) + (area_w - strip_w) // 2
+                    draw.rectangle([sx, m_y_t - 80, sx + strip_w, c_h], fill=(12, 12, 12))
                 
-                # EN: --- 1. Marking logic: Align to top with jitter limited to downward only ---
-                # CN: --- 1. 喷码逻辑：对齐靠上 + 限制抖动向上越界 ---
-                # EN: Edge markings: Start position aligned to top, jitter range (0, +100) to prevent upward overflow
-                # CN: 喷码逻辑：起始对齐靠上，抖动仅向下延伸，防止超出底片上边缘
+                    # EN: --- 1. Marking logic: Align to top with jitter limited to downward only ---
+                    # CN: --- 1. 喷码逻辑：对齐靠上 + 限制抖动向上越界 ---
+                    # EN: Edge markings: Start position aligned to top, jitter range (0, +100) to prevent upward overflow
+                    # CN: 喷码逻辑：起始对齐靠上，抖动仅向下延伸，防止超出底片上边缘
                 
-                marking_step_y = c_h // 4  # EN: Fixed 4 positions / CN: 固定 4 个
-                # EN: Start point slightly below edge, jitter (0, +100) to ensure no upward overflow
-                # CN: 起始点设在边缘稍下方，jitter 范围设为 (0, +100)，确保不往上跑
-                marking_y = (m_y_t - 80) + random.randint(0, 100) 
+                    marking_step_y = c_h // 4  # EN: Fixed 4 positions / CN: 固定 4 个
+                    # EN: Start point slightly below edge, jitter (0, +100) to ensure no upward overflow
+                    # CN: 起始点设在边缘稍下方，jitter 范围设为 (0, +100)，确保不往上跑
+                    marking_y = (m_y_t - 80) + random.randint(0, 100) 
                 
-                left_margin_w = (strip_w - photo_w) // 2
-                while marking_y < c_h - 100:
-                    lx = sx + (left_margin_w // 2) - (edge_layer.width // 2)
-                    canvas.paste(edge_layer, (int(lx), int(marking_y)), edge_layer)
-                    # EN: Step increment plus random downward jitter
-                    # CN: 步进加随机向下抖动
-                    marking_y += marking_step_y + random.randint(0, 50)
+                    left_margin_w = (strip_w - photo_w) // 2
+                    while marking_y < c_h - 100:
+                        lx = sx + (left_margin_w // 2) - (edge_layer.width // 2)
+                        canvas.paste(edge_layer, (int(lx), int(marking_y)), edge_layer)
+                        # EN: Step increment plus random downward jitter
+                        # CN: 步进加随机向下抖动
+                        marking_y += marking_step_y + random.randint(0, 50)
 
-                # EN: --- EXIF distance correction (synchronized to be closer to photo) ---
-                # CN: --- EXIF 距离修正 (同步贴近照片) ---
+                    # EN: --- EXIF distance correction (synchronized to be closer to photo) ---
+                    # CN: --- EXIF 距离修正 (同步贴近照片) ---
 
-                for r in range(rows):
-                    idx = c * rows + r
-                    curr_y = m_y_t + r * step_y
+                    for r in range(rows):
+                        idx = c * rows + r
+                        curr_y = m_y_t + r * step_y
                     
-                    # EN: Always draw frame number and triangle, even without photo
-                    # CN: 总是绘制序号和三角形，即使没有照片
-                    r_mid_x = sx + strip_w - (strip_w - photo_w) // 4
-                    canvas.paste(tri_l, (int(r_mid_x - tri_l.width//2), int(curr_y + photo_h//2 - 105)), tri_l)
-                    num_layer = self.create_rotated_text(str(idx + 1), 90, color=cur_color)
-                    canvas.paste(num_layer, (int(r_mid_x - num_layer.width//2), int(curr_y + photo_h//2)), num_layer)
+                        # EN: Always draw frame number and triangle, even without photo
+                        # CN: 总是绘制序号和三角形，即使没有照片
+                        r_mid_x = sx + strip_w - (strip_w - photo_w) // 4
+                        canvas.paste(tri_l, (int(r_mid_x - tri_l.width//2), int(curr_y + photo_h//2 - 105)), tri_l)
+                        num_layer = self.create_rotated_text(str(frame_offset + idx + 1), 90, color=cur_color)
+                        canvas.paste(num_layer, (int(r_mid_x - num_layer.width//2), int(curr_y + photo_h//2)), num_layer)
 
-                    # EN: If photo exists, render it and related information
-                    # CN: 如果有对应的照片，则绘制照片和相关信息
-                    if idx < len(img_list):
-                        px = sx + (strip_w - photo_w)//2
-                        self._paste_photo(canvas, img_list[idx], px, curr_y, photo_w, photo_h, rotate=True)
+                        # EN: If photo exists, render it and related information
+                        # CN: 如果有对应的照片，则绘制照片和相关信息
+                        if idx < len(img_list):
+                            px = sx + (strip_w - photo_w)//2
+                            canvas.paste(frames.get(idx), (int(px), int(curr_y)))
                         
-                        # EN: --- Issue 1 correction: Move EXIF closer to photo bottom ---
-                        # CN: --- 问题 1 修正：EXIF 距离照片更近 ---
-                        # EN: Move EXIF closer to the photo bottom
-                        # CN: 让 EXIF 紧贴照片底边。不再使用 black_area_center，改为固定偏移
-                        data = meta_handler.get_data(img_list[idx])
-                        date_str, exif_str = self.get_clean_exif(data)
-                        if not show_date:
-                            date_str = None
-                        if not show_exif:
-                            exif_str = None
+                            # EN: --- Issue 1 correction: Move EXIF closer to photo bottom ---
+                            # CN: --- 问题 1 修正：EXIF 距离照片更近 ---
+                            # EN: Move EXIF closer to the photo bottom
+                            # CN: 让 EXIF 紧贴照片底边。不再使用 black_area_center，改为固定偏移
+                            data = meta_handler.get_data(img_list[idx])
+                            date_str, exif_str = self.get_clean_exif(data)
+                            if not show_date:
+                                date_str = None
+                            if not show_exif:
+                                exif_str = None
                         
-                        # EN: Base offset from photo bottom (e.g., 60 pixels)
-                        # CN: 设定 EXIF 第一行离照片底部的距离 (例如 60 像素)
-                        exif_y_start = curr_y + photo_h + 70 
+                            # EN: Base offset from photo bottom (e.g., 60 pixels)
+                            # CN: 设定 EXIF 第一行离照片底部的距离 (例如 60 像素)
+                            exif_y_start = curr_y + photo_h + 70 
                         
-                        # EN: Draw date string if available
-                        # CN: 如果可用，绘制日期字符串
-                        if date_str and str(date_str).strip().upper() != "NONE":
-                            tw_date = draw.textlength(date_str, font=self.seg_font)
-                            draw.text((px + photo_w//2 - tw_date//2, exif_y_start), date_str, font=self.seg_font, fill=cur_color)
+                            # EN: Draw date string if available
+                            # CN: 如果可用，绘制日期字符串
+                            if date_str and str(date_str).strip().upper() != "NONE":
+                                tw_date = draw.textlength(date_str, font=self.seg_font)
+                                draw.text((px + photo_w//2 - tw_date//2, exif_y_start), date_str, font=self.seg_font, fill=cur_color)
                         
-                        # EN: Draw EXIF info string if available
-                        # CN: 如果可用，绘制 EXIF 信息字符串
-                        if exif_str and str(exif_str).strip().upper() != "NONE":
-                            tw_exif = draw.textlength(exif_str, font=self.seg_font)
-                            # EN: Second line follows first with 50-pixel spacing
-                            # CN: 第二行紧跟第一行，间距 50 像素
-                            draw.text((px + photo_w//2 - tw_exif//2, exif_y_start + 50), exif_str, font=self.seg_font, fill=cur_color)
+                            # EN: Draw EXIF info string if available
+                            # CN: 如果可用，绘制 EXIF 信息字符串
+                            if exif_str and str(exif_str).strip().upper() != "NONE":
+                                tw_exif = draw.textlength(exif_str, font=self.seg_font)
+                                # EN: Second line follows first with 50-pixel spacing
+                                # CN: 第二行紧跟第一行，间距 50 像素
+                                draw.text((px + photo_w//2 - tw_exif//2, exif_y_start + 50), exif_str, font=self.seg_font, fill=cur_color)
 
-                # EN: D. Fixed crop after last preset row
-                # CN: D. 固定裁切到最后一个预设行之后
-                crop_line_y = m_y_t + rows * step_y
-                draw.rectangle([sx, crop_line_y, sx + strip_w, c_h], fill=bg_color)
+                    # EN: D. Fixed crop after last preset row
+                    # CN: D. 固定裁切到最后一个预设行之后
+                    crop_line_y = m_y_t + rows * step_y
+                    draw.rectangle([sx, crop_line_y, sx + strip_w, c_h], fill=bg_color)
 
         else:  # EN: Portrait mode / CN: 纵向模式
             # EN: --- 645_P: Horizontal film strip (correction: right black margin width = photo gap) ---
@@ -153,114 +161,114 @@ class Renderer645(BaseFilmRenderer):
             col_pitch = (c_w - 2 * m_x) // cols
             
             tri_p = self.create_stretched_triangle(color=cur_color).resize((int(15 * 3.5), 15))
-
-            for r in range(rows):
-                sy = m_y_t + r * (strip_h + rg)
-                # EN: 1. Lay out continuous black strip
-                # CN: 1. 铺设连续黑条
-                draw.rectangle([m_x, sy, c_w, sy + strip_h], fill=(12, 12, 12))
+            with FrameLoader(img_list[:cols * rows], partial(self._fit_photo, w=photo_w, h=photo_h, rotate=False)) as frames:
+                for r in range(rows):
+                    sy = m_y_t + r * (strip_h + rg)
+                    # EN: 1. Lay out continuous black strip
+                    # CN: 1. 铺设连续黑条
+                    draw.rectangle([m_x, sy, c_w, sy + strip_h], fill=(12, 12, 12))
                 
-                for c in range(cols):
-                    idx = r * cols + c
-                    cell_center_x = m_x + c * col_pitch + col_pitch // 2
-                    curr_x = cell_center_x - photo_w // 2 
-                    py = sy + (strip_h - photo_h) // 2
+                    for c in range(cols):
+                        idx = r * cols + c
+                        cell_center_x = m_x + c * col_pitch + col_pitch // 2
+                        curr_x = cell_center_x - photo_w // 2 
+                        py = sy + (strip_h - photo_h) // 2
                     
-                    # EN: Always draw frame number, even without photo
-                    # CN: 总是绘制序号，即使没有照片
-                    num_str = str(idx + 1)
-                    # EN: Get text bbox for precise height
-                    # CN: 获取文字 bbox 以获得精确高度
-                    n_l, n_t, n_r, n_b = self.font.getbbox(num_str)
-                    num_h = n_b - n_t
-                    num_tw = draw.textlength(num_str, font=self.font)
-                    asset_total_w = tri_p.width + 100 + num_tw
+                        # EN: Always draw frame number, even without photo
+                        # CN: 总是绘制序号，即使没有照片
+                        num_str = str(frame_offset + idx + 1)
+                        # EN: Get text bbox for precise height
+                        # CN: 获取文字 bbox 以获得精确高度
+                        n_l, n_t, n_r, n_b = self.font.getbbox(num_str)
+                        num_h = n_b - n_t
+                        num_tw = draw.textlength(num_str, font=self.font)
+                        asset_total_w = tri_p.width + 100 + num_tw
                     
-                    # EN: Horizontal center anchor point
-                    # CN: 水平居中锚点
-                    ax_start = cell_center_x - asset_total_w // 2
+                        # EN: Horizontal center anchor point
+                        # CN: 水平居中锚点
+                        ax_start = cell_center_x - asset_total_w // 2
                     
-                    # EN: Vertical center logic for black area
-                    # CN: 垂直居中核心逻辑
-                    b_top, b_bottom = py + photo_h, sy + strip_h
-                    black_area_center_y = b_top + (b_bottom - b_top) // 2
+                        # EN: Vertical center logic for black area
+                        # CN: 垂直居中核心逻辑
+                        b_top, b_bottom = py + photo_h, sy + strip_h
+                        black_area_center_y = b_top + (b_bottom - b_top) // 2
 
-                    # EN: ---------------------------------------------------------
-                    # EN: Core Fine-tuning Area
-                    # EN: ---------------------------------------------------------
-                    # EN: 1. Frame number Y coordinate: Fine-tune text center
-                    # EN: If number appears too high, increase +10; if too low, decrease it
-                    # CN: 1. 序号 Y 坐标：文字重心微调
-                    # CN: 如果序号偏上，增大 +10；如果偏下，减小它
-                    ay = black_area_center_y - (num_h // 2) - 5
+                        # EN: ---------------------------------------------------------
+                        # EN: Core Fine-tuning Area
+                        # EN: ---------------------------------------------------------
+                        # EN: 1. Frame number Y coordinate: Fine-tune text center
+                        # EN: If number appears too high, increase +10; if too low, decrease it
+                        # CN: 1. 序号 Y 坐标：文字重心微调
+                        # CN: 如果序号偏上，增大 +10；如果偏下，减小它
+                        ay = black_area_center_y - (num_h // 2) - 5
 
-                    # EN: 2. Triangle Y coordinate: Independent text alignment
-                    # EN: If triangle appears higher than text, increase +5
-                    # CN: 2. 三角 Y 坐标：独立对齐文字
-                    # CN: tri_p_y = ay + 偏移。如果三角比文字靠上，增大 +5
-                    tri_p_y = ay + 10 
-                    # EN: ---------------------------------------------------------
-                    # CN: ---------------------------------------------------------
+                        # EN: 2. Triangle Y coordinate: Independent text alignment
+                        # EN: If triangle appears higher than text, increase +5
+                        # CN: 2. 三角 Y 坐标：独立对齐文字
+                        # CN: tri_p_y = ay + 偏移。如果三角比文字靠上，增大 +5
+                        tri_p_y = ay + 10 
+                        # EN: ---------------------------------------------------------
+                        # CN: ---------------------------------------------------------
 
-                    # EN: Draw triangle and frame number (even without photo)
-                    # CN: 绘制三角形和序号（即使没有照片）
-                    canvas.paste(tri_p, (int(ax_start), int(tri_p_y)), tri_p)
-                    draw.text((int(ax_start + tri_p.width + 50), int(ay)), num_str, font=self.font, fill=cur_color)
+                        # EN: Draw triangle and frame number (even without photo)
+                        # CN: 绘制三角形和序号（即使没有照片）
+                        canvas.paste(tri_p, (int(ax_start), int(tri_p_y)), tri_p)
+                        draw.text((int(ax_start + tri_p.width + 50), int(ay)), num_str, font=self.font, fill=cur_color)
                     
-                    # EN: Top info: Horizontal marking (always display)
-                    # CN: 上侧信息：水平喷码（始终显示）
-                    draw.text((curr_x, sy + 10), raw_text, font=self.led_font, fill=cur_color)
+                        # EN: Top info: Horizontal marking (always display)
+                        # CN: 上侧信息：水平喷码（始终显示）
+                        draw.text((curr_x, sy + 10), raw_text, font=self.led_font, fill=cur_color)
                     
-                    # EN: If photo exists, render it and related information
-                    # CN: 如果有对应的照片，则绘制照片和相关信息
-                    if idx < len(img_list):
-                        # EN: A. Paste photo
-                        # CN: A. 粘贴照片
-                        self._paste_photo(canvas, img_list[idx], curr_x, py, photo_w, photo_h, rotate=False)
+                        # EN: If photo exists, render it and related information
+                        # CN: 如果有对应的照片，则绘制照片和相关信息
+                        if idx < len(img_list):
+                            # EN: A. Paste photo
+                            # CN: A. 粘贴照片
+                            canvas.paste(frames.get(idx), (int(curr_x), int(py)))
 
-                        # EN: B. Right side info: Two-line EXIF (rotated 90 degrees)
-                        # CN: B. 右侧信息：双行 EXIF (旋转 90)
-                        data = meta_handler.get_data(img_list[idx])
-                        date_str, exif_str = self.get_clean_exif(data)
-                        if not show_date:
-                            date_str = None
-                        if not show_exif:
-                            exif_str = None
+                            # EN: B. Right side info: Two-line EXIF (rotated 90 degrees)
+                            # CN: B. 右侧信息：双行 EXIF (旋转 90)
+                            data = meta_handler.get_data(img_list[idx])
+                            date_str, exif_str = self.get_clean_exif(data)
+                            if not show_date:
+                                date_str = None
+                            if not show_exif:
+                                exif_str = None
                         
-                        # EN: Key physical logic: Center line of right-side black margin
-                        # CN: 关键物理逻辑：右侧黑边的中轴线
-                        right_margin_center_x = curr_x + photo_w + (col_pitch - photo_w) // 3
-                        # EN: Draw date if available
-                        # CN: 如果可用，绘制日期
-                        if date_str and str(date_str).strip().upper() != "NONE":
-                            date_layer = self.create_rotated_seg_text(date_str, 90, cur_color)
-                            canvas.paste(date_layer, (int(right_margin_center_x - 45), int(py + photo_h // 2 - date_layer.height // 2)), date_layer)
+                            # EN: Key physical logic: Center line of right-side black margin
+                            # CN: 关键物理逻辑：右侧黑边的中轴线
+                            right_margin_center_x = curr_x + photo_w + (col_pitch - photo_w) // 3
+                            # EN: Draw date if available
+                            # CN: 如果可用，绘制日期
+                            if date_str and str(date_str).strip().upper() != "NONE":
+                                date_layer = self.create_rotated_seg_text(date_str, 90, cur_color)
+                                canvas.paste(date_layer, (int(right_margin_center_x - 45), int(py + photo_h // 2 - date_layer.height // 2)), date_layer)
 
-                        # EN: Draw EXIF if available
-                        # CN: 如果可用，绘制 EXIF
-                        if exif_str and str(exif_str).strip().upper() != "NONE":
-                            exif_layer = self.create_rotated_seg_text(exif_str, 90, cur_color)
-                            canvas.paste(exif_layer, (int(right_margin_center_x + 5), int(py + photo_h // 2 - exif_layer.height // 2)), exif_layer)
+                            # EN: Draw EXIF if available
+                            # CN: 如果可用，绘制 EXIF
+                            if exif_str and str(exif_str).strip().upper() != "NONE":
+                                exif_layer = self.create_rotated_seg_text(exif_str, 90, cur_color)
+                                canvas.paste(exif_layer, (int(right_margin_center_x + 5), int(py + photo_h // 2 - exif_layer.height // 2)), exif_layer)
 
-            # EN: --- 2. Unified right area fixed crop (similar to L mode) ---
-            # CN: --- 2. 统一右侧区域固定裁切 (类似L模式) ---
-            # EN: Right margin should equal the gap between photos (col_pitch - photo_w)
-            # CN: 右侧黑边应该等于照片间隙（col_pitch - photo_w）
-            # EN: Last photo right edge + full gap width
-            # CN: 最后照片右边缘 + 完整间隙宽度
-            last_photo_right = m_x + (cols - 1) * col_pitch + (col_pitch + photo_w) // 2
-            gap_width = col_pitch - photo_w
-            crop_line_x = last_photo_right + gap_width
-            if crop_line_x < c_w:
-                draw.rectangle([crop_line_x, 0, c_w, c_h], fill=bg_color)
+                # EN: --- 2. Unified right area fixed crop (similar to L mode) ---
+                # CN: --- 2. 统一右侧区域固定裁切 (类似L模式) ---
+                # EN: Right margin should equal the gap between photos (col_pitch - photo_w)
+                # CN: 右侧黑边应该等于照片间隙（col_pitch - photo_w）
+                # EN: Last photo right edge + full gap width
+                # CN: 最后照片右边缘 + 完整间隙宽度
+                last_photo_right = m_x + (cols - 1) * col_pitch + (col_pitch + photo_w) // 2
+                gap_width = col_pitch - photo_w
+                crop_line_x = last_photo_right + gap_width
+                if crop_line_x < c_w:
+                    draw.rectangle([crop_line_x, 0, c_w, c_h], fill=bg_color)
 
         return canvas
 
-    def _paste_photo(self, canvas, path, x, y, w, h, rotate=False):
-        # EN: Helper method to paste and resize photo with optional rotation
-        # CN: 辅助方法：粘贴并调整照片大小，支持可选旋转
-        with Image.open(path) as img:
-            if rotate and img.height > img.width: img = img.rotate(90, expand=True)
-            if not rotate and img.width > img.height: img = img.rotate(90, expand=True)
-            img = img.resize((w, h), Image.Resampling.LANCZOS)
-            canvas.paste(img, (int(x), int(y)))
\ No newline at end of file
+    @staticmethod
+    def _fit_photo(img, w, h, rotate=False):
+        # EN: Frame loader helper: rotate if needed and resize to the photo box
+        # CN: 帧加载器辅助方法：按需旋转并缩放到照片框
+        turn = (img.height > img.width) if rotate else (img.width > img.height)
+        img = decode_for_size(img, (h, w) if turn else (w, h))
+        if turn: img = img.rotate(90, expand=True)
+        return img.resize((w, h), Image.Resampling.LANCZOS)
\ No newline at end of file
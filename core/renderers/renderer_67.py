@@ -3,16 +3,22 @@
 # CN: 6x7 画幅渲染器，带有校准的喷码逻辑
 
 import random
+from functools import partial
 from PIL import Image, ImageDraw
+from core.frame_loader import FrameLoader
+from core.decode_planner import decode_for_size
+from core.band_canvas import draw_for
 from .base_renderer import BaseFilmRenderer
+from core.font_service import font_service
 
 class Renderer67(BaseFilmRenderer):
     """
     EN: 6x7 Renderer (645-step edge markings & left-aligned jitter)
     CN: 6x7 画幅渲染器 (645 物理喷码步进 + 左对齐随机抖动版)
     """
+    FRAMES_PER_PAGE = 10  # EN: 4 + 4 + 2 frames / CN: 4 + 4 + 2 帧
     
-    def render(self, canvas, img_list, cfg, meta_handler, user_emulsion, sample_data=None, orientation=None, show_date=True, show_exif=True):
+    def render(self, canvas, img_list, cfg, meta_handler, user_emulsion, sample_data=None, orientation=None, show_date=True, show_exif=True, frame_offset=0):
         # EN: Execute 6x7 rendering with calibrated marking logic
         # CN: 执行 6x7 渲染，喷码逻辑校准
         print("\n" + "="*65)
@@ -25,7 +31,7 @@ class Renderer67(BaseFilmRenderer):
         final_cfg = meta_handler.get_contact_layout("67")
         new_w, new_h = final_cfg['canvas_w'], final_cfg['canvas_h']
         canvas = canvas.resize((new_w, new_h)) 
-        draw = ImageDraw.Draw(canvas)
+        draw = draw_for(canvas)
         draw.rectangle([0, 0, new_w, new_h], fill=(235, 235, 235)) 
         
         c_w, c_h = new_w, new_h
@@ -35,7 +41,7 @@ class Renderer67(BaseFilmRenderer):
         # CN: 1. 物理常数与缩放字号
         MARGIN_RATIO = 2.75 / 56.0 
         PHOTO_ASPECT = 70.0 / 56.0 
-        scaled_seg_font = self.seg_font.font_variant(size=32)
+        scaled_seg_font = font_service.variant(self.seg_font, 32)
         
         # EN: 2. [Precise injection] Get unified roll info from first image
         # CN: 2. [精准注入] 获取全卷统一信息
@@ -68,114 +74,117 @@ class Renderer67(BaseFilmRenderer):
         marking_step = int(photo_w * 0.85) 
 
         tri_p = self.create_stretched_triangle(color=cur_color).resize((int(15 * 3.5), 15))
-
-        # EN: --- 4. Rendering loop ---
-        # CN: --- 4. 渲染循环 ---
-        for r in range(3):  # EN: Hard-coded to 3 rows per 6x7 physical layout / CN: 硬编码为3行，符合6x7物理布局
-            # EN: Physical layout: first 2 rows have 4 frames, third row has 2 frames
-            # CN: 根据6x7物理布局特点：前两行4个，第三行2个
-            if r < 2:  # EN: First 2 rows: 4 columns / CN: 前两行：4列
-                row_cols = 4
-            else:  # EN: Third row: 2 columns / CN: 第三行：2列
-                row_cols = 2
+        # EN: 4 + 4 + 2 frames, decoded and resized ahead on the shared loader
+        # CN: 共 4 + 4 + 2 帧，由共享加载器提前解码并缩放
+        with FrameLoader(img_list[:10], partial(self._fit_photo, w=photo_w, h=photo_h, force_landscape=True)) as frames:
+            # EN: --- 4. Rendering loop ---
+            # CN: --- 4. 渲染循环 ---
+            for r in range(3):  # EN: Hard-coded to 3 rows per 6x7 physical layout / CN: 硬编码为3行，符合6x7物理布局
+                # EN: Physical layout: first 2 rows have 4 frames, third row has 2 frames
+                # CN: 根据6x7物理布局特点：前两行4个，第三行2个
+                if r < 2:  # EN: First 2 rows: 4 columns / CN: 前两行：4列
+                    row_cols = 4
+                else:  # EN: Third row: 2 columns / CN: 第三行：2列
+                    row_cols = 2
                 
-            sy = m_y_t + r * (strip_h + rg)
+                sy = m_y_t + r * (strip_h + rg)
             
-            # EN: [Physical standard] Left-side leader margin
-            # CN: [物理规范] 左侧起始黑边
-            if r < 2:  # EN: First 2 rows: Full black margin / CN: 前两行：完整的黑边
-                leader_start_x = m_x - side_margin
-                draw.rectangle([leader_start_x, sy, c_w, sy + strip_h], fill=(12, 12, 12))
-            else:  # EN: Third row: Only cover 2 positions / CN: 第三行：只覆盖2个位置的黑边
-                # EN: Calculate total width for 2 positions in third row
-                # CN: 计算第三行2个位置的总宽度
-                third_row_width = 2 * col_pitch
-                leader_start_x = m_x - side_margin
-                draw.rectangle([leader_start_x, sy, m_x + third_row_width, sy + strip_h], fill=(12, 12, 12))
+                # EN: [Physical standard] Left-side leader margin
+                # CN: [物理规范] 左侧起始黑边
+                if r < 2:  # EN: First 2 rows: Full black margin / CN: 前两行：完整的黑边
+                    leader_start_x = m_x - side_margin
+                    draw.rectangle([leader_start_x, sy, c_w, sy + strip_h], fill=(12, 12, 12))
+                else:  # EN: Third row: Only cover 2 positions / CN: 第三行：只覆盖2个位置的黑边
+                    # EN: Calculate total width for 2 positions in third row
+                    # CN: 计算第三行2个位置的总宽度
+                    third_row_width = 2 * col_pitch
+                    leader_start_x = m_x - side_margin
+                    draw.rectangle([leader_start_x, sy, m_x + third_row_width, sy + strip_h], fill=(12, 12, 12))
             
-            # EN: --- Marking logic breakthrough (simulating 120 factory continuous spray) ---
-            # CN: --- 喷码逻辑攻坚 (模拟 120 原厂连喷) ---
-            # EN: Add jitter at the start of the strip within leader area, confined to left boundary
-            # CN: 在黑条起始位置加一个 0~side_margin 之间的随机抖动，但不超出左边界
-            current_marking_x = leader_start_x + random.randint(5, side_margin)
+                # EN: --- Marking logic breakthrough (simulating 120 factory continuous spray) ---
+                # CN: --- 喷码逻辑攻坚 (模拟 120 原厂连喷) ---
+                # EN: Add jitter at the start of the strip within leader area, confined to left boundary
+                # CN: 在黑条起始位置加一个 0~side_margin 之间的随机抖动，但不超出左边界
+                current_marking_x = leader_start_x + random.randint(5, side_margin)
             
-            # EN: Third row markings only within valid area
-            # CN: 第三行的喷码只在有效的区域内
-            marking_limit = m_x + 2 * col_pitch - 200 if r == 2 else c_w - 200
-            while current_marking_x < marking_limit:
-                # EN: Place marking in top margin center / CN: 喷码置于上黑边中心
-                draw.text((current_marking_x, sy + (side_margin // 2) - 15), 
-                        raw_text, font=self.led_font, fill=cur_color)
-                # EN: Step by 645 physical increment with small random instability
-                # CN: 按 645 物理步进，并加入微小随机不稳定性
-                current_marking_x += marking_step + random.randint(-20, 20)
+                # EN: Third row markings only within valid area
+                # CN: 第三行的喷码只在有效的区域内
+                marking_limit = m_x + 2 * col_pitch - 200 if r == 2 else c_w - 200
+                while current_marking_x < marking_limit:
+                    # EN: Place marking in top margin center / CN: 喷码置于上黑边中心
+                    draw.text((current_marking_x, sy + (side_margin // 2) - 15), 
+                            raw_text, font=self.led_font, fill=cur_color)
+                    # EN: Step by 645 physical increment with small random instability
+                    # CN: 按 645 物理步进，并加入微小随机不稳定性
+                    current_marking_x += marking_step + random.randint(-20, 20)
 
-            for c in range(row_cols):
-                if r < 2:  # EN: First 2 rows / CN: 前两行
-                    idx = r * 4 + c
-                    curr_x = m_x + c * col_pitch + 20
-                else:  # EN: Third row, only use first 2 positions / CN: 第三行，只使用前2个位置
-                    idx = 8 + c  # EN: Third row starts from frame 9 (index 8) / CN: 第三行从第9张开始编号（索引8）
-                    curr_x = m_x + c * col_pitch + 20  # EN: Use same layout, but only 2 positions / CN: 使用相同布局，但只使用前2个
+                for c in range(row_cols):
+                    if r < 2:  # EN: First 2 rows / CN: 前两行
+                        idx = r * 4 + c
+                        curr_x = m_x + c * col_pitch + 20
+                    else:  # EN: Third row, only use first 2 positions / CN: 第三行，只使用前2个位置
+                        idx = 8 + c  # EN: Third row starts from frame 9 (index 8) / CN: 第三行从第9张开始编号（索引8）
+                        curr_x = m_x + c * col_pitch + 20  # EN: Use same layout, but only 2 positions / CN: 使用相同布局，但只使用前2个
 
-                py = sy + side_margin 
+                    py = sy + side_margin 
                 
-                # EN: Always draw triangle and frame number, even without photo
-                # CN: 总是绘制三角形和序号，即使没有照片
-                num_str = str(idx + 1)
-                num_tw = draw.textlength(num_str, font=self.font)
-                ax_start = (curr_x + photo_w // 2) - (tri_p.width + 50 + num_tw) // 2
-                ay = py + photo_h + 5 
-                canvas.paste(tri_p, (int(ax_start), int(ay + 5)), tri_p)
-                draw.text((int(ax_start + tri_p.width + 50), int(ay)), num_str, font=self.font, fill=cur_color)
+                    # EN: Always draw triangle and frame number, even without photo
+                    # CN: 总是绘制三角形和序号，即使没有照片
+                    num_str = str(frame_offset + idx + 1)
+                    num_tw = draw.textlength(num_str, font=self.font)
+                    ax_start = (curr_x + photo_w // 2) - (tri_p.width + 50 + num_tw) // 2
+                    ay = py + photo_h + 5 
+                    canvas.paste(tri_p, (int(ax_start), int(ay + 5)), tri_p)
+                    draw.text((int(ax_start + tri_p.width + 50), int(ay)), num_str, font=self.font, fill=cur_color)
                 
-                # EN: If photo exists, render it and related information
-                # CN: 如果有对应的照片，则绘制照片和相关信息
-                if idx < len(img_list):
-                    # EN: A. Paste photo (Force Landscape)
-                    # CN: A. 粘贴照片 (强制横向)
-                    self._paste_photo(canvas, img_list[idx], curr_x, py, photo_w, photo_h, force_landscape=True)
+                    # EN: If photo exists, render it and related information
+                    # CN: 如果有对应的照片，则绘制照片和相关信息
+                    if idx < len(img_list):
+                        # EN: A. Paste photo (Force Landscape)
+                        # CN: A. 粘贴照片 (强制横向)
+                        canvas.paste(frames.get(idx), (int(curr_x), int(py)))
 
-                    # EN: B. Right side EXIF (150px compressed space)
-                    # CN: B. 右侧 EXIF (150px 压缩空间)
-                    data = meta_handler.get_data(img_list[idx])
-                    date_str, exif_str = self.get_clean_exif(data)
-                    if not show_date:
-                        date_str = None
-                    if not show_exif:
-                        exif_str = None
+                        # EN: B. Right side EXIF (150px compressed space)
+                        # CN: B. 右侧 EXIF (150px 压缩空间)
+                        data = meta_handler.get_data(img_list[idx])
+                        date_str, exif_str = self.get_clean_exif(data)
+                        if not show_date:
+                            date_str = None
+                        if not show_exif:
+                            exif_str = None
                         
-                    # EN: Key physical logic: Center line of right-side black margin
-                    # CN: 关键物理逻辑：右侧黑边的中轴线
-                    right_margin_center_x = curr_x + photo_w + (col_pitch - photo_w) // 2
-                    # EN: Draw date if available
-                    # CN: 如果可用，绘制日期
-                    if date_str and str(date_str).strip().upper() != "NONE":
-                        date_layer = self.create_rotated_seg_text(date_str, 90, cur_color)
-                        canvas.paste(date_layer, (int(right_margin_center_x - 45), int(py + photo_h // 2 - date_layer.height // 2)), date_layer)
+                        # EN: Key physical logic: Center line of right-side black margin
+                        # CN: 关键物理逻辑：右侧黑边的中轴线
+                        right_margin_center_x = curr_x + photo_w + (col_pitch - photo_w) // 2
+                        # EN: Draw date if available
+                        # CN: 如果可用，绘制日期
+                        if date_str and str(date_str).strip().upper() != "NONE":
+                            date_layer = self.create_rotated_seg_text(date_str, 90, cur_color)
+                            canvas.paste(date_layer, (int(right_margin_center_x - 45), int(py + photo_h // 2 - date_layer.height // 2)), date_layer)
 
-                    # EN: Draw EXIF if available
-                    # CN: 如果可用，绘制 EXIF
-                    if exif_str and str(exif_str).strip().upper() != "NONE":
-                        exif_layer = self.create_rotated_seg_text(exif_str, 90, cur_color)
-                        canvas.paste(exif_layer, (int(right_margin_center_x + 5), int(py + photo_h // 2 - exif_layer.height // 2)), exif_layer)
+                        # EN: Draw EXIF if available
+                        # CN: 如果可用，绘制 EXIF
+                        if exif_str and str(exif_str).strip().upper() != "NONE":
+                            exif_layer = self.create_rotated_seg_text(exif_str, 90, cur_color)
+                            canvas.paste(exif_layer, (int(right_margin_center_x + 5), int(py + photo_h // 2 - exif_layer.height // 2)), exif_layer)
 
-        # EN: --- Fixed right-side crop ---
-        # CN: --- 固定右侧裁切 ---
-        # EN: Per 6x7 physical layout: first 2 rows have 4 frames each, third row has 2 frames
-        # CN: 按照6x7物理布局进行固定裁切：前两行每行4个，第三行前2个位置
-        crop_line_x = m_x + 4 * col_pitch  # EN: Fixed crop at 4-position width / CN: 固定裁切到4个位置的宽度（按前两行的标准）
+            # EN: --- Fixed right-side crop ---
+            # CN: --- 固定右侧裁切 ---
+            # EN: Per 6x7 physical layout: first 2 rows have 4 frames each, third row has 2 frames
+            # CN: 按照6x7物理布局进行固定裁切：前两行每行4个，第三行前2个位置
+            crop_line_x = m_x + 4 * col_pitch  # EN: Fixed crop at 4-position width / CN: 固定裁切到4个位置的宽度（按前两行的标准）
         
-        if crop_line_x < c_w:
-            draw.rectangle([crop_line_x, 0, c_w, c_h], fill=bg_color)
+            if crop_line_x < c_w:
+                draw.rectangle([crop_line_x, 0, c_w, c_h], fill=bg_color)
 
         return canvas
 
-    def _paste_photo(self, canvas, path, x, y, w, h, force_landscape=False):
-        # EN: Helper method to paste and resize photo with optional landscape forcing
-        # CN: 辅助方法：粘贴并调整照片大小，支持强制横向
-        with Image.open(path) as img:
-            img_w, img_h = img.size
-            if force_landscape and img_h > img_w: img = img.rotate(-90, expand=True)
-            img = img.resize((w, h), Image.Resampling.LANCZOS)
-            canvas.paste(img, (int(x), int(y)))
\ No newline at end of file
+    @staticmethod
+    def _fit_photo(img, w, h, force_landscape=False):
+        # EN: Frame loader helper: optional landscape forcing, then resize to the photo box
+        # CN: 帧加载器辅助方法：可选强制横向，再缩放到照片框
+        img_w, img_h = img.size
+        turn = force_landscape and img_h > img_w
+        img = decode_for_size(img, (h, w) if turn else (w, h))
+        if turn: img = img.rotate(-90, expand=True)
+        return img.resize((w, h), Image.Resampling.LANCZOS)
\ No newline at end of file
@@ -0,0 +1,255 @@
+# core/shadow_engine.py
+"""
+EN: Edge-only drop shadow compositor. A blurred rectangle is only non-uniform near its border,
+    so the blur runs once on a small reference rectangle with the same margins; the result is
+    cached as a 9-slice and stretched to any canvas size. Pillow's box-blur passes are separable
+    and per-row, so the stretched mask is byte-identical to blurring the full canvas.
+CN: 仅处理边缘的投影合成器。模糊后的矩形只在边框附近不均匀，因此只对一个边距相同的小参考矩形做一次模糊，
+    结果以九宫格形式缓存，再拉伸到任意画布尺寸。Pillow 的盒式模糊按行分离执行，
+    拉伸得到的蒙版与整幅画布模糊的结果逐字节一致。
+"""
+
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageChops, ImageDraw, ImageFilter
+
+
+class ShadowSlices:
+    """
+    EN: Blurred reference mask for one (kind, radius, opacity, margin, offset) plus its slice lines.
+        Column `cx` and row `cy` lie in the uniform interior and are the stretchable centre.
+    CN: 单个 (模糊类型, 半径, 不透明度, 边距, 偏移) 的已模糊参考蒙版及其切分线。
+        第 `cx` 列与第 `cy` 行位于均匀内部区域，作为可拉伸的中心。
+    """
+
+    def __init__(self, kind, radius, opacity, margin, offset):
+        self.margin = margin
+        # EN: Reference rectangle must keep opposite edges out of each other's reach
+        # CN: 参考矩形需足够大，使对边的模糊影响互不重叠
+        self.core = max(64, int(radius * 8))
+        ref_size = self.core + margin
+        ref = Image.new("L", (ref_size, ref_size), 0)
+        ref.paste(opacity, (margin // 2 + offset[0], margin // 2 + offset[1],
+                            margin // 2 + offset[0] + self.core, margin // 2 + offset[1] + self.core))
+        self.ref = ref.filter(_make_filter(kind, radius))
+        self.cx = ref_size // 2
+        self.cy = ref_size // 2
+        # EN: Right / bottom bands after the centre line / CN: 中心线之后的右侧 / 底部带
+        self.right_w = ref_size - self.cx - 1
+        self.bottom_h = ref_size - self.cy - 1
+
+    def _expand_rows(self, top, bottom, out_w):
+        """EN: Stretch a horizontal band of the reference to out_w / CN: 将参考图的一条水平带拉伸到 out_w"""
+        band = self.ref.crop((0, top, self.ref.width, bottom))
+        mid_w = out_w - self.cx - self.right_w
+        out = Image.new("L", (out_w, bottom - top))
+        out.paste(band.crop((0, 0, self.cx, band.height)), (0, 0))
+        out.paste(band.crop((self.cx, 0, self.cx + 1, band.height)).resize((mid_w, band.height), Image.Resampling.NEAREST),
+                  (self.cx, 0))
+        out.paste(band.crop((self.cx + 1, 0, band.width, band.height)), (out_w - self.right_w, 0))
+        return out
+
+    def assemble(self, out_w, out_h):
+        """EN: Build the full-size shadow mask / CN: 组装全尺寸阴影蒙版"""
+        mid_h = out_h - self.cy - self.bottom_h
+        # EN: Centre row replicated vertically covers every non-top/bottom row
+        # CN: 将中心行纵向复制，覆盖顶部 / 底部带以外的所有行
+        mask = self._expand_rows(self.cy, self.cy + 1, out_w).resize((out_w, out_h), Image.Resampling.NEAREST)
+        mask.paste(self._expand_rows(0, self.cy, out_w), (0, 0))
+        mask.paste(self._expand_rows(self.cy + 1, self.ref.height, out_w), (0, self.cy + mid_h))
+        return mask
+
+
+def _make_filter(kind, radius):
+    if kind == "box":
+        return ImageFilter.BoxBlur(radius=radius)
+    return ImageFilter.GaussianBlur(radius=radius)
+
+
+_slices = OrderedDict()
+_slices_lock = threading.Lock()
+SLICE_CACHE_SIZE = 8
+
+
+def get_shadow_slices(kind, radius, opacity, margin, offset):
+    """EN: Cached ShadowSlices (size-independent) / CN: 获取缓存的 ShadowSlices（与画布尺寸无关）"""
+    key = (kind, radius, int(opacity), int(margin), tuple(offset))
+    with _slices_lock:
+        slices = _slices.get(key)
+        if slices is not None:
+            _slices.move_to_end(key)
+            return slices
+    slices = ShadowSlices(kind, radius, int(opacity), int(margin), tuple(offset))
+    with _slices_lock:
+        _slices[key] = slices
+        while len(_slices) > SLICE_CACHE_SIZE:
+            _slices.popitem(last=False)
+    return slices
+
+
+def _legacy_shadow_mask(size, kind, radius, opacity, margin, offset):
+    """EN: Full-canvas blur (small canvases only) / CN: 整幅画布模糊（仅用于小画布）"""
+    mask = Image.new("L", (size[0] + margin, size[1] + margin), 0)
+    x0, y0 = margin // 2 + offset[0], margin // 2 + offset[1]
+    mask.paste(opacity, (x0, y0, x0 + size[0], y0 + size[1]))
+    return mask.filter(_make_filter(kind, radius))
+
+
+def shadow_mask(size, radius=20, opacity=140, margin=80, offset=(0, 10), kind="gaussian"):
+    """
+    EN: Alpha mask of a blurred drop shadow for a `size` canvas placed at (margin // 2, margin // 2).
+        The mask is (w + margin, h + margin); the shadow rectangle is shifted by `offset`.
+    CN: 生成 `size` 画布（放置于 (margin // 2, margin // 2)）的模糊投影透明度蒙版。
+        蒙版尺寸为 (w + margin, h + margin)，阴影矩形按 `offset` 偏移。
+    """
+    slices = get_shadow_slices(kind, radius, opacity, margin, offset)
+    if size[0] < slices.core or size[1] < slices.core:
+        return _legacy_shadow_mask(size, kind, radius, opacity, margin, offset)
+    return slices.assemble(size[0] + margin, size[1] + margin)
+
+
+def apply_shadow(canvas, radius=20, opacity=140, margin=80, offset=(0, 10), kind="gaussian"):
+    """
+    EN: Return an RGBA image (canvas + margin) with a black drop shadow under `canvas`.
+    CN: 返回在 `canvas` 下方带黑色投影的 RGBA 图像（尺寸为画布 + 边距）。
+    """
+    mask = shadow_mask(canvas.size, radius, opacity, margin, offset, kind)
+    # EN: Transparent black base keeps shadow RGB at 0 (no white corners on compression)
+    # CN: 透明黑作为基色，阴影 RGB 保持为 0（压缩后不出现白角）
+    full_canvas = Image.new("RGBA", mask.size, (0, 0, 0, 0))
+    full_canvas.putalpha(mask)
+    if canvas.mode == "RGB":
+        # EN: Opaque canvas: a plain paste equals the alpha-masked paste, without an RGBA copy
+        # CN: 不透明画布：直接粘贴与按透明度粘贴结果相同，且省去 RGBA 副本
+        full_canvas.paste(canvas, (margin // 2, margin // 2))
+    else:
+        canvas_rgba = canvas.convert("RGBA")
+        full_canvas.paste(canvas_rgba, (margin // 2, margin // 2), canvas_rgba)
+    return full_canvas
+
+
+# EN: Low-resolution sigma kept for the sharpest floating-shadow layer / CN: 最锐利悬浮阴影层在低分辨率下保留的 sigma
+FLOAT_MIN_WORK_SIGMA = 6.0
+FLOAT_CACHE_SIZE = 8
+
+_float_cache = OrderedDict()
+_float_lock = threading.Lock()
+
+
+def _fade_mask(s_w, s_h, fade_strength):
+    """EN: Bilinear "air falloff" gradient (row x column) / CN: 双向线性“空气衰减”渐变（行 x 列）"""
+    h_line = Image.frombytes("L", (s_w, 1), bytes(int(255 * (1.0 - (i / s_w) * fade_strength)) for i in range(s_w)))
+    v_line = Image.frombytes("L", (1, s_h), bytes(int(255 * (1.0 - (i / s_h) * fade_strength)) for i in range(s_h)))
+    # EN: NEAREST along the constant axis is an exact replicate / CN: 常量轴上的 NEAREST 缩放即精确复制
+    return ImageChops.multiply(h_line.resize((s_w, s_h), Image.Resampling.NEAREST),
+                               v_line.resize((s_w, s_h), Image.Resampling.NEAREST))
+
+
+def _float_layer_shape(photo_size, sf, corner, opacity, spread_neg, fade_strength):
+    """EN: Full-resolution layer alpha before blurring / CN: 模糊前的全分辨率图层透明度"""
+    s_w = max(10, photo_size[0] - int(spread_neg * sf) * 2)
+    s_h = max(10, photo_size[1] - int(spread_neg * sf) * 2)
+    mask = Image.new("L", (s_w, s_h), 0)
+    ImageDraw.Draw(mask).rounded_rectangle([0, 0, s_w, s_h], radius=corner, fill=255)
+    if fade_strength > 0:
+        mask = ImageChops.multiply(mask, _fade_mask(s_w, s_h, fade_strength))
+    return mask.point([int(v * opacity / 255) for v in range(256)])
+
+
+def _build_float_mask(photo_size, sf, layers, margin):
+    """
+    EN: Blur pyramid: each layer is area-reduced to a level where its sigma is ~FLOAT_MIN_WORK_SIGMA,
+        blurred only around its own footprint, upsampled to the common grid (the sharpest layer's
+        level) and screened in. Returns (low_res_mask, factor). Box blurs cost O(pixels)
+        regardless of radius, so shrinking each layer is what saves time.
+    CN: 模糊金字塔：每层按面积缩小到 sigma 约为 FLOAT_MIN_WORK_SIGMA 的层级，仅在自身覆盖范围内模糊，
+        再放大到公共网格（最锐利图层的层级）并以滤色叠加。返回 (低分辨率蒙版, 缩放因子)。
+        盒式模糊耗时只与像素数相关、与半径无关，因此逐层缩小才是提速关键。
+    """
+    base = max(1, int(min(layer[0] for layer in layers) / FLOAT_MIN_WORK_SIGMA))
+    buf_w = photo_size[0] + margin * 2
+    buf_h = photo_size[1] + margin * 2
+    low_size = (-(-buf_w // base), -(-buf_h // base))
+    combined = Image.new("L", low_size, 0)
+    corner = int(60 * sf)
+
+    for radius, opacity, off_x, off_y, spread_neg, fade_strength in layers:
+        # EN: Level factor is a multiple of the base so grids nest / CN: 层级因子为基础因子的整数倍，保证网格嵌套
+        scale = max(1, int(radius / (FLOAT_MIN_WORK_SIGMA * base)))
+        factor = base * scale
+        shape = _float_layer_shape(photo_size, sf, corner, opacity, spread_neg, fade_strength)
+        pos_x = margin + int(spread_neg * sf) + int(off_x * sf)
+        pos_y = margin + int(spread_neg * sf) + int(off_y * sf)
+
+        # EN: Footprint + blur reach, snapped to the level grid and clipped to the buffer
+        # CN: 覆盖范围 + 模糊影响距离，对齐到层级网格并裁剪到缓冲区内
+        reach = int(radius * 3.5) + factor
+        x0 = max(0, pos_x - reach) // factor * factor
+        y0 = max(0, pos_y - reach) // factor * factor
+        x1 = min(low_size[0] * base, -(-(pos_x + shape.width + reach) // factor) * factor)
+        y1 = min(low_size[1] * base, -(-(pos_y + shape.height + reach) // factor) * factor)
+        region = Image.new("L", (-(-(x1 - x0) // factor) * factor, -(-(y1 - y0) // factor) * factor), 0)
+        region.paste(shape, (pos_x - x0, pos_y - y0))
+        # EN: Area-average keeps sub-cell edge positions / CN: 面积平均保留格内的边缘位置
+        low = region.reduce(factor) if factor > 1 else region
+        low = low.filter(ImageFilter.GaussianBlur(radius=radius / factor))
+        if scale > 1:
+            low = low.resize((low.width * scale, low.height * scale), Image.Resampling.BICUBIC)
+
+        # EN: Black-on-black alpha_composite reduces to screen on alpha / CN: 黑色叠黑色的 alpha_composite 等价于透明度的滤色
+        bx, by = x0 // base, y0 // base
+        box = (bx, by, min(low_size[0], bx + low.width), min(low_size[1], by + low.height))
+        low = low.crop((0, 0, box[2] - bx, box[3] - by))
+        combined.paste(ImageChops.screen(combined.crop(box), low), box[:2])
+    return combined, base
+
+
+def floating_shadow_bands(photo_size, sf, layers):
+    """
+    EN: Combined alpha of the floating-photo shadow stack, as full-resolution bands around the photo.
+        layers: ((radius, opacity, off_x, off_y, spread_neg, fade_strength), ...) with offsets and
+        spreads in 2000px units (scaled by sf). Returns [(mask, (dx, dy)), ...] where (dx, dy) is
+        each band's top-left relative to the photo. Cells fully covered by the (opaque) photo are
+        skipped. The reduced mask is cached per photo size, so repeated sizes in a batch only pay
+        for the upsample.
+    CN: 悬浮照片阴影堆叠的合成透明度，以照片四周的全分辨率条带形式返回。
+        layers：((半径, 不透明度, x 偏移, y 偏移, 负扩张, 消隐强度), ...)，偏移与扩张以 2000px 为基准（乘以 sf）。
+        返回 [(蒙版, (dx, dy)), ...]，(dx, dy) 为各条带左上角相对照片的位置；被（不透明）照片完全覆盖的网格会被跳过。
+        缩小后的蒙版按照片尺寸缓存，批处理中相同尺寸只需付出放大开销。
+    """
+    layers = tuple(tuple(layer) for layer in layers)
+    margin = int(200 * sf) * 4
+    key = (tuple(photo_size), sf, layers)
+    with _float_lock:
+        cached = _float_cache.get(key)
+        if cached is not None:
+            _float_cache.move_to_end(key)
+    if cached is None:
+        cached = _build_float_mask(photo_size, sf, layers, margin)
+        with _float_lock:
+            _float_cache[key] = cached
+            while len(_float_cache) > FLOAT_CACHE_SIZE:
+                _float_cache.popitem(last=False)
+
+    low, factor = cached
+    bbox = low.getbbox()
+    if bbox is None:
+        return []
+    # EN: Reduced cells lying entirely under the photo / CN: 完全位于照片下方的缩小网格
+    hx0 = min(max(-(-margin // factor), bbox[0]), bbox[2])
+    hy0 = min(max(-(-margin // factor), bbox[1]), bbox[3])
+    hx1 = max(min((margin + photo_size[0]) // factor, bbox[2]), hx0)
+    hy1 = max(min((margin + photo_size[1]) // factor, bbox[3]), hy0)
+    boxes = [(bbox[0], bbox[1], bbox[2], hy0), (bbox[0], hy1, bbox[2], bbox[3]),
+             (bbox[0], hy0, hx0, hy1), (hx1, hy0, bbox[2], hy1)]
+
+    bands = []
+    for box in boxes:
+        if box[2] <= box[0] or box[3] <= box[1]:
+            continue
+        # EN: Upsample only this band (neighbour cells still feed the filter) / CN: 只放大该条带（相邻网格仍参与滤波）
+        mask = low.resize(((box[2] - box[0]) * factor, (box[3] - box[1]) * factor),
+                          Image.Resampling.BICUBIC, box=box)
+        bands.append((mask, (box[0] * factor - margin, box[1] * factor - margin)))
+    return bands
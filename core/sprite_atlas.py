@@ -0,0 +1,157 @@
+# core/sprite_atlas.py
+"""
+EN: Sprite atlas for contact-sheet text. Text is rasterized once per (font, text, sub-pixel start)
+    into an L coverage mask and drawn with ImageDraw.bitmap, which is the same blend draw.text uses,
+    so output is unchanged; the colour is applied at draw time, so one mask serves every colour
+    (e.g. both passes of the glowing data-back text). Frame labels such as "12A" are composed from
+    cached glyph sprites when the font's advances allow an exact composition. Rotated RGBA layers
+    (edge codes, frame numbers) are cached whole by (font, text, colour, angle).
+CN: 接触印相文字的贴图图集。文字按 (字体, 文本, 亚像素起点) 只栅格化一次为 L 覆盖率掩码，再用
+    ImageDraw.bitmap 绘制——与 draw.text 使用相同的混合方式，输出不变；颜色在绘制时施加，同一掩码可服务
+    任意颜色（例如数据后背发光文字的两次绘制）。"12A" 这类帧号在字体步进允许精确拼接时，由缓存的单字形
+    贴图拼合而成。旋转后的 RGBA 图层（喷码、帧号）按 (字体, 文本, 颜色, 角度) 整体缓存。
+"""
+
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageChops, ImageDraw
+
+ATLAS_CAPACITY = 2048
+
+
+def font_key(font):
+    """EN: Hashable identity of a PIL font / CN: PIL 字体的可哈希标识"""
+    path = getattr(font, "path", None)
+    if isinstance(path, str):
+        return (path, getattr(font, "size", 0), getattr(font, "index", 0), str(getattr(font, "layout_engine", "")))
+    return ("id", id(font))
+
+
+class SpriteAtlas:
+    """
+    EN: Thread-safe LRU of text masks and rotated text layers shared by all renderers.
+        Cached images are shared: callers paste them and must not modify them.
+    CN: 所有渲染器共享的线程安全 LRU，存放文字掩码与旋转文字图层。缓存图像为共享对象：调用方只可粘贴，不可修改。
+    """
+
+    def __init__(self, capacity=ATLAS_CAPACITY):
+        self.capacity = capacity
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, builder, font=None):
+        """
+        EN: Cached value for key, building it on a miss. `font` is kept alive with id()-keyed entries.
+        CN: 返回 key 对应的缓存值，未命中时构建。以 id() 为键的字体会随条目一起保留，防止 id 被复用。
+        """
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+        value = builder()
+        with self._lock:
+            self.misses += 1
+            self._items[key] = (value, font)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+        return value
+
+    # --- EN: Text masks / CN: 文字掩码 ---
+
+    @staticmethod
+    def _render_mask(font, text, frac):
+        """
+        EN: (mask, (ox, oy)): the coverage draw.text would produce for an origin with fractional part
+            `frac`; paste at (int(x) - ox, int(y) - oy).
+        CN: 返回 (掩码, (ox, oy))：即原点小数部分为 `frac` 时 draw.text 产生的覆盖率；粘贴位置为
+            (int(x) - ox, int(y) - oy)。
+        """
+        l, t, r, b = font.getbbox(text)
+        ox, oy = max(0, 1 - int(l)), max(0, 1 - int(t))
+        canvas = Image.new("L", (max(1, ox + int(r) + 2), max(1, oy + int(b) + 2)), 0)
+        ImageDraw.Draw(canvas).text((ox + frac[0], oy + frac[1]), text, font=font, fill=255)
+        bbox = canvas.getbbox()
+        if bbox is None:
+            return None, (0, 0)
+        return canvas.crop(bbox), (ox - bbox[0], oy - bbox[1])
+
+    def _composable(self, font, runs):
+        text = "".join(runs)
+        lengths = [font.getlength(run) for run in runs]
+        return all(float(n).is_integer() for n in lengths) and sum(lengths) == font.getlength(text)
+
+    def _compose_mask(self, font, runs, frac):
+        """EN: Join cached run sprites at their integer pen offsets / CN: 按整数笔位拼接缓存的片段贴图"""
+        pieces = []
+        pen = 0
+        for run in runs:
+            mask, (ox, oy) = self.text_mask(font, run, frac)
+            if mask is not None:
+                pieces.append((mask, pen - ox, -oy))
+            pen += int(font.getlength(run))
+        if not pieces:
+            return None, (0, 0)
+        x0 = min(px for _, px, _ in pieces)
+        y0 = min(py for _, _, py in pieces)
+        x1 = max(px + m.width for m, px, _ in pieces)
+        y1 = max(py + m.height for m, _, py in pieces)
+        out = Image.new("L", (x1 - x0, y1 - y0), 0)
+        for mask, px, py in pieces:
+            layer = Image.new("L", out.size, 0)
+            layer.paste(mask, (px - x0, py - y0))
+            # EN: Overlapping coverage keeps the maximum, as FreeType run rendering does
+            # CN: 重叠区域取最大覆盖率，与 FreeType 整串渲染一致
+            out = ImageChops.lighter(out, layer)
+        return out, (-x0, -y0)
+
+    def text_mask(self, font, text, frac=(0.0, 0.0), runs=None):
+        """
+        EN: Cached (mask, offset) for `text`. With `runs` (substrings joining to `text`, e.g. single
+            glyphs) the mask is composed from cached run sprites when that is exact for this font.
+        CN: 返回 `text` 的缓存 (掩码, 偏移)。给定 `runs`（拼接后等于 `text` 的子串，例如单个字形）且该字体
+            可精确拼接时，由缓存的片段贴图拼合。
+        """
+        frac = (round(frac[0], 4), round(frac[1], 4))
+        key = ("mask", font_key(font), text, frac)
+
+        def build():
+            if runs and len(runs) > 1 and self._composable(font, runs):
+                return self._compose_mask(font, runs, frac)
+            return self._render_mask(font, text, frac)
+
+        return self.get_or_build(key, build, font)
+
+    def draw_text(self, draw, xy, text, font, fill, runs=None):
+        """
+        EN: Drop-in for draw.text(xy, text, font=font, fill=fill) using the cached mask.
+        CN: 与 draw.text(xy, text, font=font, fill=fill) 等价，使用缓存掩码绘制。
+        """
+        x, y = xy
+        ix, iy = int(x), int(y)
+        mask, (ox, oy) = self.text_mask(font, text, (x - ix, y - iy), runs)
+        if mask is not None:
+            draw.bitmap((ix - ox, iy - oy), mask, fill=fill)
+
+    # --- EN: Rotated layers / CN: 旋转图层 ---
+
+    def rotated_layer(self, kind, font, text, color, angle, builder):
+        """EN: Cached rotated RGBA text layer / CN: 缓存的旋转 RGBA 文字图层"""
+        key = ("layer", kind, font_key(font), text, tuple(color), angle)
+        return self.get_or_build(key, builder, font)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._items)}
+
+
+# EN: Shared by all contact-sheet renderers in this process / CN: 本进程内所有接触印相渲染器共享
+sprite_atlas = SpriteAtlas()
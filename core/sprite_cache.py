@@ -0,0 +1,127 @@
+# core/sprite_cache.py
+"""
+EN: Bounded in-memory LRU of finished RGBA sprites with an optional PNG mirror on disk, so a cold
+    start can skip the expensive rasterization. Keys are any hashable tuple; the mirror file name
+    is the SHA-1 of repr(key). Used for logo sprites and 135 sprocket strips.
+CN: 已完成 RGBA 贴图的有界内存 LRU，可选同步为磁盘 PNG 镜像，冷启动时可跳过昂贵的栅格化。
+    键为任意可哈希元组；镜像文件名为 repr(key) 的 SHA-1。用于 Logo 贴图与 135 齿孔条。
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+# EN: PNG sprites kept on disk; least recently used are pruned beyond this
+# CN: 磁盘上保留的 PNG 贴图数量；超出后清理最久未使用的
+DISK_CACHE_MAX_FILES = 256
+
+
+class SpriteDiskCache:
+    """
+    EN: Thread-safe sprite LRU. label = (EN, CN) names used in log messages; the disk mirror is
+        capped at disk_max_files.
+    CN: 线程安全的贴图 LRU。label = (英文, 中文) 名称，用于日志信息；磁盘镜像文件数上限为 disk_max_files。
+    """
+
+    def __init__(self, capacity=32, disk_dir=None, disk_max_files=DISK_CACHE_MAX_FILES, label=("Sprite", "贴图")):
+        self.capacity = capacity
+        self.disk_dir = disk_dir
+        self.disk_max_files = disk_max_files
+        self.label = label
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.png")
+
+    def get_or_build(self, key, builder, persist=True):
+        """
+        EN: Return (sprite, source) where source is 'memory', 'disk' or 'render'.
+            builder() is only called on a full miss and must return an RGBA image.
+            persist=False only reads the disk mirror and never writes it.
+        CN: 返回 (贴图, 来源)，来源为 'memory'、'disk' 或 'render'。
+            仅在完全未命中时调用 builder()，其须返回 RGBA 图像。
+            persist=False 时只读取磁盘镜像，不写入。
+        """
+        with self._lock:
+            sprite = self._items.get(key)
+            if sprite is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return sprite, 'memory'
+
+        source = 'render'
+        sprite = None
+        if self.disk_dir:
+            path = self._disk_path(key)
+            if os.path.exists(path):
+                try:
+                    with Image.open(path) as cached:
+                        sprite = cached.convert("RGBA")
+                    source = 'disk'
+                    # EN: mtime doubles as last use for pruning / CN: mtime 兼作清理时的最近使用时间
+                    os.utime(path)
+                except Exception:
+                    sprite = None
+
+        if sprite is None:
+            sprite = builder()
+            if sprite is not None and self.disk_dir and persist:
+                self._write_disk(key, sprite)
+
+        with self._lock:
+            if source == 'disk':
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+            if sprite is not None:
+                self._items[key] = sprite
+                self._items.move_to_end(key)
+                while len(self._items) > self.capacity:
+                    self._items.popitem(last=False)
+        return sprite, source
+
+    def _write_disk(self, key, sprite):
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            sprite.save(tmp_path, format="PNG")
+            os.replace(tmp_path, path)
+            self._prune_disk()
+        except Exception as e:
+            label_en, label_cn = self.label
+            print(f"CN: [!] {label_cn} 磁盘缓存写入失败 / EN: {label_en} disk cache write failed: {e}")
+
+    def _prune_disk(self):
+        """EN: Drop least recently used PNGs beyond disk_max_files / CN: 删除超出 disk_max_files 的最久未使用 PNG"""
+        entries = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith(".png"):
+                try:
+                    entries.append((entry.stat().st_mtime_ns, entry.path))
+                except OSError:
+                    pass
+        if len(entries) <= self.disk_max_files:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.disk_max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses, 'size': len(self._items)}
@@ -0,0 +1,80 @@
+# core/texture_engine.py
+"""
+EN: Deterministic matte (paper grain) texture. The noise tile comes from a seeded generator, so
+    identical inputs render identical outputs. Only the tile and tile-high row strips are cached.
+CN: 可复现的哑光（纸纹颗粒）纹理。噪点块由固定种子生成，相同输入得到相同输出。只缓存噪点块与一块噪点高的横向条带。
+"""
+
+import random
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from PIL import Image
+
+MATTE_TILE_SIZE = 256
+MATTE_NOISE_SEED = 0x6723
+# EN: Grain levels, same range as the former randint(110, 145) / CN: 颗粒色阶，与旧版 randint(110, 145) 范围一致
+MATTE_NOISE_MIN = 110
+MATTE_NOISE_MAX = 145
+# EN: Cached RGB row strips (w x tile, ~4.6 MB at 4500px wide) / CN: 缓存的 RGB 横向条带（w x tile，4500px 宽约 4.6 MB）
+STRIP_CACHE_SIZE = 4
+
+_strips = OrderedDict()
+_strips_lock = threading.Lock()
+
+
+@lru_cache(maxsize=4)
+def matte_noise_tile(seed=MATTE_NOISE_SEED, tile_size=MATTE_TILE_SIZE):
+    """
+    EN: Seeded L-mode noise tile: random bytes mapped onto MATTE_NOISE_MIN..MAX with one point LUT.
+    CN: 固定种子的 L 模式噪点块：随机字节经一次查找表映射到 MATTE_NOISE_MIN..MAX。
+    """
+    span = MATTE_NOISE_MAX - MATTE_NOISE_MIN + 1
+    raw = Image.frombytes("L", (tile_size, tile_size), random.Random(seed).randbytes(tile_size * tile_size))
+    return raw.point([MATTE_NOISE_MIN + v * span // 256 for v in range(256)])
+
+
+def matte_noise_strip(width, seed=MATTE_NOISE_SEED):
+    """
+    EN: One tile-high RGB grain strip spanning `width` (w / tile pastes). Only strips are cached:
+        stacked vertically they form the full overlay, which is never materialised.
+    CN: 一块噪点高、宽为 `width` 的 RGB 颗粒条带（w / tile 次粘贴）。只缓存条带：纵向堆叠即构成
+        全尺寸叠加层，而全尺寸叠加层本身从不生成。
+    """
+    key = (int(width), seed)
+    with _strips_lock:
+        strip = _strips.get(key)
+        if strip is not None:
+            _strips.move_to_end(key)
+            return strip
+
+    tile = matte_noise_tile(seed)
+    noise = Image.new("L", (width, tile.height))
+    for x in range(0, width, tile.width):
+        noise.paste(tile, (x, 0))
+    strip = Image.merge("RGB", (noise, noise, noise))
+
+    with _strips_lock:
+        _strips[key] = strip
+        while len(_strips) > STRIP_CACHE_SIZE:
+            _strips.popitem(last=False)
+    return strip
+
+
+def apply_matte_texture(canvas, intensity=0.03, seed=MATTE_NOISE_SEED):
+    """
+    EN: Blend the grain into an RGB canvas one strip-high band at a time (blend is per pixel, so
+        this equals blending a full tiled overlay).
+    CN: 按条带高度逐段将颗粒混合到 RGB 画布（混合为逐像素运算，结果与混合整幅平铺叠加层相同）。
+    """
+    if canvas.mode != "RGB":
+        canvas = canvas.convert("RGB")
+    w, h = canvas.size
+    strip = matte_noise_strip(w, seed)
+    out = Image.new("RGB", (w, h))
+    for y in range(0, h, strip.height):
+        band_h = min(strip.height, h - y)
+        grain = strip if band_h == strip.height else strip.crop((0, 0, w, band_h))
+        out.paste(Image.blend(canvas.crop((0, y, w, y + band_h)), grain, intensity), (0, y))
+    return out
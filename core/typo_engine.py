@@ -4,32 +4,32 @@
 
 import os
 import sys
+import math
 import time
-from fontTools.ttLib import TTFont
-from PIL import ImageFont, Image
+import threading
+from collections import OrderedDict
+from PIL import Image, ImageDraw
+from core.kerning import get_kerning_table
+from core.font_service import font_service
 
 class TypoEngine:
     """
     EN: Dedicated typography engine for kerning.
     CN: 排版引擎，专门处理字间距算法。
     """
-    _font_cache = {}  # EN: Cache for (path, size) -> (pil_font, ttfont)
+    # EN: Glyph-run caches shared by all renderers / CN: 所有渲染器共享的字形串缓存
+    RUN_CACHE_SIZE = 128
+    _layout_cache = OrderedDict()  # EN: (font, size, run signature) -> (items, total_w)
+    _run_cache = OrderedDict()     # EN: (layout key, sub-pixel phase) -> rasterized run
+    _token_cache = OrderedDict()   # EN: (image path, line height) -> scaled RGBA token
+    _run_lock = threading.Lock()
     @staticmethod
-    def get_kerning_offset(ttfont, left, right, font_size):
-        # EN: Extract kerning offset from native kern table
-        # CN: 从原生 kern 表中提取字间距偏移
-        try:
-            if 'kern' in ttfont:
-                kt = ttfont['kern'].getkern(0)
-                upm = ttfont['head'].unitsPerEm
-                pair = (left, right)
-                if pair in kt:
-                    # EN: Conversion formula: (Units / EM) * FontSize
-                    # CN: 转换公式：(Units / EM) * FontSize
-                    return (kt[pair] / upm) * font_size
-        except: 
-            pass
-        return 0
+    def get_kerning_offset(kern_table, left, right, font_size):
+        # EN: Pair offset in pixels from a precompiled KerningTable (kern + GPOS)
+        # CN: 从预编译的 KerningTable（kern + GPOS）中取得像素级字偶距偏移
+        if kern_table is None:
+            return 0
+        return kern_table.offset(left, right, font_size)
 
     @staticmethod
     def _resolve_font_path(font_path):
@@ -50,11 +50,102 @@ class TypoEngine:
         
         return os.path.normcase(os.path.normpath(os.path.join(project_root, font_path)))
 
+    @classmethod
+    def _get_pil_font(cls, font_path, font_size):
+        """EN: FreeType face from the shared font service - no fontTools parsing / CN: 从共享字体服务获取 FreeType 字体，不做 fontTools 解析"""
+        return font_service.get_or_default(font_path, font_size)
+
+    @classmethod
+    def _get_token_image(cls, img_path, line_h):
+        """EN: Load and scale an image token to line height (cached) / CN: 加载图片 Token 并缩放到行高（带缓存）"""
+        key = (img_path, line_h)
+        with cls._run_lock:
+            token_img = cls._token_cache.get(key)
+            if token_img is not None:
+                cls._token_cache.move_to_end(key)
+        if token_img is None:
+            token_img = Image.open(img_path).convert("RGBA")
+            # EN: Scale to match text height / CN: 缩放以匹配文字高度
+            orig_w, orig_h = token_img.size
+            scaled_w = int(orig_w * (line_h / orig_h))
+            token_img = token_img.resize((scaled_w, line_h), Image.Resampling.LANCZOS)
+            with cls._run_lock:
+                cls._token_cache[key] = token_img
+                while len(cls._token_cache) > cls.RUN_CACHE_SIZE:
+                    cls._token_cache.popitem(last=False)
+        return token_img
+
+    @classmethod
+    def _layout_run(cls, segments, pil_font, kern_table, font_size, default_fill, line_h):
+        """
+        EN: Lay out all segments once: per-glyph pen positions (relative to run start),
+            colours and image tokens. Returns (items, total_w).
+        CN: 一次性排版全部片段：逐字笔位（相对行首）、颜色与图片 Token。返回 (items, total_w)。
+        """
+        items = []
+        pen = 0.0
+        for seg in segments:
+            if seg["type"] == "text":
+                content = seg["content"]
+                color = seg.get("color", default_fill)
+                colors = color if isinstance(color, list) else [color] * len(content)
+                for i, char in enumerate(content):
+                    if i > 0 and kern_table is not None:
+                        pen += kern_table.offset(content[i - 1], char, font_size)
+                    items.append(("glyph", pen, char, tuple(colors[i])))
+                    pen += pil_font.getlength(char)
+            elif seg["type"] == "image":
+                try:
+                    token_img = cls._get_token_image(seg["path"], line_h)
+                except Exception as e:
+                    print(f"CN: [!] 无法加载混合 Token: {e}")
+                    continue
+                items.append(("image", pen, token_img, None))
+                pen += token_img.width
+        return items, pen
+
+    @classmethod
+    def _render_run(cls, items, pil_font, origin_x, glyph_y):
+        """
+        EN: Rasterize a laid-out run into one coverage mask per stretch of same-coloured glyphs,
+            preserving the sub-pixel phase of origin_x / glyph_y. A new mask starts whenever the
+            colour changes, so overlapping glyphs keep their left-to-right paint order.
+        CN: 将排版结果按连续同色字形栅格化为覆盖蒙版，并保留 origin_x / glyph_y 的亚像素相位。
+            颜色变化时开始新蒙版，保证重叠字形仍按从左到右的顺序绘制。
+        """
+        ascent, descent = pil_font.getmetrics()
+        line_w = max((x for _, x, _, _ in items), default=0) + (ascent + descent) * 2
+        pad = ascent + descent
+        # EN: Integer-aligned local frame keeps fractional pen positions unchanged
+        # CN: 以整数对齐的局部坐标系，保持笔位小数部分不变
+        ox = math.floor(origin_x) - pad
+        oy = math.floor(glyph_y) - pad
+        size = (int(math.ceil(line_w)) + pad * 2, pad * 2)
+
+        masks = []  # EN: [(colour, mask)] in paint order / CN: 按绘制顺序排列的 [(颜色, 蒙版)]
+        mask_draw = None
+        tokens = []
+        for kind, x, obj, color in items:
+            if kind == "glyph":
+                if not masks or masks[-1][0] != color:
+                    masks.append((color, Image.new("L", size, 0)))
+                    mask_draw = ImageDraw.Draw(masks[-1][1])
+                mask_draw.text((origin_x - ox + x, glyph_y - oy), obj, font=pil_font, fill=255, anchor="lm")
+            else:
+                tokens.append((obj, x))
+
+        layers = []
+        for color, mask in masks:
+            bbox = mask.getbbox()
+            if bbox:
+                layers.append((color, mask.crop(bbox), (ox + bbox[0], oy + bbox[1])))
+        return {"layers": layers, "tokens": tokens}
+
     @classmethod
     def draw_mixed_text(cls, draw, pos, segments, font_path, font_size, default_fill, timings=None, key_prefix="mixed"):
         """
-        EN: Render a mix of text segments and image tokens (badges).
-        CN: 渲染混合了文本片段和图片标识（勋章）的内容。
+        EN: Render a mix of text segments and image tokens (badges) as a cached glyph run.
+        CN: 以缓存的字形串方式渲染混合了文本片段和图片标识（勋章）的内容。
         args:
             segments: List of dicts, e.g. [{"type": "text", "content": "FE 24-70mm ", "color": (rgb)}, {"type": "image", "path": "path/to/gm.png"}]
         """
@@ -62,94 +153,64 @@ class TypoEngine:
         t0 = time.perf_counter()
         font_path = cls._resolve_font_path(font_path)
         
-        cache_key = (font_path, font_size)
-        if cache_key in cls._font_cache:
-            pil_font, ttfont = cls._font_cache[cache_key]
-        else:
-            try:
-                if font_path.lower().endswith(".ttc"):
-                    ttfont = TTFont(font_path, fontNumber=0)
-                    pil_font = ImageFont.truetype(font_path, font_size, index=0)
-                else:
-                    ttfont = TTFont(font_path)
-                    pil_font = ImageFont.truetype(font_path, font_size)
-                cls._font_cache[cache_key] = (pil_font, ttfont)
-            except:
-                pil_font = ImageFont.load_default()
-                ttfont = None
-
-        # 1. EN: Pre-calculate widths and load images / CN: 预计算宽度并加载图片
-        prepared_segments = []
-        total_w = 0
+        pil_font = cls._get_pil_font(font_path, font_size)
+
         ascent, descent = pil_font.getmetrics()
         line_h = ascent + descent
 
+        # 1. EN: Layout (cached per font/size/text/colours) / CN: 排版（按 字体/字号/文本/颜色 缓存）
+        run_sig = []
         for seg in segments:
             if seg["type"] == "text":
-                content = seg["content"]
                 color = seg.get("color", default_fill)
-                
-                chars = list(content)
-                widths = [draw.textlength(c, font=pil_font) for c in chars]
-                offsets = [0]
-                if ttfont:
-                    for i in range(len(chars) - 1):
-                        offsets.append(cls.get_kerning_offset(ttfont, chars[i], chars[i+1], font_size))
-                
-                seg_w = sum(widths) + sum(offsets)
-                prepared_segments.append({
-                    "type": "text",
-                    "content": content,
-                    "color": color,
-                    "width": seg_w,
-                    "char_widths": widths,
-                    "offsets": offsets
-                })
-                total_w += seg_w
+                color = tuple(map(tuple, color)) if isinstance(color, list) else tuple(color)
+                run_sig.append(("text", seg["content"], color))
             elif seg["type"] == "image":
-                img_path = seg["path"]
-                try:
-                    token_img = Image.open(img_path).convert("RGBA")
-                    # EN: Scale to match text height / CN: 缩放以匹配文字高度
-                    orig_w, orig_h = token_img.size
-                    scaled_w = int(orig_w * (line_h / orig_h))
-                    token_img = token_img.resize((scaled_w, line_h), Image.Resampling.LANCZOS)
-                    
-                    prepared_segments.append({
-                        "type": "image",
-                        "img": token_img,
-                        "width": scaled_w
-                    })
-                    total_w += scaled_w
-                except Exception as e:
-                    print(f"CN: [!] 无法加载混合 Token: {e}")
-                    continue
+                run_sig.append(("image", seg["path"]))
+        layout_key = (font_path, font_size, tuple(run_sig))
+
+        with cls._run_lock:
+            layout = cls._layout_cache.get(layout_key)
+            if layout is not None:
+                cls._layout_cache.move_to_end(layout_key)
+        if layout is None:
+            # EN: fontTools parsing only happens here, on a layout miss / CN: 仅在排版未命中时才进行 fontTools 解析
+            kern_table = get_kerning_table(font_path, 0) if os.path.exists(font_path) else None
+            layout = cls._layout_run(segments, pil_font, kern_table, font_size, default_fill, line_h)
+            with cls._run_lock:
+                cls._layout_cache[layout_key] = layout
+                while len(cls._layout_cache) > cls.RUN_CACHE_SIZE:
+                    cls._layout_cache.popitem(last=False)
+        items, total_w = layout
 
         # 2. EN: Global Start Position (Center aligned) / CN: 全局起始点（居中对齐）
-        curr_x = pos[0] - total_w / 2
-        base_y = pos[1]
+        origin_x = pos[0] - total_w / 2
+        glyph_y = pos[1] + font_size * 0.02
 
-        # 3. EN: Sequential Rendering / CN: 顺序渲染
-        for seg in prepared_segments:
-            if seg["type"] == "text":
-                # EN: Draw text character by character for precision / CN: 逐字精准绘制文本
-                content = seg["content"]
-                colors = seg["color"] if isinstance(seg["color"], list) else [seg["color"]] * len(content)
-                char_widths = seg["char_widths"]
-                offsets = seg["offsets"]
-                
-                for i, char in enumerate(content):
-                    curr_x += offsets[i]
-                    y_offset = font_size * 0.02
-                    draw.text((curr_x, base_y + y_offset), char, font=pil_font, fill=colors[i], anchor="lm")
-                    curr_x += char_widths[i]
-            elif seg["type"] == "image":
-                # EN: Paste image token / CN: 粘贴图片 Token
-                img = seg["img"]
-                # EN: Vertical alignment - anchor="lm" equivalent for images
-                # CN: 垂直对齐 - 图片的等效 "lm" 居中
-                paste_y = int(base_y - img.height // 2)
-                draw._image.paste(img, (int(curr_x), paste_y), img)
-                curr_x += seg["width"]
+        # 3. EN: Rasterized run keyed by layout + sub-pixel phase / CN: 栅格化字形串，键为排版 + 亚像素相位
+        run_key = (layout_key, origin_x - math.floor(origin_x), glyph_y - math.floor(glyph_y))
+        with cls._run_lock:
+            run = cls._run_cache.get(run_key)
+            if run is not None:
+                cls._run_cache.move_to_end(run_key)
+        timings[f'{key_prefix}_run_cache_hit'] = run is not None
+        if run is None:
+            run = cls._render_run(items, pil_font, origin_x - math.floor(origin_x), glyph_y - math.floor(glyph_y))
+            with cls._run_lock:
+                cls._run_cache[run_key] = run
+                while len(cls._run_cache) > cls.RUN_CACHE_SIZE:
+                    cls._run_cache.popitem(last=False)
+
+        # 4. EN: One masked fill per colour stretch (in order), then tokens / CN: 每段同色字形一次蒙版填充（按顺序），然后粘贴 Token
+        target = draw._image
+        shift_x, shift_y = math.floor(origin_x), math.floor(glyph_y)
+        for color, mask, (mx, my) in run["layers"]:
+            target.paste(color, (mx + shift_x, my + shift_y), mask)
+        base_y = pos[1]
+        for token_img, x in run["tokens"]:
+            # EN: Vertical alignment - anchor="lm" equivalent for images
+            # CN: 垂直对齐 - 图片的等效 "lm" 居中
+            paste_y = int(base_y - token_img.height // 2)
+            target.paste(token_img, (int(origin_x + x), paste_y), token_img)
         
         timings[f'{key_prefix}_total'] = time.perf_counter() - t0
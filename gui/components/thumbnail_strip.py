@@ -10,6 +10,7 @@ import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from PIL import Image, ImageTk, ImageOps, ImageDraw
 from concurrent.futures import ThreadPoolExecutor
+from core.decode_planner import decode_for_size
 
 class ThumbnailStrip(ttk.Frame):
     """
@@ -116,6 +117,8 @@ class ThumbnailStrip(ttk.Frame):
             try:
                 from PIL import ImageTk
                 with Image.open(path_norm) as img:
+                    # EN: Decode at a DCT-reduced size first (e.g. 1/8 for 24MP) / CN: 先以 DCT 缩小尺寸解码（24MP 约为 1/8）
+                    img = decode_for_size(img, (120, 120))
                     # EN: Force 1:1 Square Crop (Increased size) / CN: 强制 1:1 方型裁切 (增加尺寸)
                     img = ImageOps.fit(img, (120, 120), Image.Resampling.LANCZOS)
                     
@@ -12,6 +12,11 @@ import threading
 import json
 from core.metadata import MetadataHandler
 from core.renderer import FilmRenderer, bootstrap_logos
+from core.batch_pool import BatchPool
+from core.exif_probe import probe_many, probe_size
+from core.preview_cache import preview_source_cache, preview_result_cache
+from core.preview_compositor import preview_compositor
+from core.preview_worker import check_cancel
 from utils.config_manager import config_manager
 
 class BorderController:
@@ -89,6 +94,7 @@ class BorderController:
             self.current_batch_paths.remove(p_norm)
         if p_norm in self.image_configs:
             del self.image_configs[p_norm]
+        preview_result_cache.discard(p_norm)
 
     def update_image_config(self, path, params):
         """EN: Update config for a specific image / CN: 更新单张图片的配置"""
@@ -158,10 +164,12 @@ class BorderController:
 
     # --- Processing Logic ---
 
-    def run_batch(self, output_dir, global_cfg, film_list):
+    def run_batch(self, output_dir, global_cfg, film_list, workers=None):
         """
-        EN: Main batch processing loop using internal state
-        CN: 使用内部状态的主批量处理循环
+        EN: Main batch processing loop using internal state.
+            workers: process count (None = config 'batch_workers', 1 = serial in-process).
+        CN: 使用内部状态的主批量处理循环。
+            workers：进程数（None 读取配置 'batch_workers'，1 为进程内串行）。
         """
         self.stop_requested = False
         files = self.current_batch_paths
@@ -172,121 +180,194 @@ class BorderController:
             return
 
         try:
-            # EN: Pre-calculate total relative width for physical slice (Rainbow/Macaron)
+            # EN: Pre-calculate total relative width for physical slice (Rainbow/Macaron); uncached sizes come from one batched header probe
+            # CN: 为物理切片（彩虹/马卡龙）预先计算总相对宽度；未缓存的尺寸用文件头探测批量获取
             relative_widths = []
             total_rel_w = 0.0
+            missing = [p for p in files if os.path.normcase(os.path.normpath(p)) not in self.batch_width_cache]
+            probes = probe_many(missing)
             for img_path in files:
                 p_norm = os.path.normcase(os.path.normpath(img_path))
                 rel_w = self.batch_width_cache.get(p_norm)
                 if rel_w is None:
-                    try:
-                        with Image.open(img_path) as img:
-                            w, h = img.size
-                            rel_w = w / h
-                    except:
+                    info = probes.get(img_path)
+                    if info and info['height']:
+                        rel_w = info['width'] / info['height']
+                        self.batch_width_cache[p_norm] = rel_w
+                    else:
                         rel_w = 1.6
                 relative_widths.append(rel_w)
                 total_rel_w += rel_w
 
+            # EN: Build ordered job list up-front so ranges/prefixes do not depend on completion order
+            # CN: 预先构建有序任务列表，彩虹切片与输出前缀与完成顺序无关
+            jobs = []
             current_w_accum = 0.0
-            
             for i, img_path in enumerate(files):
-                if self.stop_requested:
-                    self.log("\n⚡ 用户手动终止处理" if self.lang == "zh" else "\n⚡ User canceled processing")
-                    break
-
                 t_start = current_w_accum / total_rel_w
                 current_w_accum += relative_widths[i]
                 t_end = current_w_accum / total_rel_w
+                jobs.append(self._build_batch_job(i, img_path, output_dir, global_cfg, film_list, total, (t_start, t_end)))
 
+            processed = [0]
+            def on_result(res):
+                processed[0] += 1
                 if self.progress_callback:
-                    self.progress_callback(i + 1, total, os.path.basename(img_path))
+                    self.progress_callback(res['index'] + 1, total, os.path.basename(res['path']))
+                if not res['ok']:
+                    self.log(f"CN: [!] 渲染失败 / EN: Render failed: {os.path.basename(res['path'])} ({res['error']})")
 
-                # EN: Resolve configuration
-                p_norm = os.path.normcase(os.path.normpath(img_path))
-                cfg = self.image_configs.get(p_norm, {})
-                is_digital = global_cfg.get('is_digital', False)
-                is_pure = global_cfg.get('is_pure', False)
-                theme_str = cfg.get('theme', global_cfg.get('theme', 'light'))
-                
-                # EN: Resolve film
-                m_film = global_cfg.get('manual_film')
-                if cfg and not cfg.get('auto_detect', True):
-                    m_film = cfg.get('film_combo')
-                
-                # EN: Resolve keyword from display name
-                for display_name, keyword in film_list:
-                    if m_film == display_name:
-                        m_film = keyword
-                        break
-
-                # EN: Resolve metadata
-                data = self.metadata_handler.get_data(img_path, is_digital_mode=is_digital, manual_film=m_film)
-                
-                # EN: Apply overrides
-                layout_cfg = cfg if cfg else global_cfg.get('layout', {})
-                # EN: Convert pixels to ratios based on 4500px reference
-                # CN: 基于 4500px 基准将像素转换为比例
-                ref = 4500.0
-                data['layout'].update({
-                    "left": layout_cfg.get('left_px', 180) / ref,
-                    "right": layout_cfg.get('right_px', 180) / ref,
-                    "top": layout_cfg.get('top_px', 180) / ref,
-                    "bottom": layout_cfg.get('bottom_px', 585) / ref,
-                    "font_main_scale": layout_cfg.get('font_scale', 144) / ref,
-                    "font_sub_scale": layout_cfg.get('font_sub_px', 112) / ref,
-                    "font_v_offset": layout_cfg.get('font_v_offset', 0) / ref
-                })
-                
-                exif_cfg = cfg.get('exif') if cfg else global_cfg.get('exif')
-                if exif_cfg:
-                    for k, v in exif_cfg.items():
-                        if v is not None and v != "":
-                            key = k if k != 'Lens' else 'LensModel'
-                            key = key if key != 'Shutter' else 'ExposureTimeStr'
-                            key = key if key != 'Aperture' else 'FNumber'
-                            data[key] = v
-                
-                data['target_ratio'] = cfg.get('target_ratio', global_cfg.get('target_ratio', 'Original'))
+            pool = BatchPool(workers=workers)
+            pool.run(jobs, on_result=on_result, should_stop=lambda: self.stop_requested,
+                     renderer=self.renderer, meta=self.metadata_handler)
 
-                # EN: Theme mapping
-                theme_val = self.resolve_theme(theme_str)
-                r_range = (t_start, t_end)
-                r_idx = i % 9 
-                
-                out_prefix = ""
-                if theme_val in ["macaron", "rainbow", "sakura"]:
-                    out_prefix = f"{i+1:03d}_"
-
-                # EN: Render (Unpack tuple to avoid error)
-                _, _ = self.renderer.process_image(img_path, data, output_dir, 
-                                     manual_rotation=cfg.get('rotation', global_cfg.get('rotation', 0)),
-                                     theme=theme_val,
-                                     is_pure=is_pure,
-                                     use_lens_branding=global_cfg.get('use_branding', True),
-                                     rainbow_index=r_idx,
-                                     rainbow_total=total,
-                                     rainbow_range=r_range,
-                                     output_prefix=out_prefix,
-                                     v_offset=cfg.get('v_offset', 0),
-                                     h_offset=cfg.get('h_offset', 0))
+            if self.stop_requested:
+                self.log("\n⚡ 用户手动终止处理" if self.lang == "zh" else "\n⚡ User canceled processing")
 
             if self.complete_callback:
-                self.complete_callback({'success': True, 'processed': total if not self.stop_requested else i})
+                self.complete_callback({'success': True, 'processed': processed[0]})
                 
         except Exception as e:
             import traceback
             if self.error_callback:
                 self.error_callback(traceback.format_exc())
 
-    def get_preview_image(self, img_path, is_digital, is_pure, manual_film, rotation, use_branding=True):
+    def _build_batch_job(self, i, img_path, output_dir, global_cfg, film_list, total, r_range):
+        """
+        EN: Resolve per-image settings into a picklable job dict for BatchPool
+        CN: 将单张图片的设置解析为可序列化的任务字典（供 BatchPool 使用）
+        """
+        # EN: Resolve configuration
+        p_norm = os.path.normcase(os.path.normpath(img_path))
+        cfg = self.image_configs.get(p_norm, {})
+        theme_str = cfg.get('theme', global_cfg.get('theme', 'light'))
+        
+        # EN: Resolve film
+        m_film = global_cfg.get('manual_film')
+        if cfg and not cfg.get('auto_detect', True):
+            m_film = cfg.get('film_combo')
+        
+        # EN: Resolve keyword from display name
+        for display_name, keyword in film_list:
+            if m_film == display_name:
+                m_film = keyword
+                break
+
+        # EN: Theme mapping
+        theme_val = self.resolve_theme(theme_str)
+        out_prefix = ""
+        if theme_val in ["macaron", "rainbow", "sakura"]:
+            out_prefix = f"{i+1:03d}_"
+
+        return {
+            'index': i,
+            'img_path': img_path,
+            'output_dir': output_dir,
+            'is_digital': global_cfg.get('is_digital', False),
+            'manual_film': m_film,
+            # EN: Pixel values are converted to ratios (4500px reference) in the worker
+            # CN: 像素值在工作进程中按 4500px 基准转换为比例
+            'layout_px': dict(cfg if cfg else global_cfg.get('layout', {})),
+            'exif': cfg.get('exif') if cfg else global_cfg.get('exif'),
+            'target_ratio': cfg.get('target_ratio', global_cfg.get('target_ratio', 'Original')),
+            'render_kwargs': {
+                'manual_rotation': cfg.get('rotation', global_cfg.get('rotation', 0)),
+                'theme': theme_val,
+                'is_pure': global_cfg.get('is_pure', False),
+                'use_lens_branding': global_cfg.get('use_branding', True),
+                'rainbow_index': i % 9,
+                'rainbow_total': total,
+                'rainbow_range': r_range,
+                'output_prefix': out_prefix,
+                'v_offset': cfg.get('v_offset', 0),
+                'h_offset': cfg.get('h_offset', 0)
+            }
+        }
+
+    def _rainbow_params(self, img_path, theme_val):
+        """
+        EN: (index, total, range) of a photo in the batch-wide rainbow / gradient sequence
+        CN: 照片在批次级彩虹 / 渐变序列中的 (索引, 总数, 范围)
+        """
+        r_index = 0
+        r_total = 1
+        r_range = (0.0, 1.0)
+        
+        if theme_val in ["macaron", "rainbow", "sakura"] and self.current_batch_paths:
+            r_total = len(self.current_batch_paths)
+            norm_img_path = os.path.normcase(os.path.normpath(img_path))
+            
+            for idx, p in enumerate(self.current_batch_paths):
+                if os.path.normcase(os.path.normpath(p)) == norm_img_path:
+                    r_index = idx % 9
+                    break
+            
+            total_rel_w = sum(self.batch_width_cache.get(os.path.normcase(os.path.normpath(p)), 1.6) for p in self.current_batch_paths)
+            curr_accum = 0.0
+            for p in self.current_batch_paths:
+                p_norm = os.path.normcase(os.path.normpath(p))
+                if p_norm == norm_img_path:
+                    w = self.batch_width_cache.get(p_norm, 1.6)
+                    r_range = (curr_accum / total_rel_w, (curr_accum + w) / total_rel_w)
+                    break
+                curr_accum += self.batch_width_cache.get(p_norm, 1.6)
+        return r_index, r_total, r_range
+
+    def preview_signature(self, img_path, is_digital, is_pure, manual_film, rotation, use_branding=True):
         """
-        EN: Generate a preview image using internal and passed state
-        CN: 使用内部和传入状态生成预览图
+        EN: Everything a preview depends on: file mtime, the photo's config, global mode / branding and
+            its place in the batch. Equal signatures mean an identical preview.
+        CN: 预览所依赖的全部输入：文件 mtime、该照片的配置、全局模式 / 品牌标识及其在批次中的位置。
+            签名相同即预览相同。
+        """
+        p_norm = os.path.normcase(os.path.normpath(img_path))
+        cfg = self.image_configs.get(p_norm, {})
+        m_film = manual_film
+        if cfg and not cfg.get('auto_detect', True):
+            m_film = cfg.get('film_combo')
+        try:
+            mtime = os.stat(img_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        theme_val = self.resolve_theme(cfg.get('theme', 'light'))
+        return (mtime, repr(sorted(cfg.items())), bool(is_digital), bool(is_pure), m_film, rotation,
+                bool(use_branding), self._rainbow_params(img_path, theme_val))
+
+    def has_cached_preview(self, img_path, is_digital, is_pure, manual_film, rotation, use_branding=True):
+        """EN: A finished preview for exactly this request is cached / CN: 已缓存与该请求完全一致的完成预览"""
+        return preview_result_cache.contains(
+            img_path, self.preview_signature(img_path, is_digital, is_pure, manual_film, rotation, use_branding))
+
+    def prerender_preview(self, img_path, is_digital, is_pure, manual_film, rotation, use_branding=True, cancel=None):
+        """
+        EN: Speculative render into the result cache. Skips the layer compositor so the shown photo's
+            layers stay cached.
+        CN: 推测性渲染并存入结果缓存。不经过分层合成器，以保留当前照片的缓存图层。
+        """
+        if not self.has_cached_preview(img_path, is_digital, is_pure, manual_film, rotation, use_branding):
+            self.get_preview_image(img_path, is_digital, is_pure, manual_film, rotation, use_branding,
+                                   cancel=cancel, use_layers=False)
+
+    def get_preview_image(self, img_path, is_digital, is_pure, manual_film, rotation, use_branding=True, cancel=None,
+                          use_layers=True):
+        """
+        EN: Generate a preview image using internal and passed state. cancel is an optional CancelToken;
+            a superseded preview raises PreviewCancelled between stages. A finished preview with the same
+            signature (e.g. pre-rendered as a neighbour) is returned at once.
+        CN: 使用内部和传入状态生成预览图。cancel 为可选的 CancelToken；被替换的预览在阶段之间抛出 PreviewCancelled。
+            若已有签名相同的完成预览（例如作为相邻照片预渲染），则立即返回。
         """
         import time
         t_start = time.perf_counter()
         render_timings = {}
+
+        signature = self.preview_signature(img_path, is_digital, is_pure, manual_film, rotation, use_branding)
+        cached = preview_result_cache.get(img_path, signature)
+        if cached is not None:
+            final_pil, performance_report = cached
+            performance_report['total'] = time.perf_counter() - t_start
+            performance_report['preview_result'] = 'hit'
+            return final_pil, performance_report
         
         p_norm = os.path.normcase(os.path.normpath(img_path))
         cfg = self.image_configs.get(p_norm, {})
@@ -294,8 +375,14 @@ class BorderController:
         if cfg and not cfg.get('auto_detect', True):
             m_film = cfg.get('film_combo')
             
-        data = self.metadata_handler.get_data(img_path, is_digital_mode=is_digital, manual_film=m_film)
+        # EN: Metadata and the preview-ready source come from the decoded-source LRU; a slider nudge
+        #     on the same photo only re-runs layout and compositing
+        # CN: 元数据与预览就绪源图来自已解码源图 LRU；同一张照片调节滑块时只重新执行排版与合成
+        data = preview_source_cache.get_data(
+            img_path, is_digital, m_film,
+            lambda: self.metadata_handler.get_data(img_path, is_digital_mode=is_digital, manual_film=m_film))
         t_meta = time.perf_counter() - t_start
+        check_cancel(cancel)
 
         layout_cfg = cfg if cfg else {
             "left_px": 180, "right_px": 180, "top_px": 180, "bottom_px": 585, 
@@ -326,33 +413,20 @@ class BorderController:
         theme_str = cfg.get('theme', 'light')
         theme_val = self.resolve_theme(theme_str)
 
-        r_index = 0
-        r_total = 1
-        r_range = (0.0, 1.0)
-        
-        if theme_val in ["macaron", "rainbow", "sakura"] and self.current_batch_paths:
-            r_total = len(self.current_batch_paths)
-            norm_img_path = os.path.normcase(os.path.normpath(img_path))
-            
-            for idx, p in enumerate(self.current_batch_paths):
-                if os.path.normcase(os.path.normpath(p)) == norm_img_path:
-                    r_index = idx % 9
-                    break
-            
-            total_rel_w = sum(self.batch_width_cache.get(os.path.normcase(os.path.normpath(p)), 1.6) for p in self.current_batch_paths)
-            curr_accum = 0.0
-            for p in self.current_batch_paths:
-                p_norm = os.path.normcase(os.path.normpath(p))
-                if p_norm == norm_img_path:
-                    w = self.batch_width_cache.get(p_norm, 1.6)
-                    r_range = (curr_accum / total_rel_w, (curr_accum + w) / total_rel_w)
-                    break
-                curr_accum += self.batch_width_cache.get(p_norm, 1.6)
+        r_index, r_total, r_range = self._rainbow_params(img_path, theme_val)
+
+        t_source = time.perf_counter()
+        source = preview_source_cache.get_source(
+            img_path, rotation, 1200,
+            lambda: self.renderer.load_source(img_path, 1200, rotation, render_timings))
+        render_timings['source'] = time.perf_counter() - t_source
+        check_cancel(cancel)
 
         # EN: Render (Unpack tuple for info)
         final_pil, _ = self.renderer.process_image(img_path, data, None, 
                                          target_long_edge=1200, 
                                          manual_rotation=rotation,
+                                         source_img=source,
                                          theme=theme_val,
                                          is_pure=is_pure,
                                          use_lens_branding=use_branding,
@@ -361,14 +435,21 @@ class BorderController:
                                          rainbow_range=r_range,
                                          v_offset=cfg.get('v_offset', 0),
                                          h_offset=cfg.get('h_offset', 0),
+                                         layers=preview_compositor if use_layers else None,
+                                         cancel=cancel,
                                          timing_results=render_timings)
         
         total_time = time.perf_counter() - t_start
         performance_report = {
             'total': total_time,
             'metadata': t_meta,
+            'metadata_cache': self.metadata_handler.cache_stats(),
+            'preview_cache': preview_source_cache.stats(),
+            'preview_layers': preview_compositor.stats(),
             'render_breakdown': render_timings
         }
+        if final_pil is not None:
+            preview_result_cache.put(img_path, signature, final_pil, performance_report)
         
         return final_pil, performance_report
 
@@ -397,10 +478,9 @@ class BorderController:
             if not files: return None
             
             first_img = os.path.join(folder, files[0])
-            with Image.open(first_img) as img:
-                w, h = img.size
-                aspect = w / h
-                is_portrait = h > w
+            w, h = probe_size(first_img)
+            aspect = w / h
+            is_portrait = h > w
             
             layout_config = self.load_layout_config()
             best_match = "default"
@@ -12,8 +12,17 @@ from PIL import Image, ImageTk
 
 from gui.components import ThumbnailStrip, ExifGroup, SettingsGroup, AestheticGroup
 from gui.controllers.border_controller import BorderController
+from core.exif_probe import probe_many, probe_size
+from core.decode_planner import open_for_size
+from core.preview_worker import PreviewWorker
+from utils.config_manager import config_manager
 from tkinter import simpledialog
 
+# EN: Preview debounce (ms): switching photos vs nudging a parameter on the shown photo
+# CN: 预览防抖（毫秒）：切换照片 / 微调当前照片参数
+PREVIEW_DEBOUNCE_MS = 300
+PREVIEW_NUDGE_DEBOUNCE_MS = 30
+
 class BorderPanel:
     """
     EN: Border Tool GUI panel
@@ -28,7 +37,7 @@ class BorderPanel:
         """
         self.parent = parent
         self.worker_thread = None
-        self.preview_thread = None
+        self.preview_worker = PreviewWorker()  # EN: Single coalescing preview worker / CN: 单个合并式预览工作线程
         self.preview_job_id = 0  # EN: Preview job marker / CN: 预览任务标记
         self.preview_after_id = None # EN: Debounce timer ID / CN: 防抖计时器 ID
         self.film_list = []
@@ -354,6 +363,7 @@ class BorderPanel:
         self.rotate_right_btn.bind("<Button-1>", lambda e: self.rotate_right())
         
         self._current_preview_pil = None
+        self._preview_path = None  # EN: Photo shown in the preview / CN: 预览中显示的照片
         self._preview_img_ref = None
         self._is_loading_preview = False
         self._preview_error_msg = None
@@ -567,7 +577,7 @@ class BorderPanel:
         self.controller.remove_from_batch(path_norm)
         if getattr(self, 'current_image_path', None) == path:
             self.current_image_path = None
-            self._current_preview_pil = None
+            self._current_preview_pil, self._preview_path = None, None
             self.redraw_preview()
         self.refresh_thumb_strip()
         self.update_file_count()
@@ -592,14 +602,12 @@ class BorderPanel:
 
     def _update_batch_width_cache(self, paths, async_mode=True):
         def scan_work():
-            for p in paths:
-                try:
-                    p_norm = os.path.normcase(os.path.normpath(p))
-                    if p_norm not in self.controller.batch_width_cache:
-                        with Image.open(p) as img:
-                            w, h = img.size
-                            self.controller.update_aspect_ratio_cache(p, w/h)
-                except: pass
+            # EN: Header-only probe over a thread pool / CN: 线程池批量读取文件头
+            cache = self.controller.batch_width_cache
+            missing = [p for p in paths if os.path.normcase(os.path.normpath(p)) not in cache]
+            for p, info in probe_many(missing).items():
+                if info and info['height']:
+                    self.controller.update_aspect_ratio_cache(p, info['width'] / info['height'])
         if async_mode: threading.Thread(target=scan_work, daemon=True).start()
         else: scan_work()
 
@@ -698,50 +706,102 @@ class BorderPanel:
     def update_preview_for_path(self, img_path):
         if getattr(self, 'preview_after_id', None):
             self.parent.after_cancel(self.preview_after_id)
-        self.preview_after_id = self.parent.after(300, lambda: self._do_render_preview(img_path))
+        # EN: Layered previews re-render only dirty layers, so nudges on the shown photo need little debounce
+        # CN: 分层预览只重绘失效图层，因此对当前照片的微调只需很短的防抖
+        same_photo = img_path == getattr(self, '_preview_path', None)
+        delay = PREVIEW_NUDGE_DEBOUNCE_MS if same_photo else PREVIEW_DEBOUNCE_MS
+        # EN: A pre-rendered neighbour is shown without waiting for the debounce
+        # CN: 已预渲染的相邻照片无需等待防抖即可显示
+        if not same_photo and self.controller.has_cached_preview(img_path, **self._preview_args()):
+            delay = 0
+        self.preview_after_id = self.parent.after(delay, lambda: self._do_render_preview(img_path))
+
+    def _preview_args(self):
+        """
+        EN: Preview request arguments from the UI. Tk variables are read on the UI thread, not in the worker.
+        CN: 从界面读取预览请求参数。Tk 变量在 UI 线程读取，而不是在工作线程中读取。
+        """
+        mode = self.mode_var.get()
+        manual_film = None
+        if mode == "film" and not self.auto_detect_var.get():
+            manual_film = self.film_combo.get().strip()
+            for display_name, keyword in self.film_list:
+                if manual_film == display_name: manual_film = keyword; break
+        return {'is_digital': mode == "digital", 'is_pure': mode == "pure", 'manual_film': manual_film,
+                'rotation': self.rotation_var.get(), 'use_branding': self.use_lens_branding_var.get()}
 
     def _do_render_preview(self, img_path):
         try:
-            manual_film = None
-            if self.mode_var.get() == "film" and not self.auto_detect_var.get():
-                manual_film = self.film_combo.get().strip()
-                for display_name, keyword in self.film_list:
-                    if manual_film == display_name: manual_film = keyword; break
+            args = self._preview_args()
             self.preview_job_id += 1
             job_id = self.preview_job_id
-            self._is_loading_preview, self._current_preview_pil = True, None
-            self.redraw_preview()
-            def worker():
-                try:
-                    final_pil, report = self.controller.get_preview_image(
-                        img_path=img_path, is_digital=(self.mode_var.get()=="digital"),
-                        is_pure=(self.mode_var.get()=="pure"), manual_film=manual_film,
-                        rotation=self.rotation_var.get(), use_branding=self.use_lens_branding_var.get()
-                    )
-                    if not final_pil: raise Exception("Render failed")
-                    img_copy = final_pil.copy()
-                    def apply():
-                        if job_id != self.preview_job_id: return
-                        self._is_loading_preview, self._current_preview_pil = False, img_copy
-                        self._update_preview_info(img_copy.width, img_copy.height)
-                        self.redraw_preview()
-                        self.log(f"Render: {report['total']*1000:.0f}ms")
-                        self._check_font_overflow(report)
-                    self.parent.after(0, apply)
-                except Exception as e:
-                    err_msg = str(e)
-                    self.parent.after(0, lambda m=err_msg, j=job_id: self._handle_preview_error(img_path, m, j))
-            threading.Thread(target=worker, daemon=True).start()
+            # EN: Keep the current preview on screen while the same photo re-renders (no flicker)
+            # CN: 同一张照片重新渲染时保留当前预览（避免闪烁）
+            if img_path != getattr(self, '_preview_path', None) and not self.controller.has_cached_preview(img_path, **args):
+                self._is_loading_preview, self._current_preview_pil = True, None
+                self.redraw_preview()
+
+            def job(token):
+                final_pil, report = self.controller.get_preview_image(img_path=img_path, cancel=token, **args)
+                if not final_pil: raise Exception("Render failed")
+                return final_pil, report
+
+            def on_done(result):
+                img_copy, report = result
+                def apply():
+                    if job_id != self.preview_job_id: return
+                    self._is_loading_preview, self._current_preview_pil = False, img_copy
+                    self._preview_path = img_path
+                    self._update_preview_info(img_copy.width, img_copy.height)
+                    self.redraw_preview()
+                    self.log(f"Render: {report['total']*1000:.0f}ms")
+                    self._check_font_overflow(report)
+                    self._schedule_neighbour_previews(img_path, args)
+                self.parent.after(0, apply)
+
+            def on_error(e):
+                err_msg = str(e)
+                self.parent.after(0, lambda m=err_msg, j=job_id: self._handle_preview_error(img_path, m, j))
+
+            # EN: Latest wins: the previous preview is dropped or cancelled at its next stage boundary
+            # CN: 最新者胜出：上一个预览被丢弃，或在其下一个阶段边界处取消
+            self.preview_worker.submit(job, on_done, on_error)
         except: pass
 
+    def _schedule_neighbour_previews(self, img_path, args):
+        """
+        EN: Queue idle-time renders of the next / previous photos in batch order (nearest first), each
+            with its own config, so clicking the next frame finds a finished preview.
+        CN: 按批次顺序（由近及远）将前后照片加入空闲渲染队列，各自使用自身配置，点击下一帧时即可获得完成的预览。
+        """
+        radius = config_manager.get("preview_prefetch", 2)
+        paths = list(self.controller.current_batch_paths)
+        if radius <= 0 or img_path not in paths:
+            return
+        idx = paths.index(img_path)
+        jobs = []
+        for step in range(1, radius + 1):
+            for j in (idx + step, idx - step):
+                if not 0 <= j < len(paths):
+                    continue
+                # EN: Mirror what _load_state_to_ui would set for that photo / CN: 与 _load_state_to_ui 为该照片设置的状态保持一致
+                cfg = self.controller.get_image_config(paths[j])
+                n_args = dict(args)
+                if cfg:
+                    n_args['rotation'] = cfg.get('rotation', 0)
+                    if cfg.get('auto_detect', True):
+                        n_args['manual_film'] = None
+                jobs.append(lambda token, p=paths[j], a=n_args: self.controller.prerender_preview(p, cancel=token, **a))
+        self.preview_worker.submit_idle(jobs)
+
     def _handle_preview_error(self, path, msg, job_id):
         if job_id != self.preview_job_id: return
         self._is_loading_preview = False
+        self._preview_path = None
         try:
-            with Image.open(path) as img:
-                img = img.convert("RGB")
-                img.thumbnail((2000, 2000))
-                self._current_preview_pil = img.copy()
+            img = open_for_size(path, (2000, 2000), fit="contain").convert("RGB")
+            img.thumbnail((2000, 2000))
+            self._current_preview_pil = img
         except: self._current_preview_pil = None
         self._preview_error_msg = f"Preview error: {msg}"
         self.redraw_preview()
@@ -917,13 +977,12 @@ class BorderPanel:
             path_norm = os.path.normcase(os.path.normpath(self.current_image_path))
             img_ratio = self.controller.batch_width_cache.get(path_norm)
             
-            # EN: Fallback if cache not found / CN: 如果缓存未命中，则即时打开图片获取比例
+            # EN: Fallback if cache not found: header probe only / CN: 如果缓存未命中，则仅探测文件头获取比例
             if not img_ratio:
                 try:
-                    with Image.open(self.current_image_path) as tmp_img:
-                        tw, th = tmp_img.size
-                        img_ratio = tw / th
-                        self.controller.update_aspect_ratio_cache(path_norm, img_ratio)
+                    tw, th = probe_size(self.current_image_path)
+                    img_ratio = tw / th
+                    self.controller.update_aspect_ratio_cache(path_norm, img_ratio)
                 except: return
             
             if not img_ratio: return
@@ -153,4 +153,8 @@ def bootstrap_configs():
         print(f"CN: [✔] 已释放默认配置到 GT23_Assets/config: {', '.join(exported)}")
 
 if __name__ == "__main__":
+    # EN: Required for process-pool batch rendering in frozen (PyInstaller) builds
+    # CN: 打包版（PyInstaller）中使用多进程批量渲染所必需
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
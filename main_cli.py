@@ -63,4 +63,8 @@ def main():
             print("EN: [!] Invalid input, please select 1, 2 or Q. | CN: [!] 无效输入，请重新选择 1, 2 或 Q。")
 
 if __name__ == "__main__":
+    # EN: Required for process-pool batch rendering in frozen (PyInstaller) builds
+    # CN: 打包版（PyInstaller）中使用多进程批量渲染所必需
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -2,15 +2,19 @@ import os
 import time
 from PIL import Image
 from core.renderer import FilmRenderer
+from core.decode_planner import open_for_size
+
+# EN: Unbounded side of a one-sided target box / CN: 单边目标框中不受限的一边
+UNBOUNDED = float("inf")
 
 def create_3x3_grid(image_paths, output_path, bg_color=(255, 255, 255)):
     valid_paths = [p for p in image_paths if os.path.exists(p)]
     if not valid_paths: return
     
-    images = [Image.open(p) for p in valid_paths[:9]]
-    
     # Resize for grid
     target_w = 1000
+    # EN: Decode just large enough for the cell width / CN: 仅按单元格宽度所需分辨率解码
+    images = [open_for_size(p, (target_w, UNBOUNDED), fit="contain") for p in valid_paths[:9]]
     resized = [img.resize((target_w, int(img.height * target_w / img.width)), Image.Resampling.LANCZOS) for img in images]
     
     cell_w, cell_h = resized[0].size
@@ -34,9 +38,10 @@ def create_horizontal_strip(image_paths, output_path):
     valid_paths = [p for p in image_paths if os.path.exists(p)]
     if not valid_paths: return
     
-    images = [Image.open(p) for p in valid_paths]
     # Resize for strip
     target_h = 800
+    # EN: Decode just large enough for the strip height / CN: 仅按长条高度所需分辨率解码
+    images = [open_for_size(p, (UNBOUNDED, target_h), fit="contain") for p in valid_paths]
     resized = [img.resize((int(img.width * target_h / img.height), target_h), Image.Resampling.LANCZOS) for img in images]
     
     total_w = sum(img.width for img in resized)
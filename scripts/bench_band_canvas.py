@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import random
+import shutil
+import hashlib
+import tempfile
+import subprocess
+from PIL import Image
+
+# Add project root to path for core imports
+sys.path.append(os.getcwd())
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# EN: 16x20 inch sheet at 600 dpi / CN: 600 dpi 下的 16x20 英寸索引页
+SHEET = (9600, 12000)
+
+
+def render(folder, banded, out_path):
+    """EN: 6x6 sheet (no cairosvg needed), margins scaled to the canvas / CN: 6x6 索引页（无需 cairosvg），边距按画布缩放"""
+    from core.metadata import MetadataHandler
+    from core.renderers.renderer_66 import Renderer66
+
+    meta = MetadataHandler()
+    cfg = {k: v * 2 if isinstance(v, int) else v for k, v in meta.get_contact_layout("66").items()}
+    paths = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".jpg"))
+    r = Renderer66()
+    canvas, emulsion = r.prepare_canvas(*SHEET, emulsion_number="049", banded=banded)
+    random.seed(7)
+    canvas = r.render(canvas, paths, cfg, meta, emulsion)
+    if out_path.endswith(".tif"):
+        canvas.save(out_path, compression="tiff_deflate", dpi=(600, 600))
+    else:
+        canvas.save(out_path, quality=95)
+    canvas.close()
+
+
+def child(folder, banded, out_path):
+    t = time.perf_counter()
+    render(folder, banded == "1", out_path)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024 if resource else -1
+    print(f"{time.perf_counter() - t:.2f} {rss}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "--child":
+        child(*sys.argv[2:])
+        sys.exit(0)
+
+    folder = tempfile.mkdtemp(prefix="gt23_band_")
+    try:
+        for i in range(12):
+            img = Image.linear_gradient("L").resize((4000, 4000)).convert("RGB")
+            img.paste((i * 20, 90, 200 - i * 10), (200, 200, 1200 + i * 100, 1200))
+            img.save(os.path.join(folder, f"f{i:02d}.jpg"), quality=90)
+
+        # EN: All renders run before this process decodes anything: ru_maxrss is inherited across exec
+        # CN: 所有渲染在本进程解码任何图像之前运行：ru_maxrss 会在 exec 时继承
+        outputs = {}
+        for ext in ("jpg", "tif"):
+            for banded in ("0", "1"):
+                out = os.path.join(folder, f"sheet_{banded}.{ext}")
+                result = subprocess.run([sys.executable, __file__, "--child", folder, banded, out],
+                                        capture_output=True, text=True, cwd=os.getcwd())
+                seconds, rss = result.stdout.strip().splitlines()[-1].split()
+                outputs[ext, banded] = out
+                label = "banded" if banded == "1" else "in-memory"
+                print(f"{ext} {label:10s} {SHEET[0]}x{SHEET[1]}: {float(seconds):.2f} s | peak RSS "
+                      f"{rss + ' MB' if rss != '-1' else 'n/a'}")
+
+        # EN: JPEG RSS includes the clean, reclaimable pages of the mapped scratch file
+        # CN: JPEG 的 RSS 包含映射暂存文件的干净页（可被系统回收）
+        Image.MAX_IMAGE_PIXELS = None
+        ok = True
+        for ext in ("jpg", "tif"):
+            digests = []
+            for banded in ("0", "1"):
+                with Image.open(outputs[ext, banded]) as img:
+                    digests.append(hashlib.md5(img.tobytes()).hexdigest())
+            same = digests[0] == digests[1]
+            ok &= same
+            print(f"{ext} identical pixels: {same}")
+        print("PASS" if ok else "FAIL")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
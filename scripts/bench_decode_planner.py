@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+from PIL import Image, ImageChops, ImageOps, ImageStat
+
+# Add project root to path for core imports
+sys.path.append(os.getcwd())
+
+from core.decode_planner import decode_for_size, open_for_size, plan_factor
+
+# EN: (label, output size, fit) for the main load sites / CN: 主要加载入口的 (名称, 输出尺寸, 适配方式)
+TARGETS = (
+    ("thumbnail strip", (120, 120), "cover"),
+    ("contact frame", (800, 533), "cover"),
+    ("preview", (1200, 1200), "contain"),
+    ("collage cell", (791, 941), "contain"),
+    ("export", (4000, 4000), "contain"),
+)
+
+
+def make_source(path, size):
+    """EN: Detailed synthetic scan (stripes + gradient) / CN: 含细节的合成扫描图（条纹 + 渐变）"""
+    grad = Image.linear_gradient("L").resize(size)
+    img = Image.merge("RGB", (grad, grad.transpose(Image.Transpose.ROTATE_90).resize(size), grad))
+    stripes = Image.new("RGB", size, (30, 30, 30))
+    for x in range(0, size[0], 7):
+        stripes.paste((220, 180, 40), (x, 0, x + 3, size[1]))
+    Image.blend(img, stripes, 0.35).save(path, quality=92)
+
+
+def legacy(path, size, fit):
+    """EN: Full decode then the final resample / CN: 完整解码后再做最终重采样"""
+    with Image.open(path) as img:
+        return finish(img, size, fit)
+
+
+def planned(path, size, fit):
+    with Image.open(path) as img:
+        return finish(decode_for_size(img, size, fit), size, fit)
+
+
+def finish(img, size, fit):
+    if fit == "cover":
+        return ImageOps.fit(img, size, Image.Resampling.LANCZOS)
+    img = img.copy()
+    img.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=None)
+    return img
+
+
+def diff_stats(a, b):
+    if a.size != b.size:
+        return 255, 255.0
+    diff = ImageChops.difference(a, b)
+    return max(hi for _, hi in diff.getextrema()), max(ImageStat.Stat(diff).mean)
+
+
+if __name__ == "__main__":
+    folder = tempfile.mkdtemp(prefix="gt23_decode_")
+    try:
+        src = os.path.join(folder, "scan_24mp.jpg")
+        make_source(src, (6000, 4000))
+        ok = True
+        for label, size, fit in TARGETS:
+            t = time.perf_counter()
+            ref = legacy(src, size, fit)
+            t_old = time.perf_counter() - t
+            t = time.perf_counter()
+            got = planned(src, size, fit)
+            t_new = time.perf_counter() - t
+            worst, mean = diff_stats(ref, got)
+            # EN: Fine stripes are a worst case for DCT scaling / CN: 细条纹是 DCT 缩放的最坏情况
+            ok &= worst <= 8 and mean <= 2.0
+            print(f"{label:16s} {size}: factor {plan_factor((6000, 4000), size, fit)} | full {t_old*1000:.0f} ms | "
+                  f"planned {t_new*1000:.0f} ms | max diff {worst}, mean diff {mean:.3f}")
+
+        # EN: EXIF orientation: target is in display orientation / CN: EXIF 方向：目标尺寸按显示方向给出
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        rotated = os.path.join(folder, "scan_rot.jpg")
+        with Image.open(src) as img:
+            img.save(rotated, quality=92, exif=exif.tobytes())
+        img = open_for_size(rotated, (400, 600), fit="contain", transpose=True)
+        ok &= img.width < img.height and img.height >= 600
+        print(f"orientation 6 -> {img.size}")
+
+        print("PASS" if ok else "FAIL")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
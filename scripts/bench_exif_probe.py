@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import exifread
+from PIL import Image
+
+# Add project root to path for core imports
+sys.path.append(os.getcwd())
+
+from core.exif_probe import probe, probe_many
+
+
+def legacy_scan(path):
+    """EN: Former per-file scan (PIL header + exifread) kept as reference / CN: 旧版逐文件扫描（PIL 文件头 + exifread），作为对照基准"""
+    with Image.open(path) as img:
+        w, h = img.size
+        orientation = img.getexif().get(0x0112, 1)
+    with open(path, 'rb') as f:
+        tags = exifread.process_file(f, details=False)
+    dt = tags.get('EXIF DateTimeOriginal')
+    return {'width': w, 'height': h, 'orientation': orientation, 'datetime': str(dt.values) if dt else ""}
+
+
+def make_folder(folder, count):
+    """EN: Synthetic JPEG/TIFF/PNG set with EXIF / CN: 生成带 EXIF 的 JPEG/TIFF/PNG 测试集"""
+    paths = []
+    for i in range(count):
+        size = (3000, 2000) if i % 2 else (2000, 3000)
+        img = Image.new("RGB", size, (40 + i % 200, 90, 120))
+        exif = Image.Exif()
+        exif[0x0112] = (1, 6, 8)[i % 3]
+        exif.get_ifd(0x8769)[0x9003] = f"2024:05:{1 + i % 28:02d} 10:{i % 60:02d}:00"
+        ext = ('.jpg', '.jpg', '.jpg', '.tif', '.png')[i % 5]
+        path = os.path.join(folder, f"frame_{i:03d}{ext}")
+        if ext == '.png':
+            img.save(path)
+        else:
+            img.save(path, exif=exif.tobytes())
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    folder = tempfile.mkdtemp(prefix="gt23_probe_")
+    try:
+        paths = make_folder(folder, 60)
+        mismatches = 0
+        for p in paths:
+            ref, got = legacy_scan(p), probe(p)
+            # EN: PNG dates are not read by either path / CN: 两种方式都不读取 PNG 的拍摄时间
+            if ref != got:
+                mismatches += 1
+                print(f"MISMATCH {os.path.basename(p)}: {ref} vs {got}")
+
+        t = time.perf_counter()
+        for p in paths:
+            legacy_scan(p)
+        t_old = time.perf_counter() - t
+        t = time.perf_counter()
+        for p in paths:
+            probe(p)
+        t_probe = time.perf_counter() - t
+        t = time.perf_counter()
+        probe_many(paths)
+        t_pool = time.perf_counter() - t
+
+        print(f"{len(paths)} files: legacy {t_old*1000:.0f} ms | probe {t_probe*1000:.1f} ms | "
+              f"probe_many {t_pool*1000:.1f} ms | x{t_old / t_probe:.0f}")
+        print("PASS" if mismatches == 0 else f"FAIL ({mismatches} mismatches)")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
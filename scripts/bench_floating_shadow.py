@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+from PIL import Image, ImageChops, ImageDraw, ImageFilter, ImageStat
+
+# Add project root to path for core imports
+sys.path.append(os.getcwd())
+
+from core import shadow_engine
+from core.shadow_engine import floating_shadow_bands
+
+# EN: Same stack as FilmRenderer._draw_floating_photo / CN: 与 FilmRenderer._draw_floating_photo 相同的图层堆叠
+LAYERS = ((180, 100, 0, 70, 20, 0.15), (80, 140, 0, 40, 10, 0.0), (20, 180, 0, 15, 0, 0.0))
+
+
+def legacy_floating(canvas, img, x, y):
+    """EN: Former full-buffer implementation kept as reference / CN: 旧版全缓冲区实现，作为对照基准"""
+    sf = max(img.width, img.height) / 2000.0
+    margin = int(200 * sf) * 4
+    shadow_buf = Image.new("RGBA", (img.width + margin * 2, img.height + margin * 2), (0, 0, 0, 0))
+    for radius, opacity, off_x, off_y, spread_neg, fade in LAYERS:
+        radius = int(radius * sf)
+        s_w = max(10, img.width - int(spread_neg * sf) * 2)
+        s_h = max(10, img.height - int(spread_neg * sf) * 2)
+        mask_l = Image.new("L", (s_w, s_h), 0)
+        ImageDraw.Draw(mask_l).rounded_rectangle([0, 0, s_w, s_h], radius=int(60 * sf), fill=255)
+        if fade > 0:
+            h_grad = Image.new("L", (s_w, 1))
+            for x_px in range(s_w):
+                h_grad.putpixel((x_px, 0), int(255 * (1.0 - (x_px / s_w) * fade)))
+            v_grad = Image.new("L", (1, s_h))
+            for y_px in range(s_h):
+                v_grad.putpixel((0, y_px), int(255 * (1.0 - (y_px / s_h) * fade)))
+            grad = ImageChops.multiply(h_grad.resize((s_w, s_h)), v_grad.resize((s_w, s_h)))
+            mask_l = ImageChops.multiply(mask_l, grad)
+        mask_cv = Image.new("RGBA", (s_w, s_h), (0, 0, 0, 0))
+        mask_cv.putalpha(Image.eval(mask_l, lambda v: int(v * opacity / 255)))
+        layer = Image.new("RGBA", shadow_buf.size, (0, 0, 0, 0))
+        layer.paste(mask_cv, (margin + int(spread_neg * sf) + int(off_x * sf),
+                              margin + int(spread_neg * sf) + int(off_y * sf)))
+        shadow_buf = Image.alpha_composite(shadow_buf, layer.filter(ImageFilter.GaussianBlur(radius=radius)))
+    canvas.paste(shadow_buf, (x - margin, y - margin), shadow_buf)
+    canvas.paste(img, (x, y))
+
+
+def engine_floating(canvas, img, x, y):
+    sf = max(img.width, img.height) / 2000.0
+    layers = tuple((int(r * sf), o, ox, oy, sp, fd) for r, o, ox, oy, sp, fd in LAYERS)
+    for mask, (dx, dy) in floating_shadow_bands(img.size, sf, layers):
+        canvas.paste((0, 0, 0), (x + dx, y + dy), mask)
+    canvas.paste(img, (x, y))
+
+
+def run(photo_size, pad):
+    img = Image.new("RGB", photo_size, (180, 120, 90))
+    base = Image.new("RGB", (photo_size[0] + pad * 2, photo_size[1] + pad * 2), (210, 222, 228))
+    results = []
+    for fn in (legacy_floating, engine_floating, engine_floating):
+        canvas = base.copy()
+        t = time.perf_counter()
+        fn(canvas, img, pad, pad)
+        results.append((time.perf_counter() - t, canvas))
+    diff = ImageChops.difference(results[0][1], results[1][1])
+    worst = max(hi for _, hi in diff.getextrema())
+    mean = max(ImageStat.Stat(diff).mean)
+    (t_old, _), (t_cold, _), (t_warm, _) = results
+    print(f"Photo {photo_size[0]}x{photo_size[1]}: legacy {t_old*1000:.0f} ms | engine cold {t_cold*1000:.0f} ms | "
+          f"warm {t_warm*1000:.0f} ms | x{t_old / t_cold:.1f} | max diff {worst}, mean diff {mean:.3f}")
+
+
+if __name__ == "__main__":
+    for size, pad in (((1000, 700), 120), ((3600, 2400), 400)):
+        shadow_engine._float_cache.clear()
+        run(size, pad)
@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+from PIL import Image, ImageChops, ImageEnhance, ImageFilter, ImageStat
+
+# Add project root to path for core imports
+sys.path.append(os.getcwd())
+
+from core import renderer as renderer_module
+from core.renderer import FilmRenderer
+
+# EN: Acceptance thresholds (8-bit levels) / CN: 验收阈值（8 位色阶）
+MAX_MEAN_DIFF = 1.0
+MAX_P99_DIFF = 4
+
+
+def legacy_frosted_base(source_img, w, h):
+    """EN: Former full-resolution blur kept as reference / CN: 旧版全分辨率模糊，作为对照基准"""
+    iw, ih = source_img.size
+    aspect = iw / ih
+    if aspect > w / h:
+        new_iw, new_ih = int(h * aspect), h
+        left = (new_iw - w) // 2
+        canvas = source_img.resize((new_iw, new_ih), Image.Resampling.BILINEAR).crop((left, 0, left + w, h))
+    else:
+        new_iw, new_ih = w, int(w / aspect)
+        top = (new_ih - h) // 2
+        canvas = source_img.resize((new_iw, new_ih), Image.Resampling.BILINEAR).crop((0, top, w, top + h))
+    canvas = canvas.filter(ImageFilter.GaussianBlur(radius=int(max(w, h) * 0.085)))
+    return ImageEnhance.Brightness(canvas).enhance(1.15)
+
+
+def make_photo(w, h):
+    """EN: Busy synthetic photo (bars + gradient) / CN: 细节丰富的合成照片（色条 + 渐变）"""
+    img = Image.linear_gradient("L").resize((w, h)).convert("RGB")
+    for x in range(0, w, max(1, w // 24)):
+        img.paste(((x * 7) % 255, 255 - (x * 3) % 255, (x * 11) % 255), (x, 0, x + max(1, w // 48), h))
+    return img
+
+
+def p99(diff):
+    hist = diff.convert("L").histogram()
+    total, acc = sum(hist), 0
+    for level, count in enumerate(hist):
+        acc += count
+        if acc >= total * 0.99:
+            return level
+    return 255
+
+
+def run(photo_size, canvas_size):
+    renderer = FilmRenderer()
+    photo = make_photo(*photo_size)
+    t = time.perf_counter()
+    ref = legacy_frosted_base(photo, *canvas_size)
+    t_old = time.perf_counter() - t
+    t = time.perf_counter()
+    out = renderer._create_frosted_base(photo, *canvas_size)
+    t_new = time.perf_counter() - t
+
+    diff = ImageChops.difference(ref, out)
+    mean = max(ImageStat.Stat(diff).mean)
+    worst = max(hi for _, hi in diff.getextrema())
+    tail = p99(diff)
+    # EN: Blur working buffer (RGB bytes) / CN: 模糊工作缓冲区（RGB 字节数）
+    radius = int(max(canvas_size) * 0.085)
+    scale = min(1.0, renderer_module.FROSTED_WORK_RADIUS / radius)
+    work_mb = canvas_size[0] * canvas_size[1] * 3 * scale * scale / 1e6
+    full_mb = canvas_size[0] * canvas_size[1] * 3 / 1e6
+    status = "PASS" if mean <= MAX_MEAN_DIFF and tail <= MAX_P99_DIFF else "FAIL"
+    print(f"{canvas_size[0]}x{canvas_size[1]}: legacy {t_old*1000:.0f} ms | downsampled {t_new*1000:.0f} ms "
+          f"(x{t_old / t_new:.1f}) | blur buffer {full_mb:.1f} MB -> {work_mb:.2f} MB | "
+          f"mean diff {mean:.3f}, p99 {tail}, max {worst} -> {status}")
+
+
+if __name__ == "__main__":
+    run((1000, 667), (1200, 960))
+    run((3600, 2400), (4500, 3600))
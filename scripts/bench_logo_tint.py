@@ -0,0 +1,79 @@
+import io
+import os
+import sys
+import time
+from PIL import Image, ImageDraw
+
+# Add project root to path for core imports
+sys.path.append(os.getcwd())
+
+from core.logo_engine import tint_logo
+from utils.config_manager import config_manager
+
+try:
+    import cairosvg
+except (ImportError, OSError):
+    cairosvg = None
+
+# EN: Logo raster height used by 4500px exports (main font ~190px, rendered at 2x)
+# CN: 4500px 导出时的 Logo 栅格高度（主字号约 190px，按 2 倍渲染）
+RASTER_H = 380
+TINT = (245, 245, 245)  # EN: Dark theme main colour / CN: 深色主题主色
+
+
+def legacy_tint(logo_img, m_color):
+    """EN: Former per-pixel loop kept as reference / CN: 旧版逐像素循环，作为对照基准"""
+    logo_img = logo_img.convert('RGBA')
+    new_pixels = []
+    for r, g, b, a in list(logo_img.getdata()):
+        is_dark = (r < 180 and g < 180 and b < 180)
+        is_neutral = (abs(r - g) < 40 and abs(g - b) < 40)
+        new_pixels.append((*m_color, a) if is_dark and is_neutral else (r, g, b, a))
+    logo_img.putdata(new_pixels)
+    return logo_img
+
+
+def load_samples(limit=5):
+    """EN: Rasterize the largest SVG logos (PNG / synthetic fallback) / CN: 栅格化体积最大的 SVG Logo（回退到 PNG / 合成图）"""
+    dirs = [config_manager.get_managed_path("logos"), os.path.join("GT23_Assets_backup", "logos")]
+    samples = []
+    for d in dirs:
+        if not os.path.isdir(d):
+            continue
+        files = [os.path.join(d, f) for f in os.listdir(d)]
+        exts = ('.svg', '.png') if cairosvg else ('.png',)
+        files = sorted((f for f in files if f.lower().endswith(exts)), key=os.path.getsize, reverse=True)
+        for f in files[:limit]:
+            if f.lower().endswith('.svg'):
+                img = Image.open(io.BytesIO(cairosvg.svg2png(url=f, output_height=RASTER_H)))
+            else:
+                img = Image.open(f)
+                img = img.resize((max(1, int(img.width * RASTER_H / img.height)), RASTER_H))
+            samples.append((os.path.basename(f), img.convert('RGBA')))
+        if samples:
+            return samples
+
+    # EN: Synthetic logo: black wordmark + red dot / CN: 合成 Logo：黑色字标 + 红点
+    img = Image.new('RGBA', (RASTER_H * 5, RASTER_H), (0, 0, 0, 0))
+    d = ImageDraw.Draw(img)
+    d.rectangle([20, 40, RASTER_H * 4, RASTER_H - 40], fill=(20, 20, 20, 255))
+    d.ellipse([RASTER_H * 4 + 40, 60, RASTER_H * 5 - 20, RASTER_H - 60], fill=(226, 0, 26, 255))
+    return [("synthetic", img)]
+
+
+def bench(fn, img, rounds=5):
+    best = float('inf')
+    for _ in range(rounds):
+        t = time.perf_counter()
+        out = fn(img, TINT)
+        best = min(best, time.perf_counter() - t)
+    return best, out
+
+
+if __name__ == "__main__":
+    for name, img in load_samples():
+        t_old, ref = bench(legacy_tint, img)
+        t_new, out = bench(tint_logo, img)
+        same = ref.tobytes() == out.tobytes()
+        print(f"{name:<24} {img.width}x{img.height} | loop {t_old*1000:8.2f} ms | "
+              f"vectorized {t_new*1000:6.2f} ms (x{t_old / t_new:5.1f}) | identical: {same}")
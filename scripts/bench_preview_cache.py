@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+from PIL import Image, ImageChops
+
+# Add project root to path for core imports
+sys.path.append(os.getcwd())
+
+from gui.controllers.border_controller import BorderController
+from core.preview_cache import preview_source_cache, preview_result_cache
+
+# EN: Slider nudges on one photo / CN: 同一张照片上的滑块微调次数
+NUDGES = 8
+
+
+def make_scan(path):
+    """EN: 24 MP scan with stripes / CN: 带条纹的 2400 万像素扫描图"""
+    img = Image.new("RGB", (6000, 4000), (120, 90, 60))
+    for x in range(0, 6000, 50):
+        img.paste((x % 255, 200 - x % 200, 100), (x, 0, x + 25, 4000))
+    img.save(path, quality=92)
+
+
+def legacy_preview(ctrl, path, rotation):
+    """EN: Former path: fresh metadata and a full decode on every call / CN: 旧路径：每次调用都重新提取元数据并完整解码"""
+    data = ctrl.metadata_handler.get_data(path)
+    data['layout'].update({"left": 180 / 4500.0, "right": 180 / 4500.0, "top": 180 / 4500.0, "bottom": 585 / 4500.0,
+                           "font_main_scale": 144 / 4500.0, "font_sub_scale": 112 / 4500.0, "font_v_offset": 0.0})
+    data['target_ratio'] = 'Original'
+    img, _ = ctrl.renderer.process_image(path, data, None, target_long_edge=1200, manual_rotation=rotation,
+                                         theme="light", v_offset=0, h_offset=0)
+    return img
+
+
+if __name__ == "__main__":
+    folder = tempfile.mkdtemp(prefix="gt23_preview_")
+    try:
+        src = os.path.join(folder, "scan.jpg")
+        make_scan(src)
+        ctrl = BorderController()
+        ok = True
+        for rotation in (0, 90):
+            t = time.perf_counter()
+            for _ in range(NUDGES):
+                ref = legacy_preview(ctrl, src, rotation)
+            t_old = (time.perf_counter() - t) / NUDGES
+
+            preview_source_cache.clear()
+            times = []
+            for _ in range(NUDGES):
+                # EN: A nudge changes the config, so finished previews never match / CN: 微调会改变配置，完成的预览不会命中
+                preview_result_cache.clear()
+                t = time.perf_counter()
+                got, report = ctrl.get_preview_image(src, False, False, None, rotation)
+                times.append(time.perf_counter() - t)
+            same = got.size == ref.size and ImageChops.difference(got, ref).getbbox() is None
+            ok &= same
+            print(f"rotation {rotation:3d}: uncached {t_old*1000:.0f} ms | cold {times[0]*1000:.0f} ms | "
+                  f"warm {sum(times[1:]) / (NUDGES - 1) * 1000:.0f} ms | identical: {same}")
+        stats = preview_source_cache.stats()
+        ok &= stats['hits'] == 2 * (NUDGES - 1)
+        print(f"cache: {stats}")
+        print("PASS" if ok else "FAIL")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+import copy
+import shutil
+import tempfile
+from PIL import Image, ImageChops
+
+# Add project root to path for core imports
+sys.path.append(os.getcwd())
+
+from core.renderer import FilmRenderer
+from core.metadata import MetadataHandler
+from core.preview_compositor import PreviewCompositor
+
+THEMES = ["light", "dark", "macaron", "sakura", "rainbow", "frosted", "slate_teal"]
+# EN: Text-only slider positions (font_v_offset in 4500px units) / CN: 仅影响文字的滑块位置（4500px 基准下的 font_v_offset）
+V_OFFSETS = [0, 20, 40, 60, 40, 20, 0]
+
+
+def make_scan(path):
+    """EN: 12 MP scan with stripes / CN: 带条纹的 1200 万像素扫描图"""
+    img = Image.new("RGB", (4500, 3000), (120, 90, 60))
+    for x in range(0, 4500, 50):
+        img.paste((x % 255, 200 - x % 200, 100), (x, 0, x + 25, 3000))
+    img.save(path, quality=92)
+
+
+def states(data):
+    """EN: Slider drag, then an EXIF edit / CN: 先拖动滑块，再修改 EXIF"""
+    for v in V_OFFSETS:
+        d = copy.deepcopy(data)
+        d['layout']['font_v_offset'] = v / 4500.0
+        yield d
+    d = copy.deepcopy(data)
+    d['LensModel'] = "Planar T* 80mm F2.8"
+    yield d
+
+
+def legacy_preview(renderer, path, data, source, theme):
+    """EN: Former path: every stage rebuilt from scratch / CN: 旧路径：每个阶段都从头重建"""
+    img, _ = renderer.process_image(path, data, None, target_long_edge=1200, source_img=source, theme=theme,
+                                    rainbow_index=2, rainbow_range=(0.2, 0.4))
+    return img
+
+
+if __name__ == "__main__":
+    folder = tempfile.mkdtemp(prefix="gt23_layers_")
+    try:
+        src = os.path.join(folder, "scan.jpg")
+        make_scan(src)
+        renderer = FilmRenderer()
+        data = MetadataHandler().get_data(src)
+        source = renderer.load_source(src, 1200)
+        ok = True
+        for theme in THEMES:
+            layers = PreviewCompositor()
+            t_old, t_new, same = 0.0, [], True
+            for d in states(data):
+                t = time.perf_counter()
+                ref = legacy_preview(renderer, src, copy.deepcopy(d), source, theme)
+                t_old += time.perf_counter() - t
+                t = time.perf_counter()
+                got, _ = renderer.process_image(src, copy.deepcopy(d), None, target_long_edge=1200, source_img=source,
+                                                theme=theme, rainbow_index=2, rainbow_range=(0.2, 0.4), layers=layers)
+                t_new.append(time.perf_counter() - t)
+                same &= got.size == ref.size and ImageChops.difference(got, ref).getbbox() is None
+            stats = layers.stats()
+            # EN: Base built once; the slider returns to cached text states / CN: 底图只构建一次；滑块回到已缓存的文字状态
+            ok &= same and stats['base']['misses'] == 1 and stats['text']['hits'] >= 2
+            print(f"{theme:10s}: full {t_old / len(t_new) * 1000:5.1f} ms | layered first {t_new[0] * 1000:5.1f} ms | "
+                  f"nudge {sum(t_new[1:]) / (len(t_new) - 1) * 1000:5.1f} ms | identical: {same}")
+        print("PASS" if ok else "FAIL")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+from PIL import Image, ImageChops
+
+# Add project root to path for core imports
+sys.path.append(os.getcwd())
+
+from gui.controllers.border_controller import BorderController
+from core.preview_cache import preview_source_cache, preview_result_cache
+from core.preview_compositor import preview_compositor
+from core.preview_worker import PreviewWorker
+
+PHOTOS = 6
+# EN: Neighbours pre-rendered on each side / CN: 每侧预渲染的相邻照片数
+RADIUS = 2
+ARGS = {'is_digital': False, 'is_pure': False, 'manual_film': None, 'rotation': 0, 'use_branding': True}
+
+
+def make_scan(path, i):
+    """EN: 24 MP scan with stripes / CN: 带条纹的 2400 万像素扫描图"""
+    img = Image.new("RGB", (6000, 4000), (120, 90, 60 + i * 10))
+    for x in range(0, 6000, 50):
+        img.paste((x % 255, 200 - x % 200, 100), (x, 0, x + 25, 4000))
+    img.save(path, quality=92)
+
+
+def reset():
+    preview_source_cache.clear()
+    preview_result_cache.clear()
+    preview_compositor.clear()
+
+
+def neighbour_jobs(ctrl, path):
+    """EN: Same order as BorderPanel._schedule_neighbour_previews / CN: 与 BorderPanel._schedule_neighbour_previews 顺序一致"""
+    paths = ctrl.current_batch_paths
+    idx = paths.index(path)
+    order = [paths[j] for step in range(1, RADIUS + 1) for j in (idx + step, idx - step) if 0 <= j < len(paths)]
+    return [lambda token, p=p: ctrl.prerender_preview(p, cancel=token, **ARGS) for p in order]
+
+
+def click(worker, ctrl, path, prefetch):
+    """EN: Show one photo; returns (seconds to preview, image) / CN: 显示一张照片；返回 (出图耗时, 图像)"""
+    done = threading.Event()
+    result = {}
+
+    def on_done(res):
+        result['img'] = res[0]
+        result['t'] = time.perf_counter() - t
+        done.set()
+    t = time.perf_counter()
+    worker.submit(lambda token: ctrl.get_preview_image(path, cancel=token, **ARGS), on_done)
+    done.wait()
+    if prefetch:
+        worker.submit_idle(neighbour_jobs(ctrl, path))
+    return result['t'], result['img']
+
+
+def wait_idle(worker):
+    """EN: User pauses on the photo until speculation finishes / CN: 用户停留在照片上直到推测渲染完成"""
+    while worker.stats()['idle_queued'] or worker.stats()['busy']:
+        time.sleep(0.01)
+
+
+if __name__ == "__main__":
+    folder = tempfile.mkdtemp(prefix="gt23_prefetch_")
+    try:
+        for i in range(PHOTOS):
+            make_scan(os.path.join(folder, f"scan_{i}.jpg"), i)
+        ctrl = BorderController()
+        ctrl.scan_folder(folder)
+        paths = list(ctrl.current_batch_paths)
+        worker = PreviewWorker()
+
+        reset()
+        cold = [click(worker, ctrl, p, False) for p in paths]
+        reset()
+        warm = []
+        for p in paths:
+            warm.append(click(worker, ctrl, p, True))
+            wait_idle(worker)
+
+        same = all(a[1].size == b[1].size and ImageChops.difference(a[1], b[1]).getbbox() is None
+                   for a, b in zip(cold, warm))
+        t_cold = sum(c[0] for c in cold[1:]) / (PHOTOS - 1)
+        t_warm = sum(w[0] for w in warm[1:]) / (PHOTOS - 1)
+        print(f"next-frame click: cold {t_cold * 1000:.0f} ms | pre-rendered {t_warm * 1000:.1f} ms | identical: {same}")
+
+        # EN: Editing a neighbour's config invalidates its speculative preview / CN: 修改相邻照片配置会使其推测预览失效
+        click(worker, ctrl, paths[0], True)
+        wait_idle(worker)
+        hit_before = ctrl.has_cached_preview(paths[1], **ARGS)
+        ctrl.update_image_config(paths[1], {'theme': 'dark'})
+        hit_after = ctrl.has_cached_preview(paths[1], **ARGS)
+        print(f"neighbour cached: {hit_before} | after its config changed: {hit_after}")
+        print(f"worker: {worker.stats()} | results: {preview_result_cache.stats()}")
+        worker.close()
+        print("PASS" if same and t_warm < t_cold and hit_before and not hit_after else "FAIL")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
@@ -0,0 +1,105 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+from PIL import Image, ImageChops
+
+# Add project root to path for core imports
+sys.path.append(os.getcwd())
+
+from gui.controllers.border_controller import BorderController
+from core.preview_cache import preview_source_cache, preview_result_cache
+from core.preview_compositor import preview_compositor
+from core.preview_worker import PreviewWorker
+
+# EN: Clicks through the thumbnail strip, CLICK_GAP seconds apart / CN: 在缩略图条上连续点击，间隔 CLICK_GAP 秒
+PHOTOS = 8
+CLICK_GAP = 0.02
+
+
+def make_scan(path, i):
+    """EN: 24 MP scan with stripes / CN: 带条纹的 2400 万像素扫描图"""
+    img = Image.new("RGB", (6000, 4000), (120, 90, 60 + i * 10))
+    for x in range(0, 6000, 50):
+        img.paste((x % 255, 200 - x % 200, 100), (x, 0, x + 25, 4000))
+    img.save(path, quality=92)
+
+
+def reset():
+    preview_source_cache.clear()
+    preview_result_cache.clear()
+    preview_compositor.clear()
+
+
+def legacy_clicks(ctrl, paths):
+    """EN: Former path: one thread per click, stale results dropped after a full render / CN: 旧路径：每次点击一个线程，过期结果在完整渲染后才丢弃"""
+    state = {'job': 0, 'result': None, 'renders': 0}
+    threads = []
+    lock = threading.Lock()
+    for path in paths:
+        state['job'] += 1
+        job_id = state['job']
+
+        def worker(path=path, job_id=job_id):
+            img, _ = ctrl.get_preview_image(path, False, False, None, 0)
+            with lock:
+                state['renders'] += 1
+                if job_id == state['job']:
+                    state['result'] = img
+        t = threading.Thread(target=worker, daemon=True)
+        t.start()
+        threads.append(t)
+        time.sleep(CLICK_GAP)
+    for t in threads:
+        t.join()
+    return state['result'], state['renders']
+
+
+def worker_clicks(ctrl, paths):
+    """EN: One coalescing worker, superseded jobs cancelled / CN: 单个合并式工作线程，被替换的任务被取消"""
+    worker = PreviewWorker()
+    done = threading.Event()
+    result = {}
+
+    def on_done(res):
+        result['img'] = res[0]
+        done.set()
+    for path in paths:
+        worker.submit(lambda token, path=path: ctrl.get_preview_image(path, False, False, None, 0, cancel=token), on_done)
+        time.sleep(CLICK_GAP)
+    done.wait()
+    stats = worker.stats()
+    worker.close()
+    return result['img'], stats
+
+
+if __name__ == "__main__":
+    folder = tempfile.mkdtemp(prefix="gt23_worker_")
+    try:
+        paths = []
+        for i in range(PHOTOS):
+            path = os.path.join(folder, f"scan_{i}.jpg")
+            make_scan(path, i)
+            paths.append(path)
+        ctrl = BorderController()
+
+        reset()
+        t = time.perf_counter()
+        ref, renders = legacy_clicks(ctrl, paths)
+        t_old = time.perf_counter() - t
+
+        reset()
+        t = time.perf_counter()
+        got, stats = worker_clicks(ctrl, paths)
+        t_new = time.perf_counter() - t
+
+        same = got.size == ref.size and ImageChops.difference(got, ref).getbbox() is None
+        print(f"{PHOTOS} clicks: thread per click {t_old * 1000:.0f} ms to last preview ({renders} full renders) | "
+              f"coalescing worker {t_new * 1000:.0f} ms ({stats})")
+        print(f"identical final preview: {same}")
+        ok = same and stats['completed'] == 1 and t_new < t_old
+        print("PASS" if ok else "FAIL")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+from PIL import Image, ImageChops, ImageDraw
+
+# Add project root to path for core imports
+sys.path.append(os.getcwd())
+
+from core.font_service import font_service
+from core.sprite_atlas import SpriteAtlas
+
+COLOR = (245, 130, 35, 210)
+GLOW = (245, 130, 35, 75)
+
+
+def layout(font):
+    """EN: One 72-frame half-frame sheet worth of labels / CN: 一张 72 帧半格索引页的标签"""
+    jobs = []
+    for i in range(72):
+        x = 40 + (i % 12) * 190
+        y = 30 + (i // 12) * 160
+        jobs.append((x, y, str(i // 2 + 1), None, [*str(i // 2 + 1)]))
+        jobs.append((x + 0.5, y + 40, f"{i + 1}A", None, list(f"{i + 1}A")))
+        jobs.append((x, y + 80, "24/05/01", GLOW, None))
+        jobs.append((x, y + 110, "f/8  1/250s  45mm", GLOW, None))
+    return jobs
+
+
+def legacy(canvas, font, jobs):
+    draw = ImageDraw.Draw(canvas)
+    for x, y, text, glow, _ in jobs:
+        if glow:
+            draw.text((x + 1, y + 1), text, font=font, fill=glow)
+        draw.text((x, y), text, font=font, fill=COLOR)
+
+
+def atlas_draw(atlas, canvas, font, jobs):
+    draw = ImageDraw.Draw(canvas)
+    for x, y, text, glow, runs in jobs:
+        if glow:
+            atlas.draw_text(draw, (x + 1, y + 1), text, font, glow, runs)
+        atlas.draw_text(draw, (x, y), text, font, COLOR, runs)
+
+
+if __name__ == "__main__":
+    font_path = os.path.join("assets", "fonts", "consola.ttf")
+    ok = True
+    for size in (13, 20, 32):
+        font = font_service.get(font_path, size)
+        jobs = layout(font)
+        atlas = SpriteAtlas()
+        results = []
+        for fn in (lambda c: legacy(c, font, jobs), lambda c: atlas_draw(atlas, c, font, jobs),
+                   lambda c: atlas_draw(atlas, c, font, jobs)):
+            canvas = Image.new("RGB", (2400, 1000), (12, 12, 12))
+            t = time.perf_counter()
+            fn(canvas)
+            results.append((time.perf_counter() - t, canvas))
+        (t_old, ref), (t_cold, cold), (t_warm, warm) = results
+        worst = max(max(hi for _, hi in ImageChops.difference(ref, img).getextrema()) for img in (cold, warm))
+        ok &= worst == 0
+        print(f"size {size}: draw.text {t_old*1000:.1f} ms | atlas cold {t_cold*1000:.1f} ms | "
+              f"warm {t_warm*1000:.1f} ms | max diff {worst} | {atlas.stats()}")
+    print("PASS" if ok else "FAIL")
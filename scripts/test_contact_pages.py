@@ -0,0 +1,64 @@
+import os
+import sys
+import shutil
+import tempfile
+from PIL import Image
+
+# Add project root to path for core imports
+sys.path.append(os.getcwd())
+
+from core.contact_pages import paginate, render_pages
+
+
+def legacy_pages(paths, capacity):
+    """EN: Former behaviour: one sheet, frames beyond capacity dropped / CN: 旧版行为：单页，超出容量的帧被丢弃"""
+    return [(0, paths[:capacity])]
+
+
+if __name__ == "__main__":
+    ok = True
+
+    # EN: Page boundaries and frame offsets / CN: 分页边界与帧号偏移
+    for total, capacity, expected in ((36, 36, [(0, 36)]), (37, 36, [(0, 36), (36, 1)]),
+                                      (150, 72, [(0, 72), (72, 72), (144, 6)]), (5, 12, [(0, 5)])):
+        paths = [f"f{i:03d}.jpg" for i in range(total)]
+        pages = paginate(paths, capacity)
+        got = [(offset, len(chunk)) for offset, chunk in pages]
+        kept = sum(len(chunk) for _, chunk in pages)
+        dropped = total - len(legacy_pages(paths, capacity)[0][1])
+        ok &= got == expected and kept == total and [p for _, c in pages for p in c] == paths
+        print(f"{total} frames / {capacity} per page: {got} | previously dropped {dropped}")
+
+    # EN: Render a 26-frame 6x6 roll (12 per page) in this process / CN: 在本进程内渲染 26 帧 6x6 胶卷（每页 12 帧）
+    folder = tempfile.mkdtemp(prefix="gt23_pages_")
+    try:
+        from core.metadata import MetadataHandler
+        from core.renderers.renderer_66 import Renderer66
+
+        paths = []
+        for i in range(26):
+            path = os.path.join(folder, f"f{i:02d}.jpg")
+            Image.new("RGB", (1200, 1200), (i * 9, 120, 200 - i * 5)).save(path, quality=90)
+            paths.append(path)
+        meta = MetadataHandler()
+        renderer = Renderer66()
+        cfg = meta.get_contact_layout("66")
+        jobs = []
+        for page, (offset, chunk) in enumerate(paginate(paths, renderer.page_capacity(meta)), start=1):
+            jobs.append({'page': page, 'layout_key': "66", 'paths': chunk, 'cfg': cfg, 'user_emulsion': "049",
+                         'sample_data': meta.get_data(paths[0]), 'orientation': None, 'show_date': True,
+                         'show_exif': True, 'frame_offset': offset,
+                         'save_path': os.path.join(folder, f"ContactSheet_66_p{page:02d}.jpg"),
+                         'save_kwargs': {'quality': 95}})
+        results = render_pages(jobs, {"66": renderer}, meta, workers=1)
+        ok &= [r['frames'] for r in results] == [12, 12, 2] and all(r['ok'] and os.path.exists(r['path']) for r in results)
+        print(f"pages: {[(os.path.basename(r['path']), r['frames']) for r in results]}")
+
+        # EN: Pool path reports pages in page order / CN: 进程池路径按页码顺序回调
+        emitted = []
+        results = render_pages(jobs, {"66": renderer}, meta, workers=3, on_result=lambda r: emitted.append(r['page']))
+        ok &= emitted == [1, 2, 3] and [r['page'] for r in results] == [1, 2, 3] and all(r['ok'] for r in results)
+        print(f"pool on_result order: {emitted}")
+        print("PASS" if ok else "FAIL")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
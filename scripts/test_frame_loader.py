@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+from functools import partial
+from PIL import Image, ImageChops
+
+# Add project root to path for core imports
+sys.path.append(os.getcwd())
+
+from core.frame_loader import FrameLoader
+
+
+def fit(img, w, h):
+    """EN: Same steps as Renderer135._fit_photo_auto_rotate / CN: 与 Renderer135._fit_photo_auto_rotate 步骤一致"""
+    if img.height > img.width:
+        img = img.rotate(-90, expand=True)
+    return img.resize((w, h), Image.Resampling.LANCZOS)
+
+
+def legacy_frames(paths, w, h):
+    """EN: Former serial open/rotate/resize per frame / CN: 旧版逐帧串行打开/旋转/缩放"""
+    out = []
+    for p in paths:
+        if p is None:
+            out.append(None)
+            continue
+        with Image.open(p) as img:
+            out.append(fit(img, w, h))
+    return out
+
+
+def max_diff(a, b):
+    if a is None or b is None:
+        return 0 if a is b else 255
+    return max(hi for _, hi in ImageChops.difference(a, b).getextrema())
+
+
+if __name__ == "__main__":
+    folder = tempfile.mkdtemp(prefix="gt23_frames_")
+    try:
+        paths = []
+        for i in range(24):
+            size = (3000, 2000) if i % 3 else (2000, 3000)
+            path = os.path.join(folder, f"f{i:02d}.jpg")
+            Image.new("RGB", size, (i * 9 % 255, 120, 200 - i * 5)).save(path, quality=90)
+            paths.append(path)
+        paths[5] = None  # EN: Empty slot / CN: 空槽位
+
+        w, h = 720, 480
+        t = time.perf_counter()
+        ref = legacy_frames(paths, w, h)
+        t_old = time.perf_counter() - t
+
+        ok = True
+        for workers in (1, 4):
+            t = time.perf_counter()
+            with FrameLoader(paths, partial(fit, w=w, h=h), workers=workers, window=6) as frames:
+                got = [frames.get(i) for i in range(len(paths))]
+            t_new = time.perf_counter() - t
+            worst = max(max_diff(a, b) for a, b in zip(ref, got))
+            ok &= worst == 0
+            print(f"workers={workers}: serial {t_old*1000:.0f} ms | loader {t_new*1000:.0f} ms | max diff {worst}")
+
+        # EN: Decode errors surface at get() like the serial path / CN: 解码错误在 get() 处抛出，与串行路径一致
+        bad = os.path.join(folder, "broken.jpg")
+        with open(bad, "wb") as f:
+            f.write(b"not an image")
+        try:
+            with FrameLoader([bad], partial(fit, w=w, h=h), workers=2) as frames:
+                frames.get(0)
+            ok = False
+        except Exception as e:
+            print(f"broken file raised: {type(e).__name__}")
+
+        print("PASS" if ok else "FAIL")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+from PIL import Image, ImageDraw, ImageChops
+
+# Add project root to path for core imports
+sys.path.append(os.getcwd())
+
+from core import gradient_engine
+from core.gradient_engine import render_gradient, FUJI_RAINBOW_COLORS
+
+
+def legacy_linear(w, h, c1, c2, vertical=False, gamma=1.3):
+    """EN: Former per-line implementation kept as reference / CN: 旧版逐行实现，作为对照基准"""
+    canvas = Image.new("RGB", (w, h))
+    draw = ImageDraw.Draw(canvas)
+    steps = h if vertical else w
+    for i in range(steps):
+        t = i / steps if steps > 0 else 0
+        if gamma != 1.0:
+            t = t ** gamma
+        r = int(c1[0] + (c2[0] - c1[0]) * t)
+        g = int(c1[1] + (c2[1] - c1[1]) * t)
+        b = int(c1[2] + (c2[2] - c1[2]) * t)
+        if vertical:
+            draw.line([(0, i), (w, i)], fill=(r, g, b))
+        else:
+            draw.line([(i, 0), (i, h)], fill=(r, g, b))
+    return canvas
+
+
+def legacy_fuji(w, h, t_start, t_end):
+    canvas = Image.new("RGB", (w, h))
+    draw = ImageDraw.Draw(canvas)
+    colors = FUJI_RAINBOW_COLORS
+    for x in range(w):
+        pos = t_start + (x / w) * (t_end - t_start)
+        num_segments = len(colors) - 1
+        scaled_pos = pos * num_segments
+        idx = int(scaled_pos)
+        next_idx = min(idx + 1, num_segments)
+        inner_t = scaled_pos - idx
+        c1, c2 = colors[idx], colors[next_idx]
+        draw.line([(x, 0), (x, h)], fill=(int(c1[0] + (c2[0] - c1[0]) * inner_t),
+                                          int(c1[1] + (c2[1] - c1[1]) * inner_t),
+                                          int(c1[2] + (c2[2] - c1[2]) * inner_t)))
+    return canvas
+
+
+def max_diff(a, b):
+    """EN: Largest per-channel difference / CN: 最大单通道差值"""
+    return max(hi for _, hi in ImageChops.difference(a, b).getextrema())
+
+
+def run_cases():
+    worst = 0
+    sizes = [(1, 1), (17, 9), (1200, 1714), (4860, 3440), (3440, 6300)]
+    linear_cases = [
+        ((210, 222, 228), (125, 142, 152), True, 1.6),   # slate_teal
+        ((255, 245, 247), (255, 214, 224), False, 1.3),  # macaron / sakura style
+        ((0, 0, 0), (255, 255, 255), False, 1.0),
+    ]
+    for w, h in sizes:
+        for c1, c2, vertical, gamma in linear_cases:
+            worst = max(worst, max_diff(legacy_linear(w, h, c1, c2, vertical, gamma),
+                                        render_gradient(w, h, (c1, c2), vertical=vertical, gamma=gamma)))
+        for t_start, t_end in [(0.0, 1.0), (0.2, 0.4), (0.875, 1.0), (0.6, 0.3)]:
+            worst = max(worst, max_diff(legacy_fuji(w, h, t_start, t_end),
+                                        render_gradient(w, h, FUJI_RAINBOW_COLORS, t_start=t_start, t_end=t_end)))
+    return worst
+
+
+def benchmark(w=4860, h=6300):
+    t = time.perf_counter()
+    legacy_fuji(w, h, 0.2, 0.4)
+    t_legacy = time.perf_counter() - t
+    gradient_engine.build_gradient_lut.cache_clear()
+    t = time.perf_counter()
+    render_gradient(w, h, FUJI_RAINBOW_COLORS, t_start=0.2, t_end=0.4)
+    t_new = time.perf_counter() - t
+    print(f"Rainbow {w}x{h}: legacy {t_legacy*1000:.1f} ms | engine {t_new*1000:.1f} ms | x{t_legacy / t_new:.1f}")
+
+
+if __name__ == "__main__":
+    for label, use_numpy in (("numpy", True), ("pure python", False)):
+        if use_numpy and gradient_engine.np is None:
+            continue
+        saved_np = gradient_engine.np
+        if not use_numpy:
+            gradient_engine.np = None
+        gradient_engine.build_gradient_lut.cache_clear()
+        worst = run_cases()
+        gradient_engine.np = saved_np
+        status = "PASS" if worst == 0 else ("TOLERANCE" if worst <= 1 else "FAIL")
+        print(f"[{label}] max channel diff vs legacy: {worst} -> {status}")
+    benchmark()
@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+from PIL import Image, ImageFilter, ImageChops
+
+# Add project root to path for core imports
+sys.path.append(os.getcwd())
+
+from core import shadow_engine
+from core.shadow_engine import apply_shadow
+
+
+def legacy_shadow(canvas, radius=20, opacity=140, margin=80, dy=10, blur=ImageFilter.GaussianBlur):
+    """EN: Former full-canvas blur kept as reference / CN: 旧版整幅画布模糊，作为对照基准"""
+    full_canvas = Image.new("RGBA", (canvas.width + margin, canvas.height + margin), (0, 0, 0, 0))
+    shadow_mask = Image.new("RGBA", canvas.size, (0, 0, 0, opacity))
+    full_canvas.paste(shadow_mask, (margin // 2, margin // 2 + dy))
+    full_canvas = full_canvas.filter(blur(radius=radius))
+    canvas_rgba = canvas.convert("RGBA")
+    full_canvas.paste(canvas_rgba, (margin // 2, margin // 2), canvas_rgba)
+    return full_canvas
+
+
+def max_diff(a, b):
+    """EN: Largest per-channel difference / CN: 最大单通道差值"""
+    return max(hi for _, hi in ImageChops.difference(a, b).getextrema())
+
+
+def run_cases():
+    worst = 0
+    sizes = [(1, 1), (40, 300), (161, 160), (1200, 857), (1033, 1500), (4860, 3440)]
+    for w, h in sizes:
+        canvas = Image.new("RGB", (w, h), (250, 248, 245))
+        worst = max(worst, max_diff(legacy_shadow(canvas), apply_shadow(canvas)))
+        # EN: Preview variant (BoxBlur 5, 60px margin, 120 opacity) / CN: 预览参数（BoxBlur 5，60px 边距，不透明度 120）
+        worst = max(worst, max_diff(legacy_shadow(canvas, 5, 120, 60, 6, ImageFilter.BoxBlur),
+                                    apply_shadow(canvas, 5, 120, 60, (0, 6), kind="box")))
+    # EN: Semi-transparent canvas must blend over the shadow / CN: 半透明画布需与阴影正确混合
+    canvas = Image.new("RGBA", (900, 700), (30, 60, 90, 128))
+    worst = max(worst, max_diff(legacy_shadow(canvas), apply_shadow(canvas)))
+    return worst
+
+
+def benchmark(w=4860, h=6300):
+    canvas = Image.new("RGB", (w, h), (250, 248, 245))
+    t = time.perf_counter()
+    legacy_shadow(canvas)
+    t_legacy = time.perf_counter() - t
+    shadow_engine._slices.clear()
+    t = time.perf_counter()
+    apply_shadow(canvas)
+    t_cold = time.perf_counter() - t
+    t = time.perf_counter()
+    apply_shadow(canvas)
+    t_warm = time.perf_counter() - t
+    print(f"Shadow {w}x{h}: legacy {t_legacy*1000:.1f} ms | engine cold {t_cold*1000:.1f} ms | "
+          f"warm {t_warm*1000:.1f} ms | x{t_legacy / t_warm:.1f}")
+
+
+if __name__ == "__main__":
+    worst = run_cases()
+    print(f"max channel diff vs legacy: {worst} -> {'PASS' if worst == 0 else 'FAIL'}")
+    benchmark()
@@ -31,12 +31,25 @@ def sync_assets(remote_name=None):
     CN: 更新 GT23_Assets 子模块到最新的远程状态。
     """
     # 1. EN: Try Git Sync first (for devs) / CN: 优先尝试 Git 同步 (开发者模式)
+    success, msg = False, ""
     if not getattr(sys, 'frozen', False):
         success, msg = _sync_via_git(remote_name)
-        if success: return True, msg
     
     # 2. EN: Fallback to Web Sync (for users/portable) / CN: 回退至网络下载 (普通用户/EXE 模式)
-    return _sync_via_web(remote_name)
+    if not success:
+        success, msg = _sync_via_web(remote_name)
+
+    if success:
+        _invalidate_logo_caches()
+    return success, msg
+
+def _invalidate_logo_caches():
+    """EN: Refresh renderer logo index after a sync / CN: 同步后刷新渲染器的 Logo 索引"""
+    try:
+        from core.logo_engine import invalidate_logo_index
+        invalidate_logo_index()
+    except Exception:
+        pass
 
 def _sync_via_git(remote_name=None):
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
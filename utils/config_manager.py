@@ -28,7 +28,14 @@ class ConfigManager:
         default_config = {
             "custom_asset_path": "",
             "preferred_sync_source": "gitee",  # gitee or github
-            "auto_check_updates": True
+            "auto_check_updates": True,
+            "batch_workers": 0,  # EN: 0 = auto, 1 = serial / CN: 0 为自动，1 为串行
+            "logo_disk_cache": True,  # EN: Persist rendered logo sprites / CN: 持久化已渲染的 Logo 贴图
+            "sprocket_disk_cache": True,  # EN: Persist rasterized 135 sprocket strips / CN: 持久化已栅格化的 135 齿孔条
+            "metadata_cache": True,  # EN: Persist extracted EXIF fields (SQLite) / CN: 持久化已提取的 EXIF 字段 (SQLite)
+            "contact_band_threshold_mp": 40,  # EN: Compose contact sheets above N MP in bands (0 = always) / CN: 超过 N 百万像素的索引页按条带合成（0 为始终）
+            "preview_cache_mb": 256,  # EN: Memory budget for decoded preview sources / CN: 已解码预览源图的内存预算
+            "preview_prefetch": 2  # EN: Neighbours pre-rendered on each side (0 = off) / CN: 每侧预渲染的相邻照片数（0 为关闭）
         }
         if os.path.exists(self.config_path):
             try: